@@ -1,16 +1,19 @@
 import logging
 
-from flasgger import Swagger
-
+from home_automation.apidocs import init_app as init_api_docs
 from home_automation.app_factory import create_app
 from home_automation.database.database import create_database
-from home_automation.settings import ROOT_DIR
+from home_automation.logging_queue import configure_logging
+from home_automation.settings import (ROOT_DIR, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_SAMPLE_RATE, PORT, SERVER,
+                                      SERVER_KEEPALIVE)
 
-logging.basicConfig(level=logging.INFO,
-                    filename=f'{ROOT_DIR}/logs/home_automation.log',
-                    datefmt='%Y-%m-%S %H:%M:%S',
-                    format='%(levelname)s - %(asctime)s / %(message)s / %(name)s / line: %(lineno)d'
-                    )
+log_listener = configure_logging(f'{ROOT_DIR}/logs/home_automation.log',
+                                 slow_query_filename=f'{ROOT_DIR}/logs/slow_queries.log',
+                                 level=logging.INFO,
+                                 queue_size=LOG_QUEUE_SIZE,
+                                 batch_size=LOG_BATCH_SIZE,
+                                 sample_rate=LOG_SAMPLE_RATE
+                                 )
 
 logger = logging.getLogger('werkzeug')
 logger.disabled = True
@@ -19,6 +22,29 @@ if __name__ == "__main__":
     logger = logging.getLogger(__name__)
     logger.info("--------Application start-------")
     create_database()
-    app = create_app()
-    Swagger(app)
-    app.run(port=app.config['PORT'], host="0.0.0.0")
+
+    if SERVER == 'uvicorn':
+        import uvicorn
+
+        from home_automation.asgi.app_factory import create_app as create_asgi_app
+
+        uvicorn.run(create_asgi_app(), host="0.0.0.0", port=PORT, timeout_keep_alive=SERVER_KEEPALIVE,
+                    log_config=None, access_log=False)
+    else:
+        app = create_app()
+        init_api_docs(app)
+
+        if SERVER == 'gunicorn':
+            from home_automation.server import run_gunicorn
+
+            run_gunicorn(app,
+                         port=app.config['PORT'],
+                         threads=app.config['SERVER_THREADS'],
+                         keepalive=app.config['SERVER_KEEPALIVE'],
+                         timeout=app.config['SERVER_TIMEOUT'],
+                         graceful_timeout=app.config['SERVER_GRACEFUL_TIMEOUT'],
+                         max_requests=app.config['SERVER_MAX_REQUESTS'],
+                         log_listener=log_listener
+                         )
+        else:
+            app.run(port=app.config['PORT'], host="0.0.0.0")
@@ -0,0 +1,246 @@
+""" Benchmark of every API endpoint against a real SQLite database
+
+Every device count runs in its own process with a fresh temporary database,
+seeded with lights, thermostats and thermostat temperature history. Each route
+is driven through the Flask test client and through a real socket served by
+a threaded Werkzeug server.
+
+    python -m benchmarks.bench_api --devices 100,1000,10000
+    python -m benchmarks.bench_api --devices 1000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_api --devices 1000 --baseline benchmarks/baseline.json --tolerance 0.25
+
+With --baseline the run fails when p95 latency of a route grows more than
+tolerance over the stored one. The events stream is long lived and not measured.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def _routes(devices):
+    """ (name, method, path factory, body factory) of every route """
+    def id():
+        return random.randint(1, devices)
+
+    return [
+        ('lights.get_lights', 'GET', lambda: '/api/v1/lights', None),
+        ('lights.get_lights.page', 'GET', lambda: '/api/v1/lights?limit=100', None),
+        ('lights.get_lights.filtered', 'GET', lambda: '/api/v1/lights?status=1&sort=-name&limit=100', None),
+        ('lights.get_light', 'GET', lambda: f'/api/v1/lights/{id()}', None),
+        ('lights.export_lights', 'GET', lambda: '/api/v1/lights/export', None),
+        ('lights.save_light', 'POST', lambda: '/api/v1/lights', lambda: {'name': 'Bench light', 'status': 1}),
+        ('lights.save_lights', 'POST', lambda: '/api/v1/lights/bulk',
+         lambda: [{'name': 'Bench light', 'status': 0}] * 10),
+        ('lights.on_light', 'PUT', lambda: f'/api/v1/lights/{id()}/on', None),
+        ('lights.off_light', 'PUT', lambda: f'/api/v1/lights/{id()}/off', None),
+        ('lights.on_lights', 'PUT', lambda: '/api/v1/lights/on', lambda: {'ids': [id() for _ in range(10)]}),
+        ('lights.off_lights', 'PUT', lambda: '/api/v1/lights/off', lambda: {'ids': [id() for _ in range(10)]}),
+        ('lights.update_name', 'PUT', lambda: f'/api/v1/lights/{id()}/name', lambda: {'name': 'Bench light'}),
+        ('lights.remove_light', 'DELETE', lambda: f'/api/v1/lights/{devices + random.randint(1, devices)}', None),
+        ('thermostats.get_thermostats', 'GET', lambda: '/api/v1/thermostats', None),
+        ('thermostats.get_thermostats.page', 'GET', lambda: '/api/v1/thermostats?limit=100', None),
+        ('thermostats.get_thermostats.filtered', 'GET', lambda: '/api/v1/thermostats?temp_gte=25&sort=-temp', None),
+        ('thermostats.get_thermostat', 'GET', lambda: f'/api/v1/thermostats/{id()}', None),
+        ('thermostats.export_thermostats', 'GET', lambda: '/api/v1/thermostats/export', None),
+        ('thermostats.get_temp_history', 'GET', lambda: f'/api/v1/thermostats/{id()}/history?bucket=1h', None),
+        ('thermostats.save_thermostat', 'POST', lambda: '/api/v1/thermostats',
+         lambda: {'name': 'Bench thermostat', 'temp': 20}),
+        ('thermostats.save_thermostats', 'POST', lambda: '/api/v1/thermostats/bulk',
+         lambda: [{'name': 'Bench thermostat', 'temp': 20}] * 10),
+        ('thermostats.update_temp', 'PUT', lambda: f'/api/v1/thermostats/{id()}/temp',
+         lambda: {'temp': random.randint(1, 30)}),
+        ('thermostats.update_name', 'PUT', lambda: f'/api/v1/thermostats/{id()}/name',
+         lambda: {'name': 'Bench thermostat'}),
+        ('thermostats.remove_thermostat', 'DELETE',
+         lambda: f'/api/v1/thermostats/{devices + random.randint(1, devices)}', None),
+        ('batch.run_batch', 'POST', lambda: '/api/v1/batch',
+         lambda: [{'op': 'lights.on', 'id': id()}, {'op': 'thermostats.update_temp', 'id': id(), 'temp': 21}]),
+        ('search.search_devices', 'GET', lambda: f'/api/v1/search?q=light+{id()}', None),
+        ('search.search_devices.broad', 'GET', lambda: '/api/v1/search?q=th', None),
+        ('changes.get_changes', 'GET', lambda: '/api/v1/changes?limit=100', None),
+        ('stats.get_cache_stats', 'GET', lambda: '/api/v1/stats/cache', None),
+        ('stats.get_query_stats', 'GET', lambda: '/api/v1/stats/queries', None),
+        ('metrics.get_metrics', 'GET', lambda: '/metrics', None)
+    ]
+
+
+def _seed(db_path, devices, history):
+    conn = sqlite3.connect(db_path)
+    creation_date = datetime.now()
+    conn.executemany("""INSERT INTO lights(name, status, creation_date) VALUES(?, ?, ?)""",
+                     ((f'Light {i}', i % 2, creation_date) for i in range(devices)))
+    conn.executemany("""INSERT INTO thermostats(name, temp, creation_date) VALUES(?, ?, ?)""",
+                     ((f'Thermostat {i}', i % 30, creation_date) for i in range(devices)))
+    now = int(time.time())
+    conn.executemany("""INSERT INTO thermostat_temps(thermostat_id, recorded_at, temp) VALUES(?, ?, ?)""",
+                     ((id, now - reading * 600, reading % 30)
+                      for id in range(1, devices + 1) for reading in range(history)))
+    conn.commit()
+    conn.close()
+
+
+def _percentile(latencies, percent):
+    index = min(len(latencies) - 1, int(round(percent / 100 * (len(latencies) - 1))))
+    return latencies[index]
+
+
+def _measure(send, routes, requests, warmup):
+    results = {}
+    for name, method, path, body in routes:
+        for _ in range(warmup):
+            send(method, path(), body() if body else None)
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            status = send(method, path(), body() if body else None)
+            latencies.append(time.perf_counter() - request_start)
+            if status >= 500:
+                raise RuntimeError(f'{name} failed with status {status}')
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        results[name] = {
+            'throughput': requests / elapsed,
+            'p50_ms': _percentile(latencies, 50) * 1000,
+            'p95_ms': _percentile(latencies, 95) * 1000,
+            'p99_ms': _percentile(latencies, 99) * 1000
+        }
+    return results
+
+
+def _client_sender(app):
+    client = app.test_client()
+
+    def send(method, path, body):
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        response.close()
+        return response.status_code
+    return send
+
+
+def _socket_sender(app):
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    def send(method, path, body):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        headers = {}
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status
+    return send, server
+
+
+def run_one(devices, requests, warmup, history):
+    """ runs in a process whose DB_PATH points to a fresh database """
+    from home_automation.app_factory import create_app
+    from home_automation.database.database import create_database
+
+    create_database()
+    _seed(os.environ['DB_PATH'], devices, history)
+    app = create_app()
+    routes = _routes(devices)
+
+    results = {'client': _measure(_client_sender(app), routes, requests, warmup)}
+    send, server = _socket_sender(app)
+    try:
+        results['socket'] = _measure(send, routes, requests, warmup)
+    finally:
+        server.shutdown()
+    return results
+
+
+def _run_process(devices, args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DB_PATH=os.path.join(directory, 'bench.db'))
+        command = [sys.executable, '-m', 'benchmarks.bench_api', '--run-one', '--devices', str(devices),
+                   '--requests', str(args.requests), '--warmup', str(args.warmup), '--history', str(args.history)]
+        output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE).stdout
+    # the result is the last line, database setup may print before it
+    return json.loads(output.splitlines()[-1])
+
+
+def _report(results):
+    print(f'{"devices":>8} {"driver":<7} {"route":<36} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for devices, drivers in results.items():
+        for driver, routes in drivers.items():
+            for name, stats in routes.items():
+                print(f'{devices:>8} {driver:<7} {name:<36} {stats["throughput"]:>9.1f} {stats["p50_ms"]:>8.2f} '
+                      f'{stats["p95_ms"]:>8.2f} {stats["p99_ms"]:>8.2f}')
+
+
+def _regressions(results, baseline, tolerance):
+    regressions = []
+    for devices, drivers in results.items():
+        for driver, routes in drivers.items():
+            for name, stats in routes.items():
+                expected = baseline.get(devices, {}).get(driver, {}).get(name)
+                if expected and stats['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+                    regressions.append(f'{devices} {driver} {name}: p95 {stats["p95_ms"]:.2f} ms, '
+                                       f'baseline {expected["p95_ms"]:.2f} ms')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API endpoint against a real SQLite database')
+    parser.add_argument('--devices', default='100,1000,10000',
+                        help='comma separated numbers of lights and of thermostats to seed, 100 to 100000')
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=20, help='requests per route before measuring')
+    parser.add_argument('--history', type=int, default=24, help='temperature readings seeded per thermostat')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='fail when p95 of a route regresses over this stored result')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 regression, 0.2 is 20%%')
+    parser.add_argument('--save-baseline', help='store results as baseline')
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # request logging is not part of what is measured here
+    logging.disable(logging.CRITICAL)
+
+    if args.run_one:
+        print(json.dumps(run_one(int(args.devices), args.requests, args.warmup, args.history)))
+        return 0
+
+    results = {devices.strip(): _run_process(int(devices), args) for devices in args.devices.split(',')}
+    _report(results)
+
+    for filename in filter(None, (args.output, args.save_baseline)):
+        with open(filename, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = _regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
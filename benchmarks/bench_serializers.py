@@ -0,0 +1,116 @@
+""" Row building and JSON encoding of collection responses
+
+Compares sqlite3.Row copied into dicts with plain tuples zipped into dicts,
+the stdlib json encoder with orjson, GET /api/v1/lights end to end through
+the Flask test client with each JSON backend, and size and client decode time
+of every representation negotiated by Accept.
+
+    python -m benchmarks.bench_serializers --rows 100000
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_api import _seed
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+
+    def row_copy():
+        return [dict(row) for row in conn.execute("""SELECT * FROM lights""").fetchall()]
+
+    def tuple_zip():
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute("""SELECT * FROM lights""")
+        fields = [column[0] for column in cur.description]
+        return [dict(zip(fields, row)) for row in cur.fetchall()]
+
+    return row_copy, tuple_zip
+
+
+def run(rows, repeat):
+    from home_automation.app_factory import create_app
+    from home_automation.controllers.negotiation import _offered, msgpack
+    from home_automation.database.database import create_database
+    from home_automation.model.model import cache
+    from home_automation.serializers import JSONSerializer, get_serializer
+
+    create_database()
+    _seed(os.environ['DB_PATH'], rows, 0)
+
+    results = {}
+    sizes = {}
+    row_copy, tuple_zip = _rows(os.environ['DB_PATH'])
+    results['rows sqlite3.Row -> dict'] = _best(row_copy, repeat)
+    results['rows tuple -> dict'] = _best(tuple_zip, repeat)
+
+    res = tuple_zip()
+    serializers = {'json': JSONSerializer(), 'orjson': get_serializer('orjson')}
+    for name, serializer in serializers.items():
+        results[f'encode {name}'] = _best(lambda: serializer.dumps(res), repeat)
+
+    app = create_app()
+    client = app.test_client()
+    for name, serializer in serializers.items():
+        app.extensions['serializer'] = serializer
+
+        def get():
+            cache.clear()
+            client.get('/api/v1/lights').get_data()
+        results[f'GET /api/v1/lights {name}'] = _best(get, repeat)
+
+    for mimetype in _offered():
+        body = client.get('/api/v1/lights', headers={'Accept': mimetype}).get_data()
+        decode = msgpack.unpackb if mimetype.endswith('msgpack') else json.loads
+        name = mimetype.split('/')[1].replace('vnd.home-automation.', '')
+        results[f'decode {name}'] = _best(lambda: decode(body), repeat)
+        sizes[name] = len(body)
+
+    return results, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row building and JSON encoding of collection responses')
+    parser.add_argument('--rows', type=int, default=10000, help='number of lights to seed')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement, the best one is reported')
+    args = parser.parse_args()
+
+    # slow query log and request logging are not part of what is measured here
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # settings are read on import, DB_PATH has to be set before
+        os.environ['DB_PATH'] = os.path.join(directory, 'bench.db')
+        results, sizes = run(args.rows, args.repeat)
+
+    print(f'{"rows":>8} {"measurement":<32} {"best ms":>9}')
+    for name, elapsed in results.items():
+        print(f'{args.rows:>8} {name:<32} {elapsed:>9.2f}')
+
+    print(f'\n{"rows":>8} {"representation":<32} {"bytes":>9}')
+    for name, size in sizes.items():
+        print(f'{args.rows:>8} {name:<32} {size:>9}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+""" Throughput of app.py under concurrent clients for each SERVER setting
+
+Every server runs app.py in its own process on a fresh temporary database.
+Clients keep their connection alive where the server allows it and send a mix
+of single device reads, page reads and status updates for --duration seconds.
+
+    python -m benchmarks.bench_server --servers dev,gunicorn --concurrency 16 --duration 10
+
+Environment settings such as SERVER_THREADS are passed on.
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_api import _percentile, _seed
+
+ROOT_DIR = Path(__file__).parent.parent.absolute()
+
+
+def _requests(devices):
+    return [
+        lambda: ('GET', f'/api/v1/lights/{random.randint(1, devices)}'),
+        lambda: ('GET', f'/api/v1/thermostats/{random.randint(1, devices)}'),
+        lambda: ('GET', '/api/v1/lights?limit=100'),
+        lambda: ('PUT', f'/api/v1/lights/{random.randint(1, devices)}/{random.choice(("on", "off"))}')
+    ]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/metrics')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Server did not start in time')
+
+
+def _client(port, requests, stop, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    while not stop.is_set():
+        method, path = random.choice(requests)()
+        start = time.perf_counter()
+        try:
+            conn.request(method, path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(e)
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run_server(server, args):
+    with tempfile.TemporaryDirectory() as directory:
+        port = _free_port()
+        db_path = os.path.join(directory, 'bench.db')
+        env = dict(os.environ, SERVER=server, PORT=str(port), DB_PATH=db_path, DEBUG='false')
+        (ROOT_DIR / 'logs').mkdir(exist_ok=True)
+        process = subprocess.Popen([sys.executable, 'app.py'], cwd=ROOT_DIR, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_ready(port, process)
+            _seed(db_path, args.devices, 0)
+
+            stop = threading.Event()
+            latencies, errors = [], []
+            clients = [threading.Thread(target=_client, args=(port, _requests(args.devices), stop, latencies, errors))
+                       for _ in range(args.concurrency)]
+            for client in clients:
+                client.start()
+            time.sleep(args.duration)
+            stop.set()
+            for client in clients:
+                client.join()
+        finally:
+            process.terminate()
+            process.wait()
+
+    latencies.sort()
+    return {
+        'throughput': len(latencies) / args.duration,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'errors': len(errors)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of app.py under concurrent clients')
+    parser.add_argument('--servers', default='dev,gunicorn', help='comma separated SERVER settings to compare')
+    parser.add_argument('--devices', type=int, default=1000, help='number of lights and of thermostats to seed')
+    parser.add_argument('--concurrency', type=int, default=16, help='number of concurrent clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per server')
+    args = parser.parse_args()
+
+    print(f'{"server":<10} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8} {"errors":>7}')
+    for server in args.servers.split(','):
+        stats = run_server(server.strip(), args)
+        print(f'{server:<10} {stats["throughput"]:>9.1f} {stats["p50_ms"]:>8.2f} {stats["p99_ms"]:>8.2f} '
+              f'{stats["errors"]:>7}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+""" Cold start of the Flask app
+
+Every run starts a fresh interpreter and times importing the app factory,
+create_app(), enabling API docs, migrating a new database, the first API
+request and the first docs requests. Docs are built on the first /apidocs request, that phase is about
+what wrapping the app in Swagger(app) added to every start before.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --save-baseline benchmarks/startup.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup.json --tolerance 0.25
+    python -m benchmarks.bench_startup --top 15
+
+With --baseline the run fails when the median of a phase grows more than
+tolerance over the stored one. --top lists the slowest imports of one run.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _elapsed(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def run_one():
+    """ runs in a fresh process, milliseconds of every startup phase """
+    results = {}
+
+    start = time.perf_counter()
+    from home_automation.app_factory import create_app
+    results['import app_factory'] = _elapsed(start)
+
+    start = time.perf_counter()
+    app = create_app()
+    results['create_app()'] = _elapsed(start)
+
+    from home_automation.apidocs import init_app as init_api_docs
+    start = time.perf_counter()
+    init_api_docs(app)
+    results['init api docs'] = _elapsed(start)
+
+    from home_automation.database.database import create_database
+    start = time.perf_counter()
+    create_database()
+    results['create_database()'] = _elapsed(start)
+
+    client = app.test_client()
+
+    start = time.perf_counter()
+    client.get('/api/v1/lights')
+    results['first GET /api/v1/lights'] = _elapsed(start)
+
+    start = time.perf_counter()
+    client.get('/apidocs/')
+    client.get('/apispec_1.json')
+    results['first GET /apidocs'] = _elapsed(start)
+
+    return results
+
+
+def _run_process(env):
+    command = [sys.executable, '-m', 'benchmarks.bench_startup', '--run-one']
+    output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE).stdout
+    # the result is the last line, database setup may print before it
+    return json.loads(output.splitlines()[-1])
+
+
+def _importtime(env, top):
+    """ slowest imports of the app factory by cumulative time, as reported by -X importtime """
+    command = [sys.executable, '-X', 'importtime', '-c', 'import home_automation.app_factory']
+    stderr = subprocess.run(command, env=env, check=True, stderr=subprocess.PIPE, universal_newlines=True).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative_us) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def _regressions(results, baseline, tolerance):
+    regressions = []
+    for name, stats in results.items():
+        expected = baseline.get(name)
+        if expected and stats['median_ms'] > expected['median_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: median {stats["median_ms"]:.1f} ms, baseline {expected["median_ms"]:.1f} ms')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start of the Flask app')
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes started')
+    parser.add_argument('--top', type=int, default=0, help='list the slowest imports of the app factory')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='fail when the median of a phase regresses over this stored result')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed median regression, 0.2 is 20%%')
+    parser.add_argument('--save-baseline', help='store results as baseline')
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # request logging is not part of what is measured here
+    logging.disable(logging.CRITICAL)
+
+    if args.run_one:
+        print(json.dumps(run_one()))
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        # a new database every run, create_database() migrates it from scratch
+        runs = [_run_process(dict(os.environ, DB_PATH=os.path.join(directory, f'bench{run}.db')))
+                for run in range(args.runs)]
+        imports = _importtime(os.environ, args.top) if args.top else []
+
+    results = {name: {'median_ms': statistics.median(run[name] for run in runs),
+                      'max_ms': max(run[name] for run in runs)} for name in runs[0]}
+
+    print(f'{"phase":<28} {"median ms":>10} {"max ms":>10}')
+    for name, stats in results.items():
+        print(f'{name:<28} {stats["median_ms"]:>10.1f} {stats["max_ms"]:>10.1f}')
+
+    if imports:
+        print(f'\n{"module":<48} {"cumulative ms":>14}')
+        for cumulative_ms, name in imports:
+            print(f'{name:<48} {cumulative_ms:>14.1f}')
+
+    for filename in filter(None, (args.output, args.save_baseline)):
+        with open(filename, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = _regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
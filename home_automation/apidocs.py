@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# routes registered by flasgger with its default config
+DOCS_PATHS = ('/apidocs', '/apispec_', '/flasgger_static')
+
+
+def create_docs_app():
+    """ second app of the same routes with flasgger attached, its specs are parsed once and cached """
+    from flasgger import Swagger
+
+    from home_automation.app_factory import create_app
+
+    start = time.perf_counter()
+    app = create_app()
+    # flasgger rebuilds specs on every request in debug mode
+    app.debug = False
+    Swagger(app)
+    logger.info(f'API docs built in {(time.perf_counter() - start) * 1000:.0f} ms')
+    return app
+
+
+class LazyApiDocs():
+    """ WSGI dispatcher in front of the API app serving Swagger UI on /apidocs
+    flasgger and the YAML specs in the docstrings of the controllers are loaded
+    on the first docs request only, processes which never serve docs never pay for them.
+    The docs live in an app of their own, routes can not be added to the API app
+    once it has handled a request.
+    """
+
+    def __init__(self, wsgi_app, create_docs_app=create_docs_app):
+        self.wsgi_app = wsgi_app
+        self.create_docs_app = create_docs_app
+        self._docs_app = None
+        self._lock = threading.Lock()
+
+    def _get_docs_app(self):
+        if self._docs_app is None:
+            with self._lock:
+                if self._docs_app is None:
+                    self._docs_app = self.create_docs_app()
+        return self._docs_app
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(DOCS_PATHS):
+            return self._get_docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_app(app):
+    """ serves API docs on /apidocs when API_DOCS is enabled """
+    if app.config['API_DOCS']:
+        app.wsgi_app = LazyApiDocs(app.wsgi_app)
@@ -1,15 +1,33 @@
 from flask import Flask
 from flask_cors import CORS
 
+from home_automation.compression import init_app as init_compression
+from home_automation.controllers.batch import batch
+from home_automation.controllers.changes import changes
+from home_automation.controllers.events import events
 from home_automation.controllers.lights import lights
+from home_automation.controllers.metrics import metrics
+from home_automation.controllers.search import search
+from home_automation.controllers.stats import stats
 from home_automation.controllers.thermostats import thermostats
+from home_automation.metrics import init_app as init_metrics
+from home_automation.serializers import init_app as init_serializers
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('home_automation.settings')
     CORS(app, resources={r'/*': {'origins': app.config['ALLOWED_CORS_ORIGINS']}})
+    init_serializers(app)
+    init_metrics(app)
+    init_compression(app)
     app.register_blueprint(lights, url_prefix='/api/v1/lights')
     app.register_blueprint(thermostats, url_prefix='/api/v1/thermostats')
+    app.register_blueprint(search, url_prefix='/api/v1/search')
+    app.register_blueprint(stats, url_prefix='/api/v1/stats')
+    app.register_blueprint(batch, url_prefix='/api/v1/batch')
+    app.register_blueprint(changes, url_prefix='/api/v1/changes')
+    app.register_blueprint(events, url_prefix='/api/v1/events')
+    app.register_blueprint(metrics)
 
     return app
@@ -0,0 +1,61 @@
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Route
+
+from home_automation import settings
+from home_automation.compression import compressor
+from home_automation.asgi import events, lights, thermostats
+from home_automation.asgi.compression import CompressionMiddleware
+from home_automation.asgi.responses import respond
+from home_automation.controllers.handlers.common import message
+
+
+def _routes(prefix, routes):
+    for path, endpoint, methods in routes:
+        path = prefix + path.rstrip('/')
+        # both with and without trailing slash, like strict_slashes=False of the Flask app
+        yield Route(path, endpoint, methods=methods)
+        yield Route(path + '/', endpoint, methods=methods)
+
+
+async def _http_exception(request, exc):
+    return respond(message(exc.detail, exc.status_code))
+
+
+class _Lifespan():
+    def __init__(self, app):
+        pass
+
+    async def __aenter__(self):
+        events.notifier.start()
+
+    async def __aexit__(self, *exc_info):
+        events.notifier.stop()
+
+
+def create_app():
+    """ asyncio app with the lights, thermostats and events routes of the Flask app """
+    routes = [
+        *_routes('/api/v1/lights', lights.routes),
+        *_routes('/api/v1/thermostats', thermostats.routes),
+        *_routes('/api/v1/events', events.routes)
+    ]
+    origins = [origin.strip() for origin in settings.ALLOWED_CORS_ORIGINS.split(',')]
+    middleware = [Middleware(CORSMiddleware, allow_origins=origins, allow_methods=['*'], allow_headers=['*'])]
+    if settings.COMPRESSION_ENABLED:
+        compressor.min_size = settings.COMPRESSION_MIN_SIZE
+        compressor.gzip_level = settings.COMPRESSION_GZIP_LEVEL
+        compressor.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY
+        compressor.cache_size = settings.COMPRESSION_CACHE_SIZE
+        middleware.append(Middleware(CompressionMiddleware))
+
+    app = Starlette(debug=settings.DEBUG,
+                    routes=routes,
+                    middleware=middleware,
+                    exception_handlers={HTTPException: _http_exception},
+                    lifespan=_Lifespan)
+    app.state.config = {name: getattr(settings, name) for name in dir(settings) if name.isupper()}
+
+    return app
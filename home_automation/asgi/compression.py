@@ -0,0 +1,70 @@
+from starlette.datastructures import Headers, MutableHeaders
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag, unquote_etag
+
+from home_automation.compression import ETAG_SUFFIXES, compressor, encodings
+
+
+class CompressionMiddleware():
+    """ ASGI counterpart of the after_request hook of home_automation.compression
+    Only responses sent in a single body message are compressed, streamed
+    exports and server-sent events pass through untouched.
+    """
+
+    def __init__(self, app, compressor=compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = parse_accept_header(request_headers.get('accept-encoding')).best_match(encodings())
+        if_none_match = parse_etags(request_headers.get('if-none-match'))
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            response_start, start = start, None
+            headers = MutableHeaders(scope=response_start)
+            if response_start['status'] == 304:
+                _not_modified(headers, if_none_match)
+            elif (response_start['status'] == 200 and not message.get('more_body', False) and
+                  'content-encoding' not in headers and len(message.get('body', b'')) >= self.compressor.min_size):
+                message = self._compress(message, headers, encoding)
+            await send(response_start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, message, headers, encoding):
+        headers.add_vary_header('Accept-Encoding')
+        if encoding is None:
+            return message
+
+        etag, weak = unquote_etag(headers.get('etag'))
+        body = self.compressor.compress(message['body'], encoding, etag)
+        headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(body))
+        if etag is not None:
+            headers['ETag'] = quote_etag(etag + ETAG_SUFFIXES[encoding], weak)
+        return {**message, 'body': body}
+
+
+def _not_modified(headers, if_none_match):
+    # the client revalidates the compressed representation, keep its tag
+    etag, weak = unquote_etag(headers.get('etag'))
+    if etag is None:
+        return
+    for suffix in ETAG_SUFFIXES.values():
+        if if_none_match.contains(etag + suffix):
+            headers['ETag'] = quote_etag(etag + suffix, weak)
+            return
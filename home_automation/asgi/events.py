@@ -0,0 +1,84 @@
+import asyncio
+import logging
+
+from starlette.responses import StreamingResponse
+
+from home_automation.controllers.events import SSE_MIMETYPE, format_event, parse_last_event_id
+from home_automation.model.model import change_feed, versions
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeNotifier():
+    """ Wakes every event stream of the event loop when the change feed gets a change
+    One change feed listener serves all streams, a waiting stream costs one future.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._event = None
+
+    def start(self):
+        self._loop = asyncio.get_event_loop()
+        self._event = asyncio.Event()
+        change_feed.subscribe(self._published)
+
+    def stop(self):
+        change_feed.unsubscribe(self._published)
+
+    def _published(self):
+        # called from the writing thread
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+notifier = ChangeNotifier()
+
+
+async def get_events(request):
+    last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+    last_id = parse_last_event_id(last_event_id)
+    keepalive = request.app.state.config['CHANGE_FEED_KEEPALIVE']
+    logger.info(f'[GET] Events stream opened last event id: {last_event_id}')
+
+    async def generate():
+        nonlocal last_id
+        yield f'retry: {int(keepalive * 1000)}\n\n'
+        if last_id is None:
+            last_id = change_feed.last_id
+            yield f'id: {versions.epoch}-{last_id}\nevent: reset\ndata: {{}}\n\n'
+
+        while True:
+            changes = change_feed.wait(last_id, 0)
+            if not changes:
+                await notifier.wait(keepalive)
+                changes = change_feed.wait(last_id, 0)
+            if not changes:
+                yield ': keep-alive\n\n'
+                continue
+            if changes[0]['seq'] > last_id + 1:
+                # client fell behind more than the replay buffer
+                last_id = change_feed.last_id
+                yield f'id: {versions.epoch}-{last_id}\nevent: reset\ndata: {{}}\n\n'
+                continue
+            for event in changes:
+                yield format_event(event)
+            last_id = changes[-1]['seq']
+
+    return StreamingResponse(generate(), media_type=SSE_MIMETYPE,
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# (path, endpoint, methods) under /api/v1/events
+routes = [
+    ('/', get_events, ['GET'])
+]
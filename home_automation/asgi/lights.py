@@ -0,0 +1,86 @@
+import logging
+
+from home_automation.asgi.responses import api_request, get_json, ndjson_response, read_items, respond, run
+from home_automation.controllers.handlers import lights as handlers
+from home_automation.controllers.handlers.common import message, read_items_error
+from home_automation.model.model_factory import get_async_model_lights, get_model_lights
+
+logger = logging.getLogger(__name__)
+
+
+async def get_lights(request):
+    return respond(await run(handlers.get_lights, get_model_lights(), api_request(request)))
+
+
+async def export_lights(request):
+    res = None
+    try:
+        batch_size = request.app.state.config['EXPORT_BATCH_SIZE']
+        res = await ndjson_response(get_async_model_lights().iterate('iter_lights', batch_size=batch_size))
+        logger.info('[GET] Lights export')
+    except Exception:
+        logger.exception('[GET] Lights export exception')
+        return respond(message('Unexpected error occured while exporting lights', 500))
+
+    return res
+
+
+async def get_light(request):
+    return respond(await run(handlers.get_light, get_model_lights(), api_request(request),
+                             request.path_params['id']))
+
+
+async def save_light(request):
+    return respond(await run(handlers.save_light, get_model_lights(), await get_json(request)))
+
+
+async def save_lights(request):
+    try:
+        items = await read_items(request, request.app.state.config['BULK_MAX_BATCH_SIZE'])
+    except ValueError as e:
+        return respond(read_items_error('Lights', e))
+
+    return respond(await run(handlers.save_lights, get_model_lights(), items))
+
+
+async def remove_light(request):
+    return respond(await run(handlers.remove_light, get_model_lights(), request.path_params['id']))
+
+
+async def on_light(request):
+    return respond(await run(handlers.update_status, get_model_lights(), api_request(request),
+                             request.path_params['id'], 1, 'on'))
+
+
+async def off_light(request):
+    return respond(await run(handlers.update_status, get_model_lights(), api_request(request),
+                             request.path_params['id'], 0, 'off'))
+
+
+async def on_lights(request):
+    return respond(await run(handlers.update_status_many, get_model_lights(), await get_json(request), 1, 'on'))
+
+
+async def off_lights(request):
+    return respond(await run(handlers.update_status_many, get_model_lights(), await get_json(request), 0, 'off'))
+
+
+async def update_name(request):
+    return respond(await run(handlers.update_name, get_model_lights(), request.path_params['id'],
+                             await get_json(request)))
+
+
+# (path, endpoint, methods) under /api/v1/lights
+routes = [
+    ('/', get_lights, ['GET']),
+    ('/', save_light, ['POST']),
+    ('/export', export_lights, ['GET']),
+    ('/bulk', save_lights, ['POST']),
+    ('/on', on_lights, ['PUT']),
+    ('/off', off_lights, ['PUT']),
+    ('/{id:int}', get_light, ['GET']),
+    ('/{id:int}', remove_light, ['DELETE']),
+    ('/{id:int}/on', on_light, ['PUT']),
+    ('/{id:int}/off', off_light, ['PUT']),
+    ('/{id:int}/name', update_name, ['PUT'])
+]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+from functools import partial
+
+from starlette.exceptions import HTTPException
+from starlette.responses import Response, StreamingResponse
+
+from home_automation.controllers.handlers.common import ApiRequest
+from home_automation.controllers.handlers.items import NDJSON_MIMETYPE, NdjsonItems, json_items, ndjson_line
+from home_automation.model.async_model import executor
+from home_automation.serializers import JSON_MIMETYPE
+
+logger = logging.getLogger(__name__)
+
+
+def api_request(request):
+    """ what handlers read of a Starlette request """
+    return ApiRequest(request.query_params, request.query_params.multi_items(), str(request.url.replace(query='')),
+                      request.headers, request.app.state.config)
+
+
+def respond(result):
+    """ Starlette response of a handler Result """
+    return Response(result.body, status_code=result.status, headers=dict(result.headers),
+                    media_type=result.mimetype)
+
+
+async def run(handler, *args):
+    """ runs a handler on the executor of the asyncio model, handlers make blocking SQLite calls """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, partial(handler, *args))
+
+
+def _mimetype(request):
+    return request.headers.get('content-type', '').split(';')[0].strip().lower()
+
+
+def _is_json(mimetype):
+    return mimetype == JSON_MIMETYPE or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+
+async def get_json(request):
+    """ like Flask request.get_json(), None unless the body is sent as JSON
+    :raises HTTPException: 400 when the body is not valid JSON
+    """
+    if not _is_json(_mimetype(request)):
+        return None
+
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(400, 'Failed to decode JSON object')
+
+
+async def read_items(request, max_items):
+    """ reads request body sent either as a JSON array or as NDJSON (application/x-ndjson)
+    :raises TooManyItems: when the body has more than max_items
+    :raises ValueError: when the body can not be parsed
+    """
+    if _mimetype(request) == NDJSON_MIMETYPE:
+        items = NdjsonItems(max_items)
+        async for chunk in request.stream():
+            items.feed(chunk)
+        return items.close()
+
+    return json_items(await get_json(request), max_items)
+
+
+async def ndjson_response(rows):
+    """ streams rows of an async iterator as newline delimited JSON while they are read
+        the first row is read eagerly so database errors surface before the response starts
+    """
+    first = []
+    async for row in rows:
+        first.append(row)
+        break
+
+    async def generate():
+        try:
+            for row in first:
+                yield ndjson_line(row)
+            async for row in rows:
+                yield ndjson_line(row)
+        except Exception:
+            logger.exception('NDJSON stream interrupted')
+            raise
+
+    return StreamingResponse(generate(), media_type=NDJSON_MIMETYPE)
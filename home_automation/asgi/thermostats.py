@@ -0,0 +1,76 @@
+import logging
+
+from home_automation.asgi.responses import api_request, get_json, ndjson_response, read_items, respond, run
+from home_automation.controllers.handlers import thermostats as handlers
+from home_automation.controllers.handlers.common import message, read_items_error
+from home_automation.model.model_factory import get_async_model_thermostats, get_model_thermostats
+
+logger = logging.getLogger(__name__)
+
+
+async def get_thermostats(request):
+    return respond(await run(handlers.get_thermostats, get_model_thermostats(), api_request(request)))
+
+
+async def export_thermostats(request):
+    res = None
+    try:
+        batch_size = request.app.state.config['EXPORT_BATCH_SIZE']
+        res = await ndjson_response(get_async_model_thermostats().iterate('iter_thermostats', batch_size=batch_size))
+        logger.info('[GET] Thermostats export')
+    except Exception:
+        logger.exception('[GET] Thermostats export exception')
+        return respond(message('Unexpected error occured while exporting thermostats', 500))
+
+    return res
+
+
+async def get_thermostat(request):
+    return respond(await run(handlers.get_thermostat, get_model_thermostats(), api_request(request),
+                             request.path_params['id']))
+
+
+async def save_thermostat(request):
+    return respond(await run(handlers.save_thermostat, get_model_thermostats(), await get_json(request)))
+
+
+async def save_thermostats(request):
+    try:
+        items = await read_items(request, request.app.state.config['BULK_MAX_BATCH_SIZE'])
+    except ValueError as e:
+        return respond(read_items_error('Thermostats', e))
+
+    return respond(await run(handlers.save_thermostats, get_model_thermostats(), items))
+
+
+async def remove_thermostat(request):
+    return respond(await run(handlers.remove_thermostat, get_model_thermostats(), request.path_params['id']))
+
+
+async def update_temp(request):
+    return respond(await run(handlers.update_temp, get_model_thermostats(), api_request(request),
+                             request.path_params['id'], await get_json(request)))
+
+
+async def get_temp_history(request):
+    return respond(await run(handlers.get_temp_history, get_model_thermostats(), api_request(request),
+                             request.path_params['id']))
+
+
+async def update_name(request):
+    return respond(await run(handlers.update_name, get_model_thermostats(), request.path_params['id'],
+                             await get_json(request)))
+
+
+# (path, endpoint, methods) under /api/v1/thermostats
+routes = [
+    ('/', get_thermostats, ['GET']),
+    ('/', save_thermostat, ['POST']),
+    ('/export', export_thermostats, ['GET']),
+    ('/bulk', save_thermostats, ['POST']),
+    ('/{id:int}', get_thermostat, ['GET']),
+    ('/{id:int}', remove_thermostat, ['DELETE']),
+    ('/{id:int}/temp', update_temp, ['PUT']),
+    ('/{id:int}/history', get_temp_history, ['GET']),
+    ('/{id:int}/name', update_name, ['PUT'])
+]
@@ -0,0 +1,129 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ETag suffix of every encoding, a compressed body is another representation
+ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+
+def encodings():
+    """ encodings offered in order of preference, brotli only when it is installed """
+    if brotli is None:
+        return ['gzip']
+    return ['br', 'gzip']
+
+
+def encoded_etags(etag):
+    """ :return: ETag of the identity representation followed by those of its compressed ones """
+    return [etag] + [etag + suffix for suffix in ETAG_SUFFIXES.values()]
+
+
+class Compressor():
+    """ gzip and brotli encoder with a bounded LRU cache of compressed bodies
+    Bodies with an ETag are cached under (etag, encoding). ETags carry the data
+    version, a poll of unchanged data is served without compressing it again.
+    :param min_size: bodies shorter than min_size bytes are sent uncompressed
+    :param cache_size: max number of cached bodies, 0 disables the cache
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_size=128):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def compress(self, body, encoding, etag=None):
+        if etag is None or not self.cache_size:
+            return self._compress(body, encoding)
+
+        key = (etag, encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = self._compress(body, encoding)
+
+        with self._lock:
+            self._entries[key] = compressed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.cache_size:
+                self._entries.popitem(last=False)
+
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+compressor = Compressor()
+
+
+def _not_modified(response):
+    # the client revalidates the compressed representation, keep its tag
+    etag, weak = response.get_etag()
+    if etag is None:
+        return response
+    for suffix in ETAG_SUFFIXES.values():
+        if request.if_none_match.contains(etag + suffix):
+            response.set_etag(etag + suffix, weak)
+            break
+    return response
+
+
+def _after_request(response):
+    if response.status_code == 304:
+        return _not_modified(response)
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed or
+            'Content-Encoding' in response.headers):
+        return response
+
+    body = response.get_data()
+    if len(body) < compressor.min_size:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(encodings())
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    response.set_data(compressor.compress(body, encoding, etag))
+    response.headers['Content-Encoding'] = encoding
+    if etag is not None:
+        response.set_etag(etag + ETAG_SUFFIXES[encoding], weak)
+    return response
+
+
+def init_app(app):
+    """ compresses responses of at least COMPRESSION_MIN_SIZE bytes with the best encoding the client accepts """
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+
+    compressor.min_size = app.config['COMPRESSION_MIN_SIZE']
+    compressor.gzip_level = app.config['COMPRESSION_GZIP_LEVEL']
+    compressor.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+    compressor.cache_size = app.config['COMPRESSION_CACHE_SIZE']
+    app.after_request(_after_request)
@@ -0,0 +1,178 @@
+import logging
+
+from flask import Blueprint, current_app, request
+
+from home_automation.controllers.validation import (validate_id, validate_light, validate_light_name,
+                                                    validate_thermostat, validate_thermostat_name,
+                                                    validate_thermostat_temp)
+from home_automation.model.model_factory import get_model_lights, get_model_thermostats, get_transaction
+from home_automation.serializers import jsonify
+
+batch = Blueprint('batch', __name__)
+
+logger = logging.getLogger(__name__)
+
+
+# every operation validates its fields and returns (model method, arguments, id),
+# id is None for create operations whose id is returned by the model method
+def _create_light(operation):
+    return get_model_lights().save_light, validate_light(operation), None
+
+
+def _delete_light(operation):
+    id = validate_id(operation.get('id'), 'Light')
+    return get_model_lights().delete_light, (id,), id
+
+
+def _on_light(operation):
+    id = validate_id(operation.get('id'), 'Light')
+    return get_model_lights().update_status, (id, 1), id
+
+
+def _off_light(operation):
+    id = validate_id(operation.get('id'), 'Light')
+    return get_model_lights().update_status, (id, 0), id
+
+
+def _update_light_name(operation):
+    id = validate_id(operation.get('id'), 'Light')
+    return get_model_lights().update_name, (id, validate_light_name(operation)), id
+
+
+def _create_thermostat(operation):
+    return get_model_thermostats().save_thermostat, validate_thermostat(operation), None
+
+
+def _delete_thermostat(operation):
+    id = validate_id(operation.get('id'), 'Thermostats')
+    return get_model_thermostats().delete_thermostat, (id,), id
+
+
+def _update_thermostat_temp(operation):
+    id = validate_id(operation.get('id'), 'Thermostats')
+    return get_model_thermostats().update_temp, (id, validate_thermostat_temp(operation)), id
+
+
+def _update_thermostat_name(operation):
+    id = validate_id(operation.get('id'), 'Thermostats')
+    return get_model_thermostats().update_name, (id, validate_thermostat_name(operation)), id
+
+
+OPERATIONS = {
+    'lights.create': _create_light,
+    'lights.delete': _delete_light,
+    'lights.on': _on_light,
+    'lights.off': _off_light,
+    'lights.update_name': _update_light_name,
+    'thermostats.create': _create_thermostat,
+    'thermostats.delete': _delete_thermostat,
+    'thermostats.update_temp': _update_thermostat_temp,
+    'thermostats.update_name': _update_thermostat_name
+}
+
+
+def _prepare(operation):
+    if not isinstance(operation, dict):
+        raise ValueError('Operation must be an object')
+
+    op = operation.get('op')
+    if op not in OPERATIONS:
+        raise ValueError(f'Unknown operation: {op}')
+
+    return OPERATIONS[op](operation)
+
+
+@batch.route('/', methods=['POST'], strict_slashes=False)
+def run_batch():
+    """Runs several operations atomically
+    All operations are validated first and then run in one transaction,
+    either all of them are applied or none
+    ---
+    tags: [Batch]
+    parameters:
+      - name: Operations
+        in: body
+        description: Fields of an operation are the ones of the matching single endpoint
+        schema:
+            type: array
+            items:
+                type: object
+                required:
+                  - op
+                properties:
+                  op:
+                    type: string
+                    enum: [lights.create, lights.delete, lights.on, lights.off, lights.update_name,
+                           thermostats.create, thermostats.delete, thermostats.update_temp,
+                           thermostats.update_name]
+                  id:
+                    type: integer
+                    minimum: 1
+                  name:
+                    type: string
+                  status:
+                    type: integer
+                    enum: [0, 1]
+                  temp:
+                    type: integer
+                    minimum: -300
+                    maximum: 300
+    responses:
+        200:
+            description: Result of every operation in request order
+            schema:
+                type: object
+                properties:
+                    results:
+                        type: array
+                        items:
+                            type: object
+                            properties:
+                                op:
+                                    type: string
+                                id:
+                                    type: integer
+        400:
+            description: Body is not an array or an operation is not valid, nothing applied
+            schema:
+                $ref: '#/definitions/Bad request'
+        413:
+            description: More operations than the configured max
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error, nothing applied
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    operations = request.get_json()
+
+    if not operations or not isinstance(operations, list):
+        logger.warning('[POST] Batch request body is not a non empty array')
+        return jsonify(message='Batch request body must be a non empty array of operations'), 400
+
+    max_operations = current_app.config['BATCH_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        logger.warning(f'[POST] Batch has more than {max_operations} operations')
+        return jsonify(message=f'Batch has more than {max_operations} operations'), 413
+
+    prepared = []
+    for index, operation in enumerate(operations):
+        try:
+            prepared.append(_prepare(operation))
+        except ValueError as e:
+            logger.warning(f'[POST] Batch incorrect operation {index}: {e}')
+            return jsonify(message=f'Operation {index}: {e}', index=index), 400
+
+    results = []
+    try:
+        with get_transaction():
+            for operation, (method, args, id) in zip(operations, prepared):
+                res = method(*args)
+                results.append({'op': operation['op'], 'id': res if id is None else id})
+        logger.info(f'[POST] Batch applied operations: {len(results)}')
+    except Exception:
+        logger.exception('[POST] Batch exception')
+        return jsonify(message='Unexpected error occured while running batch'), 500
+
+    return jsonify(results=results), 200
@@ -0,0 +1,98 @@
+import logging
+
+from flask import Blueprint, current_app, request
+
+from home_automation.controllers.validation import validate_changes_args
+from home_automation.model.model_factory import get_model_changes
+from home_automation.serializers import jsonify
+
+changes = Blueprint('changes', __name__)
+
+logger = logging.getLogger(__name__)
+
+
+@changes.route('/', methods=['GET'], strict_slashes=False)
+def get_changes():
+    """Returns lights and thermostats changed since a change sequence number
+    Every create, update and delete gets the next number of one sequence. Clients keep since
+    of the last response and pass it to the next request, a reconnect only reads what changed.
+    Deleted ids are applied before rows, an id created again after a delete is returned as a row
+    ---
+    tags: [Changes]
+    parameters:
+      - name: since
+        in: query
+        type: integer
+        minimum: 0
+        default: 0
+        description: since of the previous response, 0 returns every device
+      - name: limit
+        in: query
+        type: integer
+        minimum: 1
+        default: 1000
+        description: Max number of changes, capped by CHANGES_LIMIT_MAX
+    responses:
+        200:
+            description: Changes after since, in write order
+            schema:
+                type: object
+                properties:
+                    since:
+                        type: integer
+                        description: Sequence number of the last returned change, since of the next request
+                    more:
+                        type: boolean
+                        description: Changes are left after limit, request again with since
+                    lights:
+                        type: array
+                        items:
+                            $ref: '#/definitions/Light'
+                    thermostats:
+                        type: array
+                        items:
+                            $ref: '#/definitions/Thermostat'
+                    deleted:
+                        type: object
+                        properties:
+                            lights:
+                                type: array
+                                items:
+                                    type: integer
+                            thermostats:
+                                type: array
+                                items:
+                                    type: integer
+        400:
+            description: Incorrect since or limit
+            schema:
+                $ref: '#/definitions/Bad request'
+        410:
+            description: since is ahead of the database, which was replaced. Resync every device with since=0
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    try:
+        since, limit = validate_changes_args(request.args, current_app.config['CHANGES_LIMIT_DEFAULT'],
+                                             current_app.config['CHANGES_LIMIT_MAX'])
+    except ValueError as e:
+        logger.warning(f'[GET] Changes incorrect parameters: {e}')
+        return jsonify(message=f'Changes incorrect parameters: {e}'), 400
+
+    res = None
+    try:
+        sequence = get_model_changes().get_sequence()
+        if since > sequence:
+            logger.warning(f'[GET] Changes since: {since} ahead of sequence: {sequence}')
+            return jsonify(message='since is ahead of the change sequence, resync with since=0'), 410
+        res = get_model_changes().get_changes(since, limit)
+        logger.info(f'[GET] Changes since: {since}')
+    except Exception:
+        logger.exception(f'[GET] Changes since: {since} exception')
+        return jsonify(message='Unexpected error occured while getting changes'), 500
+
+    return jsonify(res), 200
@@ -0,0 +1,123 @@
+import json
+import logging
+import threading
+
+from flask import Blueprint, Response, current_app, request, stream_with_context
+
+from home_automation.model.model import change_feed, versions
+from home_automation.serializers import jsonify
+
+events = Blueprint('events', __name__)
+
+logger = logging.getLogger(__name__)
+
+SSE_MIMETYPE = 'text/event-stream'
+
+
+class StreamSlots():
+    """ Number of open event streams, each one holds a server thread until the client disconnects """
+
+    def __init__(self):
+        self._open = 0
+        self._lock = threading.Lock()
+
+    @property
+    def open(self):
+        return self._open
+
+    def acquire(self, limit):
+        """ :return: False when limit streams are open already """
+        with self._lock:
+            if self._open >= limit:
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._open -= 1
+
+
+streams = StreamSlots()
+
+
+def parse_last_event_id(last_event_id):
+    """ event ids are <process epoch>-<sequence>
+    :return: sequence to resume after, None when the client can not resume
+    """
+    if not last_event_id:
+        return change_feed.last_id
+
+    epoch, _, seq = last_event_id.rpartition('-')
+    if epoch != versions.epoch or not seq.isdigit() or not change_feed.can_resume(int(seq)):
+        return None
+    return int(seq)
+
+
+def format_event(event):
+    data = json.dumps({'table': event['table'], 'id': event['id'], 'op': event['op']}, separators=(',', ':'))
+    return f'id: {versions.epoch}-{event["seq"]}\nevent: change\ndata: {data}\n\n'
+
+
+@events.route('/', methods=['GET'], strict_slashes=False)
+def get_events():
+    """Streams light and thermostat changes
+    Server-sent events, one change event per created, updated or deleted device.
+    A reset event tells the client that changes were missed and it has to fetch the devices again
+    ---
+    tags: [Events]
+    produces:
+      - text/event-stream
+    parameters:
+      - name: Last-Event-ID
+        in: header
+        type: string
+        required: false
+        description: Resume after this event
+      - name: last_event_id
+        in: query
+        type: string
+        required: false
+        description: Same as Last-Event-ID, for clients which can not set headers
+    responses:
+        200:
+            description: Event stream, data of change events is {table, id, op}
+        503:
+            description: CHANGE_FEED_MAX_STREAMS streams are open, retry later
+    """
+    if not streams.acquire(current_app.config['CHANGE_FEED_MAX_STREAMS']):
+        logger.warning('[GET] Events too many open streams')
+        keepalive = int(current_app.config['CHANGE_FEED_KEEPALIVE'])
+        return jsonify(message='Too many open event streams'), 503, {'Retry-After': str(keepalive)}
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_id = parse_last_event_id(last_event_id)
+    keepalive = current_app.config['CHANGE_FEED_KEEPALIVE']
+    logger.info(f'[GET] Events stream opened last event id: {last_event_id}')
+
+    def generate():
+        nonlocal last_id
+        yield f'retry: {int(keepalive * 1000)}\n\n'
+        if last_id is None:
+            last_id = change_feed.last_id
+            yield f'id: {versions.epoch}-{last_id}\nevent: reset\ndata: {{}}\n\n'
+
+        while True:
+            changes = change_feed.wait(last_id, keepalive)
+            if not changes:
+                yield ': keep-alive\n\n'
+                continue
+            if changes[0]['seq'] > last_id + 1:
+                # client fell behind more than the replay buffer
+                last_id = change_feed.last_id
+                yield f'id: {versions.epoch}-{last_id}\nevent: reset\ndata: {{}}\n\n'
+                continue
+            for event in changes:
+                yield format_event(event)
+            last_id = changes[-1]['seq']
+
+    response = Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE)
+    response.call_on_close(streams.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response, 200
@@ -0,0 +1,70 @@
+from home_automation.controllers.pagination import PAGE_ARGS
+from home_automation.model.query import COLUMNS, Filter, Query
+
+# query parameter suffix of every comparison, <column>=value tests equality
+_SUFFIXES = (('_gte', '>='), ('_lte', '<='), ('_gt', '>'), ('_lt', '<'), ('', '='))
+
+
+def _filter(table, name, value):
+    """ :return: Filter, None when name is not a filter of table """
+    if name == 'name_prefix':
+        if not value:
+            raise ValueError('name_prefix must not be empty')
+        return Filter('name', 'prefix', value)
+
+    for suffix, operator in _SUFFIXES:
+        column = name[:-len(suffix)] if suffix else name
+        if name.endswith(suffix) and column in COLUMNS[table]:
+            break
+    else:
+        # other parameters such as cache busters are ignored, as they were before filters
+        return None
+
+    if COLUMNS[table][column] is int:
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f'{name} must be an integer')
+    return Filter(column, operator, value)
+
+
+def parse_query(args, table, page=None):
+    """ reads filter and sort query parameters of a collection
+    <column>=, <column>_gt=, <column>_gte=, <column>_lt=, <column>_lte=, name_prefix= and
+    sort=<column>, sort=-<column> for descending order
+    :param page: Page of the request, a cursor must come from a page of the same sort
+    :return: Query, or None when the request has neither filters nor sort
+    :raises ValueError: when a filter or sort value is invalid, unknown parameters are ignored
+    """
+    filters = [_filter(table, name, args[name]) for name in args if name not in PAGE_ARGS and name != 'sort']
+    filters = [filter for filter in filters if filter is not None]
+    sort = args.get('sort')
+    if not filters and sort is None:
+        return None
+
+    descending = False
+    if sort is None:
+        sort = 'id'
+    elif sort.startswith('-'):
+        sort = sort[1:]
+        descending = True
+    if sort not in COLUMNS[table]:
+        raise ValueError(f'sort must be one of: {", ".join(COLUMNS[table])}')
+
+    if sort != 'id' and page is not None and page.after_id and page.after is None:
+        raise ValueError('after_id can not be used with sort, use the cursor of the previous page')
+
+    # sorted, equal queries share cache entries and entity tags
+    return Query(tuple(sorted(filters)), sort, descending)
+
+
+def list_args(page, query):
+    """ keyword arguments of get_lights or get_thermostats for a page and a query """
+    args = {}
+    if page is not None:
+        args.update(limit=page.limit, after_id=page.after_id)
+    if query is not None:
+        args['query'] = query
+        if page is not None and query.sort != 'id':
+            args['after'] = page.after
+    return args
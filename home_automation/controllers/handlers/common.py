@@ -0,0 +1,74 @@
+import logging
+from collections import namedtuple
+
+from home_automation.compression import encoded_etags
+from home_automation.controllers.handlers.items import TooManyItems
+from home_automation.controllers.negotiation import render
+from home_automation.controllers.pagination import next_cursor, next_page_url
+from home_automation.serializers import JSON_MIMETYPE, dumps
+
+logger = logging.getLogger(__name__)
+
+# what handlers read of a request, filled in by the Flask and the asyncio controllers.
+# args is a mapping of query parameters, arg_items all of them as (name, value) pairs
+ApiRequest = namedtuple('ApiRequest', ['args', 'arg_items', 'base_url', 'headers', 'config'])
+# what handlers answer, body is bytes and headers are (name, value) pairs
+Result = namedtuple('Result', ['status', 'body', 'mimetype', 'headers'])
+
+
+def json_result(data, status=200, headers=()):
+    return Result(status, dumps(data), JSON_MIMETYPE, list(headers))
+
+
+def message(text, status, **extra):
+    return json_result({'message': text, **extra}, status)
+
+
+def no_content():
+    return Result(204, b'', None, [])
+
+
+def etag_header(etag):
+    return 'ETag', f'"{etag}"'
+
+
+def is_not_modified(req, etag):
+    """ weak comparison of If-None-Match with etag, a cached compressed copy is as fresh as the identity one """
+    header = req.headers.get('If-None-Match')
+    if not header:
+        return False
+
+    etags = encoded_etags(etag)
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == '*' or tag.strip('"') in etags:
+            return True
+    return False
+
+
+def not_modified(etag, vary=()):
+    headers = [etag_header(etag)]
+    if vary:
+        headers.append(('Vary', ', '.join(vary)))
+    return Result(304, b'', None, headers)
+
+
+def collection_result(req, rows, mimetype, etag, page, query=None):
+    """ rows in the negotiated representation, with a link to the next page when there may be one """
+    headers = [etag_header(etag), ('Vary', 'Accept')]
+    cursor = next_cursor(rows, page, query)
+    if cursor is not None:
+        url = next_page_url(req.base_url, req.arg_items, page, cursor)
+        headers += [('X-Next-Cursor', cursor), ('Link', f'<{url}>; rel="next"')]
+    return Result(200, render(rows, mimetype), mimetype, headers)
+
+
+def read_items_error(entity, e):
+    """ answer to a bulk request body read_items could not read """
+    if isinstance(e, TooManyItems):
+        logger.warning(f'[POST] {entity} bulk request body too large: {e}')
+        return message(str(e), 413)
+    logger.warning(f'[POST] {entity} bulk incorrect request body: {e}')
+    return message(str(e), 400)
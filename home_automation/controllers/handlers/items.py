@@ -0,0 +1,64 @@
+import json
+
+from home_automation.serializers import dumps
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class TooManyItems(ValueError):
+    pass
+
+
+class NdjsonItems():
+    """ items of a newline delimited JSON request body, fed in chunks of any size
+    :param max_items: max number of items of the body
+    """
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.items = []
+        self._number = 0
+        self._buffer = b''
+
+    def feed(self, chunk):
+        """ :raises TooManyItems: when the body has more than max_items
+        :raises ValueError: when a line is not valid JSON
+        """
+        *lines, self._buffer = (self._buffer + chunk).split(b'\n')
+        for line in lines:
+            self._append(line)
+
+    def close(self):
+        """ :return: items of the body, the last line does not need a newline """
+        self._append(self._buffer)
+        self._buffer = b''
+        return self.items
+
+    def _append(self, line):
+        self._number += 1
+        line = line.strip()
+        if not line:
+            return
+        if len(self.items) == self.max_items:
+            raise TooManyItems(f'Request body has more than {self.max_items} items')
+        try:
+            self.items.append(json.loads(line))
+        except ValueError:
+            raise ValueError(f'Request body line {self._number} is not valid JSON')
+
+
+def json_items(items, max_items):
+    """ checks items of a request body sent as a JSON array
+    :raises TooManyItems: when the body has more than max_items
+    :raises ValueError: when the body is not an array
+    """
+    if not isinstance(items, list):
+        raise ValueError('Request body must be a JSON array')
+    if len(items) > max_items:
+        raise TooManyItems(f'Request body has more than {max_items} items')
+
+    return items
+
+
+def ndjson_line(row):
+    return dumps(row) + b'\n'
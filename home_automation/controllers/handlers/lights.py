@@ -0,0 +1,181 @@
+import logging
+
+from home_automation.controllers.filtering import list_args, parse_query
+from home_automation.controllers.handlers.common import (collection_result, etag_header, is_not_modified, json_result,
+                                                         message, no_content, not_modified)
+from home_automation.controllers.negotiation import negotiate, representation_etag
+from home_automation.controllers.pagination import page_etag, parse_page
+from home_automation.controllers.validation import validate_ack, validate_light, validate_light_ids, validate_light_name
+
+logger = logging.getLogger(__name__)
+
+_INCORRECT_ID = 'Light id must be strictly greater than 0'
+
+
+def _incorrect_id(method, id, action=''):
+    logger.warning(f'[{method}] Incorrect light id: {id}{action}')
+    return message(_INCORRECT_ID, 400)
+
+
+def get_lights(model, req):
+    try:
+        page = parse_page(req.args, req.config)
+    except ValueError as e:
+        logger.warning(f'[GET] Lights incorrect pagination parameters: {e}')
+        return message(f'Lights incorrect pagination parameters: {e}', 400)
+    try:
+        query = parse_query(req.args, 'lights', page)
+    except ValueError as e:
+        logger.warning(f'[GET] Lights incorrect query parameters: {e}')
+        return message(f'Lights incorrect query parameters: {e}', 400)
+
+    mimetype = negotiate(req.headers.get('Accept'))
+    res = None
+    etag = None
+    try:
+        etag = representation_etag(page_etag(model.get_version(), page, query), mimetype)
+        if is_not_modified(req, etag):
+            logger.info('[GET] Lights all not modified')
+            return not_modified(etag, vary=('Accept',))
+        res = model.get_lights(**list_args(page, query))
+        logger.info('[GET] Lights all')
+    except Exception:
+        logger.exception('[GET] Lights all exception')
+        return message('Unexpected error occured while getting lights', 500)
+
+    return collection_result(req, res, mimetype, etag, page, query)
+
+
+def get_light(model, req, id):
+    if id < 1:
+        return _incorrect_id('GET', id)
+
+    res = None
+    etag = None
+    try:
+        etag = model.get_version(id)
+        if is_not_modified(req, etag):
+            logger.info(f'[GET] Light id: {id} not modified')
+            return not_modified(etag)
+        res = model.get_light(id)
+        logger.info(f'[GET] Light id: {id}')
+    except Exception:
+        logger.exception(f'[GET] Light id: {id} exception')
+        return message('Unexpected error occured while getting light', 500)
+
+    return json_result(res, headers=[etag_header(etag)])
+
+
+def save_light(model, data):
+    try:
+        name, status = validate_light(data)
+    except ValueError as e:
+        logger.warning(f'[POST] Lights incorrect request body: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.save_light(name, status)
+        logger.info(f'[POST] Lights added name: {name}, status: {status}')
+    except Exception:
+        logger.exception('[POST] Lights exception')
+        return message('Unexpected error occured while saving light', 500)
+
+    return no_content()
+
+
+def save_lights(model, items):
+    """ :param items: request body items, read by read_items of the controller """
+    if not items:
+        logger.warning('[POST] Lights bulk request body is empty')
+        return message('Lights data is missing', 400)
+
+    values = []
+    for index, item in enumerate(items):
+        try:
+            values.append(validate_light(item))
+        except ValueError as e:
+            logger.warning(f'[POST] Lights bulk incorrect item {index}: {e}')
+            return message(f'Item {index}: {e}', 400, index=index)
+
+    res = None
+    try:
+        res = model.save_lights(values)
+        logger.info(f'[POST] Lights added in bulk count: {len(res)}')
+    except Exception:
+        logger.exception('[POST] Lights bulk exception')
+        return message('Unexpected error occured while saving lights', 500)
+
+    return json_result({'ids': res}, 201)
+
+
+def remove_light(model, id):
+    if id < 1:
+        return _incorrect_id('DELETE', id)
+
+    try:
+        model.delete_light(id)
+        logger.info(f'[DELETE] Light id: {id}')
+    except Exception:
+        logger.exception('[DELETE] Lights exception')
+        return message('Unexpected error occured while deleting light', 500)
+
+    return no_content()
+
+
+def update_status(model, req, id, status, action):
+    """ :param action: on or off """
+    if id < 1:
+        return _incorrect_id('PUT', id, f' to turn {action}')
+
+    try:
+        durability = validate_ack(req.args)
+    except ValueError as e:
+        logger.warning(f'[PUT] Light incorrect ack to turn {action}: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.update_status(id, status, **durability)
+        logger.info(f'[PUT] Light has been turned {action} id: {id}')
+    except Exception:
+        logger.exception(f'[PUT] Light {action} exception')
+        return message(f'Unexpected error occured while turning light {action}', 500)
+
+    return no_content()
+
+
+def update_status_many(model, data, status, action):
+    try:
+        ids = validate_light_ids(data)
+    except ValueError as e:
+        logger.warning(f'[PUT] Lights incorrect request body to turn {action}: {e}')
+        return message(str(e), 400)
+
+    res = None
+    try:
+        res = model.update_status_many(status, ids)
+        logger.info(f'[PUT] Lights have been turned {action} ids: {res}')
+    except Exception:
+        logger.exception(f'[PUT] Lights {action} exception')
+        return message(f'Unexpected error occured while turning lights {action}', 500)
+
+    return json_result({'changed': res})
+
+
+def update_name(model, id, data):
+    if id < 1:
+        return _incorrect_id('PUT', id, ' for update name')
+
+    try:
+        name = validate_light_name(data)
+    except ValueError as e:
+        logger.warning(f'[PUT] Lights incorrect request body for update name: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.update_name(id, name)
+        logger.info(f'[PUT] Light name has been updated for id: {id}')
+    except Exception:
+        logger.exception('[PUT] Light update name exception')
+        return message('Unexpected error occured while updating name', 500)
+
+    return no_content()
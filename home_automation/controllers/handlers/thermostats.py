@@ -0,0 +1,185 @@
+import logging
+
+from home_automation.controllers.filtering import list_args, parse_query
+from home_automation.controllers.handlers.common import (collection_result, etag_header, is_not_modified, json_result,
+                                                         message, no_content, not_modified)
+from home_automation.controllers.negotiation import negotiate, representation_etag
+from home_automation.controllers.pagination import page_etag, parse_page
+from home_automation.controllers.validation import (validate_ack, validate_history_args, validate_thermostat,
+                                                    validate_thermostat_name, validate_thermostat_temp)
+
+logger = logging.getLogger(__name__)
+
+_INCORRECT_ID = 'Thermostats id must be strictly greater than 0'
+
+
+def _incorrect_id(method, id, action=''):
+    logger.warning(f'[{method}] Incorrect thermostat id: {id}{action}')
+    return message(_INCORRECT_ID, 400)
+
+
+def get_thermostats(model, req):
+    try:
+        page = parse_page(req.args, req.config)
+    except ValueError as e:
+        logger.warning(f'[GET] Thermostats incorrect pagination parameters: {e}')
+        return message(f'Thermostats incorrect pagination parameters: {e}', 400)
+    try:
+        query = parse_query(req.args, 'thermostats', page)
+    except ValueError as e:
+        logger.warning(f'[GET] Thermostats incorrect query parameters: {e}')
+        return message(f'Thermostats incorrect query parameters: {e}', 400)
+
+    mimetype = negotiate(req.headers.get('Accept'))
+    res = None
+    etag = None
+    try:
+        etag = representation_etag(page_etag(model.get_version(), page, query), mimetype)
+        if is_not_modified(req, etag):
+            logger.info('[GET] Thermostats all not modified')
+            return not_modified(etag, vary=('Accept',))
+        res = model.get_thermostats(**list_args(page, query))
+        logger.info('[GET] Thermostats all')
+    except Exception:
+        logger.exception('[GET] Thermostats all exception')
+        return message('Unexpected error occured while getting thermostats', 500)
+
+    return collection_result(req, res, mimetype, etag, page, query)
+
+
+def get_thermostat(model, req, id):
+    if id < 1:
+        return _incorrect_id('GET', id)
+
+    res = None
+    etag = None
+    try:
+        etag = model.get_version(id)
+        if is_not_modified(req, etag):
+            logger.info(f'[GET] Thermostat id: {id} not modified')
+            return not_modified(etag)
+        res = model.get_thermostat(id)
+        logger.info(f'[GET] Thermostat id: {id}')
+    except Exception:
+        logger.exception(f'[GET] Thermostats id: {id} exception')
+        return message('Unexpected error occured while getting thermostat', 500)
+
+    return json_result(res, headers=[etag_header(etag)])
+
+
+def save_thermostat(model, data):
+    try:
+        name, temp = validate_thermostat(data)
+    except ValueError as e:
+        logger.warning(f'[POST] Thermostats incorrect request body: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.save_thermostat(name, temp)
+        logger.info(f'[POST] Thermostat added name: {name}, temp: {temp}')
+    except Exception:
+        logger.exception('[POST] Thermostats exception')
+        return message('Unexpected error occured while saving thermostat', 500)
+
+    return no_content()
+
+
+def save_thermostats(model, items):
+    """ :param items: request body items, read by read_items of the controller """
+    if not items:
+        logger.warning('[POST] Thermostats bulk request body is empty')
+        return message('Thermostats data is missing', 400)
+
+    values = []
+    for index, item in enumerate(items):
+        try:
+            values.append(validate_thermostat(item))
+        except ValueError as e:
+            logger.warning(f'[POST] Thermostats bulk incorrect item {index}: {e}')
+            return message(f'Item {index}: {e}', 400, index=index)
+
+    res = None
+    try:
+        res = model.save_thermostats(values)
+        logger.info(f'[POST] Thermostats added in bulk count: {len(res)}')
+    except Exception:
+        logger.exception('[POST] Thermostats bulk exception')
+        return message('Unexpected error occured while saving thermostats', 500)
+
+    return json_result({'ids': res}, 201)
+
+
+def remove_thermostat(model, id):
+    if id < 1:
+        return _incorrect_id('DELETE', id)
+
+    try:
+        model.delete_thermostat(id)
+        logger.info(f'[DELETE] Thermostat id: {id}')
+    except Exception:
+        logger.exception('[DELETE] Thermostats exception')
+        return message('Unexpected error occured while removing thermostat', 500)
+
+    return no_content()
+
+
+def update_temp(model, req, id, data):
+    if id < 1:
+        return _incorrect_id('PUT', id)
+
+    try:
+        temp = validate_thermostat_temp(data)
+        durability = validate_ack(req.args)
+    except ValueError as e:
+        logger.warning(f'[PUT] Thermostats incorrect request for update temp id: {id}: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.update_temp(id, temp, **durability)
+        logger.info(f'[PUT] Thermostat has been updated id: {id}, temp: {temp}')
+    except Exception:
+        logger.exception('[PUT] Thermostats exception')
+        return message('Unexpected error occured while updating thermostat', 500)
+
+    return no_content()
+
+
+def get_temp_history(model, req, id):
+    if id < 1:
+        return _incorrect_id('GET', id, ' for history')
+
+    try:
+        start, end, bucket = validate_history_args(req.args, req.config['HISTORY_MAX_BUCKETS'])
+    except ValueError as e:
+        logger.warning(f'[GET] Thermostats incorrect history parameters: {e}')
+        return message(str(e), 400)
+
+    res = None
+    try:
+        res = model.get_temp_history(id, start, end, bucket)
+        logger.info(f'[GET] Thermostat history id: {id}')
+    except Exception:
+        logger.exception(f'[GET] Thermostat history id: {id} exception')
+        return message('Unexpected error occured while getting thermostat history', 500)
+
+    return json_result(res)
+
+
+def update_name(model, id, data):
+    if id < 1:
+        return _incorrect_id('PUT', id)
+
+    try:
+        name = validate_thermostat_name(data)
+    except ValueError as e:
+        logger.warning(f'[PUT] Thermostats incorrect request body for update name id: {id}: {e}')
+        return message(str(e), 400)
+
+    try:
+        model.update_name(id, name)
+        logger.info(f'[PUT] Thermostat name has been updated id: {id}')
+    except Exception:
+        logger.exception('[PUT] Thermostats exception')
+        return message('Unexpected error occured while updating thermostat', 500)
+
+    return no_content()
@@ -1,7 +1,11 @@
 import logging
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request
 
+from home_automation.controllers.handlers import lights as handlers
+from home_automation.controllers.handlers.common import message, read_items_error
+from home_automation.controllers.responses import api_request, respond
+from home_automation.controllers.streaming import ndjson_response, read_items
 from home_automation.model.model_factory import get_model_lights
 
 lights = Blueprint('lights', __name__)
@@ -12,7 +16,8 @@ logger = logging.getLogger(__name__)
 @lights.route('/', methods=['GET'], strict_slashes=False)
 def get_lights():
     """Returns list of all lights
-    All lights registered with home automation system
+    All lights registered with home automation system, filtered on columns id, name, status and creation_date
+    with <column>=, <column>_gt=, <column>_gte=, <column>_lt= and <column>_lte= query parameters
     ---
     tags: [Lights]
     definitions:
@@ -27,11 +32,83 @@ def get_lights():
                     type: string
                 status:
                     type: integer
+                seq:
+                    type: integer
+                    description: Change sequence number of the last create or update
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        minimum: 1
+        required: false
+        description: Page size, capped by the server. Enables pagination
+      - name: after_id
+        in: query
+        type: integer
+        minimum: 0
+        required: false
+        description: Return only rows with id greater than after_id
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from X-Next-Cursor of the previous page
+      - name: status
+        in: query
+        type: integer
+        required: false
+        description: Light status, 0 or 1. status_gt, status_gte, status_lt and status_lte compare
+      - name: name_prefix
+        in: query
+        type: string
+        required: false
+        description: Only rows whose name starts with name_prefix, case sensitive
+      - name: sort
+        in: query
+        type: string
+        enum: [id, -id, name, -name, status, -status, creation_date, -creation_date]
+        required: false
+        description: Sort column, descending with a leading minus. Rows with equal values are ordered by id
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
     responses:
         200:
             description: A list of lights
             schema:
                 $ref: '#/definitions/Light'
+            headers:
+                X-Next-Cursor:
+                    type: string
+                    description: Cursor of the next page, sent when the page is full
+        304:
+            description: Not modified since the ETag sent in If-None-Match
+        400:
+            description: Incorrect pagination, filter or sort parameters
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    return respond(handlers.get_lights(get_model_lights(), api_request()))
+
+
+@lights.route('/export', methods=['GET'], strict_slashes=False)
+def export_lights():
+    """Streams all lights
+    Newline delimited JSON, one light per line, read from the database in batches
+    ---
+    tags: [Lights]
+    produces:
+      - application/x-ndjson
+    responses:
+        200:
+            description: One Light object per line
+            schema:
+                $ref: '#/definitions/Light'
         500:
             description: Internal error
             schema:
@@ -39,13 +116,13 @@ def get_lights():
     """
     res = None
     try:
-        res = get_model_lights().get_lights()
-        logger.info('[GET] Lights all')
+        res = ndjson_response(get_model_lights().iter_lights(current_app.config['EXPORT_BATCH_SIZE']))
+        logger.info('[GET] Lights export')
     except Exception:
-        logger.exception('[GET] Lights all exception')
-        return jsonify(message='Unexpected error occured while getting lights'), 500
+        logger.exception('[GET] Lights export exception')
+        return respond(message('Unexpected error occured while exporting lights', 500))
 
-    return jsonify(res), 200
+    return res, 200
 
 
 @lights.route('/<int:id>', methods=['GET'], strict_slashes=False)
@@ -59,11 +136,17 @@ def get_light(id):
         type: integer
         minimum: 1
         required: true
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
     responses:
         200:
             description: Light returned by id
             schema:
                 $ref: '#/definitions/Light'
+        304:
+            description: Not modified since the ETag sent in If-None-Match
         400:
             description: id less than 1
             schema:
@@ -73,19 +156,7 @@ def get_light(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[GET] Incorrect lights id: {id}')
-        return jsonify(message='Light id must be strictly greater than 0'), 400
-
-    res = None
-    try:
-        res = get_model_lights().get_light(id)
-        logger.info(f'[GET] Light id: {id}')
-    except Exception:
-        logger.exception(f'[GET] Light id: {id} exception')
-        return jsonify(message='Unexpected error occured while getting light'), 500
-
-    return jsonify(res), 200
+    return respond(handlers.get_light(get_model_lights(), api_request(), id))
 
 
 @lights.route('/', methods=['POST'], strict_slashes=False)
@@ -120,40 +191,55 @@ def save_light():
             schema:
                 $ref: '#/definitions/Error'
     """
-    data = request.get_json()
+    return respond(handlers.save_light(get_model_lights(), request.get_json()))
 
-    if not data:
-        logger.warning('[POST] Lights request body is empty')
-        return jsonify(message='Light data is missing'), 400
-
-    name = data.get('name')
-    status = data.get('status')
-
-    if not isinstance(name, str):
-        logger.warning('[POST] Lights request body incorrect value type name:string')
-        return jsonify(message='Lights request body incorrect value type for name:string'), 400
-    if not name:
-        logger.warning('[POST] Lights request body has no [name]')
-        return jsonify(message='Ligsht data is missing parameter: name'), 400
-
-    if not status:
-        logger.warning('[POST] Lights request body has no [status]. Status set to default(0)')
-        status = 0
-    if not isinstance(status, int):
-        logger.warning('[POST] Lights request body incorrect value type status:integer')
-        return jsonify(message='Lights request body incorrect value type for status:integer'), 400
-    if status > 1 or status < 0:
-        logger.warning('[POST] Lights status must be either 0 or 1')
-        return jsonify(message='Light data is out of range[0, 1] parameter: name'), 400
 
+@lights.route('/bulk', methods=['POST'], strict_slashes=False)
+def save_lights():
+    """Creates lights in bulk
+    Validates all lights first and adds them in one transaction.
+    Accepts a JSON array or NDJSON (application/x-ndjson) with one light per line
+    ---
+    tags: [Lights]
+    consumes:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: Lights
+        in: body
+        schema:
+            type: array
+            items:
+                $ref: '#/definitions/Light'
+    responses:
+        201:
+            description: Lights created
+            schema:
+                type: object
+                properties:
+                    ids:
+                        type: array
+                        items:
+                            type: integer
+        400:
+            description: Body is not a JSON array or NDJSON, or an item is not valid
+            schema:
+                $ref: '#/definitions/Bad request'
+        413:
+            description: More items than the configured max batch size
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
     try:
-        get_model_lights().save_light(name, status)
-        logger.info(f'[POST] Lights added name: {name}, status: {status}')
-    except Exception:
-        logger.exception('[POST] Lights exception')
-        return jsonify(message='Unexpected error occured while saving light'), 500
+        items = read_items(current_app.config['BULK_MAX_BATCH_SIZE'])
+    except ValueError as e:
+        return respond(read_items_error('Lights', e))
 
-    return '', 204
+    return respond(handlers.save_lights(get_model_lights(), items))
 
 
 @lights.route('/<int:id>', methods=['DELETE'], strict_slashes=False)
@@ -180,21 +266,9 @@ def remove_light(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[DELETE] Incorrect light id: {id}')
-        return jsonify(message='Light id must be strictly greater than 0'), 400
-
-    try:
-        get_model_lights().delete_light(id)
-        logger.info(f'[DELETE] Light id: {id}')
-    except Exception:
-        logger.exception('[DELETE] Lights exception')
-        return jsonify(message='Unexpected error occured while deleting light'), 500
+    return respond(handlers.remove_light(get_model_lights(), id))
 
-    return '', 204
 
-
-# TO-DO switch instead of on/off. Not doing it because of ALL ON/OFF operations
 @lights.route('/<int:id>/on', methods=['PUT'], strict_slashes=False)
 def on_light(id):
     """Turns light on
@@ -206,11 +280,17 @@ def on_light(id):
         type: integer
         minimum: 1
         required: true
+      - name: ack
+        in: query
+        type: string
+        enum: [flush, enqueue]
+        required: false
+        description: With write queue enabled, acknowledge after commit (flush) or once queued (enqueue)
     responses:
         204:
             description: Light has been tuned on
         400:
-            description: id less than 1
+            description: id less than 1 or unknown ack
             schema:
                 $ref: '#/definitions/Bad request'
         500:
@@ -218,18 +298,7 @@ def on_light(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[PUT] Incorrect light id: {id} to turn on')
-        return jsonify(message='Light id must be strictly greater than 0'), 400
-
-    try:
-        get_model_lights().update_status(id, 1)
-        logger.info(f'[PUT] Light has been turned on id: {id}')
-    except Exception:
-        logger.exception('[PUT] Light on exception')
-        return jsonify(message='Unexpected error occured while turnning light on'), 500
-
-    return '', 204
+    return respond(handlers.update_status(get_model_lights(), api_request(), id, 1, 'on'))
 
 
 @lights.route('/<int:id>/off', methods=['PUT'], strict_slashes=False)
@@ -243,11 +312,17 @@ def off_light(id):
         type: integer
         minimum: 1
         required: true
+      - name: ack
+        in: query
+        type: string
+        enum: [flush, enqueue]
+        required: false
+        description: With write queue enabled, acknowledge after commit (flush) or once queued (enqueue)
     responses:
         204:
             description: Light has been tuned off
         400:
-            description: id less than 1
+            description: id less than 1 or unknown ack
             schema:
                 $ref: '#/definitions/Bad request'
         500:
@@ -255,18 +330,87 @@ def off_light(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[PUT] Incorrect light id: {id} to turn off')
-        return jsonify(message='Light id must be strictly greater than 0'), 400
+    return respond(handlers.update_status(get_model_lights(), api_request(), id, 0, 'off'))
 
-    try:
-        get_model_lights().update_status(id, 0)
-        logger.info(f'[PUT] Light has ben turned off id: {id}')
-    except Exception:
-        logger.exception('[PUT] Light off exception')
-        return jsonify(message='Unexpected error occured while turning light off'), 500
 
-    return '', 204
+@lights.route('/on', methods=['PUT'], strict_slashes=False)
+def on_lights():
+    """Turns lights on
+    Turns on all lights or only lights listed in ids, in one transaction
+    ---
+    tags: [Lights]
+    parameters:
+      - name: Light ids
+        in: body
+        required: false
+        description: Omit body to turn on all lights
+        schema:
+            type: object
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+                  minimum: 1
+    responses:
+        200:
+            description: Ids of lights which have been turned on
+            schema:
+                $ref: '#/definitions/Changed'
+        400:
+            description: ids is not an array of integers greater than 0
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    return respond(handlers.update_status_many(get_model_lights(), request.get_json(), 1, 'on'))
+
+
+@lights.route('/off', methods=['PUT'], strict_slashes=False)
+def off_lights():
+    """Turns lights off
+    Turns off all lights or only lights listed in ids, in one transaction
+    ---
+    tags: [Lights]
+    definitions:
+        Changed:
+            type: object
+            properties:
+                changed:
+                    type: array
+                    items:
+                        type: integer
+    parameters:
+      - name: Light ids
+        in: body
+        required: false
+        description: Omit body to turn off all lights
+        schema:
+            type: object
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+                  minimum: 1
+    responses:
+        200:
+            description: Ids of lights which have been turned off
+            schema:
+                $ref: '#/definitions/Changed'
+        400:
+            description: ids is not an array of integers greater than 0
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    return respond(handlers.update_status_many(get_model_lights(), request.get_json(), 0, 'off'))
 
 
 @lights.route('/<int:id>/name', methods=['PUT'], strict_slashes=False)
@@ -301,30 +445,4 @@ def update_name(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    data = request.get_json()
-
-    if not data:
-        logger.warning('[PUT] Lights request body for update name is empty')
-        return jsonify(message='Light data is missing'), 400
-    if id < 1:
-        logger.warning(f'[PUT] Incorrect light id: {id} for update name')
-        return jsonify(message='Light id must be strictly greater than 0'), 400
-
-    name = data.get('name')
-
-    if not isinstance(name, str):
-        logger.warning('[PUT] Lights request body incorrect value type name:string')
-        return jsonify(message='Lights request body incorrect value type for name:string'), 400
-
-    if not name:
-        logger.warning('[PUT] Lights request body has no [name]')
-        return jsonify(message='Light data is missing parameter: name'), 400
-
-    try:
-        get_model_lights().update_name(id, name)
-        logger.info(f'[PUT] Light name has been updated for id: {id}')
-    except Exception:
-        logger.exception('[PUT] Light update name exception')
-        return jsonify(message='Unexpected error occured while updating name'), 500
-
-    return '', 204
+    return respond(handlers.update_name(get_model_lights(), id, request.get_json()))
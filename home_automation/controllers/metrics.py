@@ -0,0 +1,28 @@
+from flask import Blueprint, current_app
+
+from home_automation.metrics import metrics as registry
+from home_automation.model.model import cache
+
+metrics = Blueprint('metrics', __name__)
+
+
+@metrics.route('/metrics', methods=['GET'], strict_slashes=False)
+def get_metrics():
+    """Returns metrics in Prometheus text format
+    Request latency histograms, status codes and in flight requests per route,
+    time spent in SQL per table and statement, read cache counters
+    ---
+    tags: [Stats]
+    produces:
+      - text/plain
+    responses:
+        200:
+            description: Prometheus text exposition format
+    """
+    stats = cache.stats()
+    extra = (
+        ('cache_hits_total', 'counter', 'Read cache hits', stats['hits']),
+        ('cache_misses_total', 'counter', 'Read cache misses', stats['misses']),
+        ('cache_entries', 'gauge', 'Read cache entries', stats['size'])
+    )
+    return current_app.response_class(registry.render(extra), mimetype='text/plain; version=0.0.4'), 200
@@ -0,0 +1,58 @@
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from home_automation.serializers import JSON_MIMETYPE, dumps
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+COLUMNAR_JSON_MIMETYPE = 'application/vnd.home-automation.columnar+json'
+COLUMNAR_MSGPACK_MIMETYPE = 'application/vnd.home-automation.columnar+msgpack'
+
+# ETag suffix of every representation, JSON keeps the plain tag
+_ETAG_SUFFIXES = {
+    JSON_MIMETYPE: '',
+    COLUMNAR_JSON_MIMETYPE: '-columnar',
+    MSGPACK_MIMETYPE: '-msgpack',
+    COLUMNAR_MSGPACK_MIMETYPE: '-columnar-msgpack'
+}
+
+
+def _offered():
+    # JSON first, it wins on */* and missing Accept
+    if msgpack is None:
+        return [JSON_MIMETYPE, COLUMNAR_JSON_MIMETYPE]
+    return [JSON_MIMETYPE, COLUMNAR_JSON_MIMETYPE, MSGPACK_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE]
+
+
+def negotiate(accept):
+    """ picks the representation of a collection from an Accept header value
+    :return: mimetype, JSON when nothing offered is acceptable
+    """
+    if not accept:
+        return JSON_MIMETYPE
+    return parse_accept_header(accept, MIMEAccept).best_match(_offered(), default=JSON_MIMETYPE)
+
+
+def representation_etag(etag, mimetype):
+    return etag + _ETAG_SUFFIXES[mimetype]
+
+
+def columns(rows):
+    """ one array per column instead of one object per row, column names are sent once """
+    if not rows:
+        return {}
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def render(rows, mimetype):
+    """ :return: body of rows in the given representation """
+    if mimetype in (COLUMNAR_JSON_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE):
+        rows = columns(rows)
+    if mimetype in (MSGPACK_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE):
+        return msgpack.packb(rows, use_bin_type=True)
+    return dumps(rows)
+
@@ -0,0 +1,104 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from flask import current_app
+
+# after is the sort column value of the last row of the previous page, None unless sorted by another column than id
+Page = namedtuple('Page', ['limit', 'after_id', 'after'])
+
+PAGE_ARGS = ('limit', 'after_id', 'cursor')
+
+
+def encode_cursor(after_id, after=None):
+    cursor = {'after_id': after_id}
+    if after is not None:
+        cursor['after'] = after
+    data = json.dumps(cursor).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """ :return: (after_id, after) """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor = json.loads(data)
+        after_id = cursor['after_id']
+        after = cursor.get('after')
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError('cursor is invalid')
+    if not isinstance(after_id, int) or after_id < 0 or not isinstance(after, (int, str, type(None))):
+        raise ValueError('cursor is invalid')
+
+    return after_id, after
+
+
+def _int_arg(args, name, minimum):
+    value = args.get(name)
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    if value < minimum:
+        raise ValueError(f'{name} must be greater than or equal to {minimum}')
+
+    return value
+
+
+def parse_page(args, config=None):
+    """ reads limit, after_id and cursor query parameters
+    :param config: PAGE_SIZE_DEFAULT and PAGE_SIZE_MAX, of the current Flask app by default
+    :return: Page, or None when the whole collection is requested
+    :raises ValueError: when a parameter is invalid
+    """
+    if not any(name in args for name in ('limit', 'after_id', 'cursor')):
+        return None
+
+    config = config or current_app.config
+    limit = config['PAGE_SIZE_DEFAULT']
+    if 'limit' in args:
+        limit = _int_arg(args, 'limit', 1)
+    limit = min(limit, config['PAGE_SIZE_MAX'])
+
+    after_id = 0
+    after = None
+    if 'cursor' in args:
+        after_id, after = decode_cursor(args['cursor'])
+    elif 'after_id' in args:
+        after_id = _int_arg(args, 'after_id', 0)
+
+    return Page(limit, after_id, after)
+
+
+def page_etag(etag, page, query=None):
+    if page is not None:
+        etag = f'{etag}-{page.after_id}-{page.limit}'
+    if query is not None:
+        # filters and the sort position do not fit an entity tag as they are
+        key = repr((query, page and page.after)).encode()
+        etag = f'{etag}-{hashlib.sha1(key).hexdigest()[:16]}'
+    return etag
+
+
+def next_cursor(res, page, query=None):
+    """ a full page means there may be more rows, the next cursor points after its last row
+    :return: cursor, None on the last page
+    """
+    if page is None or len(res) < page.limit:
+        return None
+
+    last = res[-1]
+    if query is None or query.sort == 'id':
+        return encode_cursor(last['id'])
+    return encode_cursor(last['id'], last[query.sort])
+
+
+def next_page_url(base_url, args, page, cursor):
+    """ :param args: (name, value) query parameters of the request, filters and sort are kept """
+    query_string = urlencode([(name, value) for name, value in args if name not in PAGE_ARGS] +
+                             [('limit', page.limit), ('cursor', cursor)])
+    return f'{base_url}?{query_string}'
+
@@ -0,0 +1,15 @@
+from flask import current_app, request
+
+from home_automation.controllers.handlers.common import ApiRequest
+
+
+def api_request():
+    """ what handlers read of the current Flask request """
+    return ApiRequest(request.args, list(request.args.items(multi=True)), request.base_url, request.headers,
+                      current_app.config)
+
+
+def respond(result):
+    """ Flask response of a handler Result """
+    return current_app.response_class(result.body, status=result.status, headers=result.headers,
+                                      mimetype=result.mimetype)
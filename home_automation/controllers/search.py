@@ -0,0 +1,77 @@
+import logging
+
+from flask import Blueprint, current_app, request
+
+from home_automation.controllers.validation import validate_search_args
+from home_automation.model.model_factory import get_model_search
+from home_automation.serializers import jsonify
+
+search = Blueprint('search', __name__)
+
+logger = logging.getLogger(__name__)
+
+
+@search.route('/', methods=['GET'], strict_slashes=False)
+def search_devices():
+    """Searches lights and thermostats by name
+    Every word of q matches the start of a word of the name, best matches first
+    ---
+    tags: [Search]
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        maxLength: 200
+        description: Words matched as prefixes, "kit lamp" finds "Kitchen lamp"
+      - name: type
+        in: query
+        type: string
+        enum: [lights, thermostats]
+        description: Searches only this type of device
+      - name: limit
+        in: query
+        type: integer
+        minimum: 1
+        default: 20
+        description: Max number of results, capped by SEARCH_LIMIT_MAX
+    responses:
+        200:
+            description: Matching devices ordered by relevance
+            schema:
+                type: array
+                items:
+                    type: object
+                    properties:
+                        type:
+                            type: string
+                            enum: [light, thermostat]
+                        id:
+                            type: integer
+                        name:
+                            type: string
+        400:
+            description: Missing q or incorrect type or limit
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    try:
+        text, tables, limit = validate_search_args(request.args, current_app.config['SEARCH_LIMIT_DEFAULT'],
+                                                   current_app.config['SEARCH_LIMIT_MAX'])
+    except ValueError as e:
+        logger.warning(f'[GET] Search incorrect parameters: {e}')
+        return jsonify(message=f'Search incorrect parameters: {e}'), 400
+
+    res = None
+    try:
+        res = get_model_search().search(text, tables, limit, current_app.config['SEARCH_CANDIDATES'])
+        logger.info('[GET] Search')
+    except Exception:
+        logger.exception('[GET] Search exception')
+        return jsonify(message='Unexpected error occured while searching devices'), 500
+
+    return jsonify(res), 200
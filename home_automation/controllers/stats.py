@@ -0,0 +1,104 @@
+import logging
+
+from flask import Blueprint, request
+
+from home_automation.model.model import cache, tracer
+from home_automation.serializers import jsonify
+
+stats = Blueprint('stats', __name__)
+
+logger = logging.getLogger(__name__)
+
+
+@stats.route('/cache', methods=['GET'], strict_slashes=False)
+def get_cache_stats():
+    """Returns read cache statistics
+    Hit and miss counters of the lights and thermostats read cache
+    ---
+    tags: [Stats]
+    responses:
+        200:
+            description: Cache statistics
+            schema:
+                type: object
+                properties:
+                    enabled:
+                        type: boolean
+                    hits:
+                        type: integer
+                    misses:
+                        type: integer
+                    hit_rate:
+                        type: number
+                    size:
+                        type: integer
+                    max_size:
+                        type: integer
+                    ttl:
+                        type: number
+    """
+    return jsonify(cache.stats()), 200
+
+
+@stats.route('/queries', methods=['GET'], strict_slashes=False)
+def get_query_stats():
+    """Returns statements with the largest execute time
+    Requires QUERY_TRACE_ENABLED, times in milliseconds
+    ---
+    tags: [Stats]
+    parameters:
+      - name: top
+        in: query
+        type: integer
+        minimum: 1
+        default: 10
+      - name: order
+        in: query
+        type: string
+        enum: [total, avg, max, count]
+        default: total
+    responses:
+        200:
+            description: Statements ordered by the requested statistic
+            schema:
+                type: object
+                properties:
+                    enabled:
+                        type: boolean
+                    statements:
+                        type: array
+                        items:
+                            type: object
+                            properties:
+                                sql:
+                                    type: string
+                                count:
+                                    type: integer
+                                params:
+                                    type: integer
+                                total_ms:
+                                    type: number
+                                avg_ms:
+                                    type: number
+                                max_ms:
+                                    type: number
+                                avg_connect_ms:
+                                    type: number
+                                avg_rows:
+                                    type: number
+        400:
+            description: Incorrect top or order
+            schema:
+                $ref: '#/definitions/Bad request'
+    """
+    order = request.args.get('order', 'total')
+    top = request.args.get('top', '10')
+
+    if order not in ('total', 'avg', 'max', 'count'):
+        logger.warning(f'[GET] Query stats incorrect order: {order}')
+        return jsonify(message='order must be one of: total, avg, max, count'), 400
+    if not top.isdigit() or int(top) < 1:
+        logger.warning(f'[GET] Query stats incorrect top: {top}')
+        return jsonify(message='top must be an integer greater than 0'), 400
+
+    return jsonify(enabled=tracer.enabled, statements=tracer.top(int(top), order)), 200
@@ -0,0 +1,40 @@
+import logging
+from itertools import chain, islice
+
+from flask import Response, request, stream_with_context
+
+from home_automation.controllers.handlers.items import NDJSON_MIMETYPE, NdjsonItems, json_items, ndjson_line
+
+logger = logging.getLogger(__name__)
+
+
+def ndjson_response(rows):
+    """ streams rows as newline delimited JSON while they are read
+        the first row is read eagerly so database errors surface before the response starts
+    """
+    rows = iter(rows)
+    first = list(islice(rows, 1))
+
+    def generate():
+        try:
+            for row in chain(first, rows):
+                yield ndjson_line(row)
+        except Exception:
+            logger.exception('NDJSON stream interrupted')
+            raise
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def read_items(max_items):
+    """ reads request body sent either as a JSON array or as NDJSON (application/x-ndjson)
+    :raises TooManyItems: when the body has more than max_items
+    :raises ValueError: when the body can not be parsed
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        items = NdjsonItems(max_items)
+        for chunk in request.stream:
+            items.feed(chunk)
+        return items.close()
+
+    return json_items(request.get_json(), max_items)
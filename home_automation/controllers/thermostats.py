@@ -1,7 +1,11 @@
 import logging
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request
 
+from home_automation.controllers.handlers import thermostats as handlers
+from home_automation.controllers.handlers.common import message, read_items_error
+from home_automation.controllers.responses import api_request, respond
+from home_automation.controllers.streaming import ndjson_response, read_items
 from home_automation.model.model_factory import get_model_thermostats
 
 thermostats = Blueprint('thermostats', __name__)
@@ -12,7 +16,8 @@ logger = logging.getLogger(__name__)
 @thermostats.route('/', methods=['GET'], strict_slashes=False)
 def get_thermostats():
     """Returns list of all thermostats
-    All thermostats registered with home automation system
+    All thermostats registered with home automation system, filtered on columns id, name, temp and creation_date
+    with <column>=, <column>_gt=, <column>_gte=, <column>_lt= and <column>_lte= query parameters
     ---
     tags: [Thermostats]
     definitions:
@@ -27,6 +32,9 @@ def get_thermostats():
                     type: string
                 temp:
                     type: integer
+                seq:
+                    type: integer
+                    description: Change sequence number of the last create or update
         Bad request:
             type: object
             properties:
@@ -37,11 +45,80 @@ def get_thermostats():
             properties:
                 message:
                     type: string
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        minimum: 1
+        required: false
+        description: Page size, capped by the server. Enables pagination
+      - name: after_id
+        in: query
+        type: integer
+        minimum: 0
+        required: false
+        description: Return only rows with id greater than after_id
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from X-Next-Cursor of the previous page
+      - name: temp
+        in: query
+        type: integer
+        required: false
+        description: Thermostat temperature. temp_gt, temp_gte, temp_lt and temp_lte compare
+      - name: name_prefix
+        in: query
+        type: string
+        required: false
+        description: Only rows whose name starts with name_prefix, case sensitive
+      - name: sort
+        in: query
+        type: string
+        enum: [id, -id, name, -name, temp, -temp, creation_date, -creation_date]
+        required: false
+        description: Sort column, descending with a leading minus. Rows with equal values are ordered by id
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
     responses:
         200:
             description: A list of thermostats
             schema:
                 $ref: '#/definitions/Thermostat'
+            headers:
+                X-Next-Cursor:
+                    type: string
+                    description: Cursor of the next page, sent when the page is full
+        304:
+            description: Not modified since the ETag sent in If-None-Match
+        400:
+            description: Incorrect pagination, filter or sort parameters
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    return respond(handlers.get_thermostats(get_model_thermostats(), api_request()))
+
+
+@thermostats.route('/export', methods=['GET'], strict_slashes=False)
+def export_thermostats():
+    """Streams all thermostats
+    Newline delimited JSON, one thermostat per line, read from the database in batches
+    ---
+    tags: [Thermostats]
+    produces:
+      - application/x-ndjson
+    responses:
+        200:
+            description: One Thermostat object per line
+            schema:
+                $ref: '#/definitions/Thermostat'
         500:
             description: Internal error
             schema:
@@ -49,13 +126,13 @@ def get_thermostats():
     """
     res = None
     try:
-        res = get_model_thermostats().get_thermostats()
-        logger.info('[GET] Thermostats all')
+        res = ndjson_response(get_model_thermostats().iter_thermostats(current_app.config['EXPORT_BATCH_SIZE']))
+        logger.info('[GET] Thermostats export')
     except Exception:
-        logger.exception('[GET] Thermostats all exception')
-        return jsonify(message='Unexpected error occured while getting thermostats'), 500
+        logger.exception('[GET] Thermostats export exception')
+        return respond(message('Unexpected error occured while exporting thermostats', 500))
 
-    return jsonify(res), 200
+    return res, 200
 
 
 @thermostats.route('/<int:id>', methods=['GET'], strict_slashes=False)
@@ -69,11 +146,17 @@ def get_thermostat(id):
         type: integer
         minimum: 1
         required: true
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
     responses:
         200:
             description: Thermostat returned by id
             schema:
                 $ref: '#/definitions/Thermostat'
+        304:
+            description: Not modified since the ETag sent in If-None-Match
         400:
             description: id less than 1
             schema:
@@ -83,19 +166,7 @@ def get_thermostat(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[GET] Incorrect thermostat id: {id}')
-        return jsonify(message='Thermostats id must be strictly greater than 0'), 400
-
-    res = None
-    try:
-        res = get_model_thermostats().get_thermostat(id)
-        logger.info(f'[GET] Thermostat id: {id}')
-    except Exception:
-        logger.exception(f'[GET] Thermostats id: {id} exception')
-        return jsonify(message='Unexpected error occured while getting thermostat'), 500
-
-    return jsonify(res), 200
+    return respond(handlers.get_thermostat(get_model_thermostats(), api_request(), id))
 
 
 @thermostats.route('/', methods=['POST'], strict_slashes=False)
@@ -132,40 +203,55 @@ def save_thermostat():
             schema:
                 $ref: '#/definitions/Error'
     """
-    data = request.get_json()
-
-    if not data:
-        logger.warning('[POST] Thermostats request body is empty')
-        return jsonify(message='Thermostats data is missing'), 400
+    return respond(handlers.save_thermostat(get_model_thermostats(), request.get_json()))
 
-    name = data.get('name')
-    temp = data.get('temp')
-
-    if not isinstance(name, str):
-        logger.warning('[POST] Thermostats request body incorrect value type for name:string')
-        return jsonify(message='Thermostats request body incorrect value type for name:string'), 400
-    if not isinstance(temp, int):
-        logger.warning('[POST] Thermostats request body incorrect value type for temp:integer')
-        return jsonify(message='Thermostats request body incorrect value type for temp:integer'), 400
-
-    if not name:
-        logger.warning('[POST] Thermostats request body has no [name]')
-        return jsonify(message='Thermostats data is missing parameter: name'), 400
-    if not temp and temp != 0:
-        logger.warning('[POST] Thermostats request body has no [temp]')
-        return jsonify(message='Thermostats data is missing parameter: temp'), 400
-    if temp > 300 or temp < -300:
-        logger.warning('[POST] Thermostats [temp] is out of range[-300, 300]')
-        return jsonify(message='Thermostats data is out of range[-300, 300] parameter: temp'), 400
 
+@thermostats.route('/bulk', methods=['POST'], strict_slashes=False)
+def save_thermostats():
+    """Creates thermostats in bulk
+    Validates all thermostats first and adds them in one transaction.
+    Accepts a JSON array or NDJSON (application/x-ndjson) with one thermostat per line
+    ---
+    tags: [Thermostats]
+    consumes:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: Thermostats
+        in: body
+        schema:
+            type: array
+            items:
+                $ref: '#/definitions/Thermostat'
+    responses:
+        201:
+            description: Thermostats created
+            schema:
+                type: object
+                properties:
+                    ids:
+                        type: array
+                        items:
+                            type: integer
+        400:
+            description: Body is not a JSON array or NDJSON, or an item is not valid
+            schema:
+                $ref: '#/definitions/Bad request'
+        413:
+            description: More items than the configured max batch size
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
     try:
-        get_model_thermostats().save_thermostat(name, temp)
-        logger.info(f'[POST] Thermostat added name: {name}, temp: {temp}')
-    except Exception:
-        logger.exception('[POST] Thermostats exception')
-        return jsonify(message='Unexpected error occured while saving thermostat'), 500
+        items = read_items(current_app.config['BULK_MAX_BATCH_SIZE'])
+    except ValueError as e:
+        return respond(read_items_error('Thermostats', e))
 
-    return '', 204
+    return respond(handlers.save_thermostats(get_model_thermostats(), items))
 
 
 @thermostats.route('/<int:id>', methods=['DELETE'], strict_slashes=False)
@@ -192,18 +278,7 @@ def remove_thermostat(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    if id < 1:
-        logger.warning(f'[DELETE] Incorrect thermostat id: {id}')
-        return jsonify(message='Thermostats id must be strictly greater than 0'), 400
-
-    try:
-        get_model_thermostats().delete_thermostat(id)
-        logger.info(f'[DELETE] Thermostat id: {id}')
-    except Exception:
-        logger.exception('[DELETE] Thermostats exception')
-        return jsonify(message='Unexpected error occured while removing thermostat'), 500
-
-    return '', 204
+    return respond(handlers.remove_thermostat(get_model_thermostats(), id))
 
 
 @thermostats.route('/<int:id>/temp', methods=['PUT'], strict_slashes=False)
@@ -229,6 +304,12 @@ def update_temp(id):
                 type: integer
                 minimum: -300
                 maximum: 300
+      - name: ack
+        in: query
+        type: string
+        enum: [flush, enqueue]
+        required: false
+        description: With write queue enabled, acknowledge after commit (flush) or once queued (enqueue)
     responses:
         204:
             description: Thermostat temperature updated
@@ -241,36 +322,63 @@ def update_temp(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    data = request.get_json()
-
-    if not data:
-        logger.warning(f'[PUT] Thermostats request body for update temp is empty for id: {id}')
-        return jsonify(message='Thermostats data is missing'), 400
-    if id < 1:
-        logger.warning(f'[PUT] Incorrect thermostat id: {id}')
-        return jsonify(message='Thermostats id must be strictly greater than 0'), 400
-
-    temp = data.get('temp')
+    return respond(handlers.update_temp(get_model_thermostats(), api_request(), id, request.get_json()))
 
-    if not isinstance(temp, int):
-        logger.warning('[PUT] Thermostats request body incorrect value type for temp:integer')
-        return jsonify(message='Thermostats request body incorrect value type for temp:integer'), 400
 
-    if not temp:
-        logger.warning(f'[PUT] Thermostats request body has no [temp] for id: {id}')
-        return jsonify(message='Thermostats data is missing parameter: temp'), 400
-    if temp > 300 or temp < -300:
-        logger.warning('[PUT] Thermostats [temp] is out of range[-300, 300]')
-        return jsonify(message='Thermostats data is out of range[-300, 300] parameter: temp'), 400
-
-    try:
-        get_model_thermostats().update_temp(id, temp)
-        logger.info(f'[PUT] Thermostat has been updated id: {id}, temp: {temp}')
-    except Exception:
-        logger.exception('[PUT] Thermostats exception')
-        return jsonify(message='Unexpected error occured while updating thermostat'), 500
-
-    return '', 204
+@thermostats.route('/<int:id>/history', methods=['GET'], strict_slashes=False)
+def get_temp_history(id):
+    """Returns thermostat temperature history
+    Min, max and average temperature per time bucket
+    ---
+    tags: [Thermostats]
+    parameters:
+      - name: id
+        in: path
+        type: integer
+        minimum: 1
+        required: true
+      - name: bucket
+        in: query
+        type: string
+        enum: [1m, 1h, 1d]
+        default: 1h
+      - name: from
+        in: query
+        type: integer
+        description: Range start in epoch seconds, inclusive. Defaults to one day before to
+      - name: to
+        in: query
+        type: integer
+        description: Range end in epoch seconds, exclusive. Defaults to now
+    responses:
+        200:
+            description: Aggregated temperatures ordered by bucket, buckets without readings are omitted
+            schema:
+                type: array
+                items:
+                    type: object
+                    properties:
+                        bucket:
+                            type: integer
+                            description: Bucket start in epoch seconds
+                        min:
+                            type: integer
+                        max:
+                            type: integer
+                        avg:
+                            type: number
+                        count:
+                            type: integer
+        400:
+            description: id less than 1 or incorrect range
+            schema:
+                $ref: '#/definitions/Bad request'
+        500:
+            description: Internal error
+            schema:
+                $ref: '#/definitions/Error'
+    """
+    return respond(handlers.get_temp_history(get_model_thermostats(), api_request(), id))
 
 
 @thermostats.route('/<int:id>/name', methods=['PUT'], strict_slashes=False)
@@ -305,30 +413,4 @@ def update_name(id):
             schema:
                 $ref: '#/definitions/Error'
     """
-    data = request.get_json()
-
-    if not data:
-        logger.warning(f'[PUT] Thermostats request body for update name is empty for id: {id}')
-        return jsonify(message='Thermostats data is missing'), 400
-    if id < 1:
-        logger.warning(f'[PUT] Incorrect thermostat id: {id}')
-        return jsonify(message='Thermostats id must be strictly greater than 0'), 400
-
-    name = data.get('name')
-
-    if not isinstance(name, str):
-        logger.warning('[POST] Thermostats request body incorrect value type for name:string')
-        return jsonify(message='Thermostats request body incorrect value type for name:string'), 400
-
-    if not name:
-        logger.warning(f'[PUT] Thermostats request body has no [name] for id: {id}')
-        return jsonify(message='Thermostats data is missing parameter: name'), 400
-
-    try:
-        get_model_thermostats().update_name(id, name)
-        logger.info(f'[PUT] Thermostat has been updated id: {id}, temp: {name}')
-    except Exception:
-        logger.exception('[PUT] Thermostats exception')
-        return jsonify(message='Unexpected error occured while updating thermostat'), 500
-
-    return '', 204
+    return respond(handlers.update_name(get_model_thermostats(), id, request.get_json()))
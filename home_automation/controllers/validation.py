@@ -0,0 +1,226 @@
+import time
+
+from home_automation.model.model_search import SEARCH_TABLES
+from home_automation.model.write_queue import DURABILITIES
+
+HISTORY_BUCKETS = {'1m': 60, '1h': 3600, '1d': 86400}
+
+SEARCH_MAX_LENGTH = 200
+
+
+def validate_light(data):
+    """ validates light create request body
+    :return: (name, status), status defaults to 0
+    :raises ValueError: with a message for the client
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Light data is missing')
+
+    name = data.get('name')
+    status = data.get('status')
+
+    if not isinstance(name, str):
+        raise ValueError('Lights request body incorrect value type for name:string')
+    if not name:
+        raise ValueError('Light data is missing parameter: name')
+
+    if not status:
+        status = 0
+    if not isinstance(status, int):
+        raise ValueError('Lights request body incorrect value type for status:integer')
+    if status > 1 or status < 0:
+        raise ValueError('Light data is out of range[0, 1] parameter: status')
+
+    return name, status
+
+
+def validate_thermostat(data):
+    """ validates thermostat create request body
+    :return: (name, temp)
+    :raises ValueError: with a message for the client
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Thermostats data is missing')
+
+    name = data.get('name')
+    temp = data.get('temp')
+
+    if not isinstance(name, str):
+        raise ValueError('Thermostats request body incorrect value type for name:string')
+    if not isinstance(temp, int):
+        raise ValueError('Thermostats request body incorrect value type for temp:integer')
+
+    if not name:
+        raise ValueError('Thermostats data is missing parameter: name')
+    if temp > 300 or temp < -300:
+        raise ValueError('Thermostats data is out of range[-300, 300] parameter: temp')
+
+    return name, temp
+
+
+def validate_id(id, entity):
+    """ :raises ValueError: when id is not an integer greater than 0 """
+    if not isinstance(id, int) or isinstance(id, bool):
+        raise ValueError(f'{entity} request body incorrect value type for id:integer')
+    if id < 1:
+        raise ValueError(f'{entity} id must be strictly greater than 0')
+
+    return id
+
+
+def validate_light_name(data):
+    """ validates light name update request body
+    :return: name
+    :raises ValueError: with a message for the client
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Light data is missing')
+
+    name = data.get('name')
+
+    if not isinstance(name, str):
+        raise ValueError('Lights request body incorrect value type for name:string')
+    if not name:
+        raise ValueError('Light data is missing parameter: name')
+
+    return name
+
+
+def validate_thermostat_name(data):
+    """ validates thermostat name update request body
+    :return: name
+    :raises ValueError: with a message for the client
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Thermostats data is missing')
+
+    name = data.get('name')
+
+    if not isinstance(name, str):
+        raise ValueError('Thermostats request body incorrect value type for name:string')
+    if not name:
+        raise ValueError('Thermostats data is missing parameter: name')
+
+    return name
+
+
+def validate_thermostat_temp(data):
+    """ validates thermostat temperature update request body
+    :return: temp
+    :raises ValueError: with a message for the client
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Thermostats data is missing')
+
+    temp = data.get('temp')
+
+    if not isinstance(temp, int):
+        raise ValueError('Thermostats request body incorrect value type for temp:integer')
+    if not temp:
+        raise ValueError('Thermostats data is missing parameter: temp')
+    if temp > 300 or temp < -300:
+        raise ValueError('Thermostats data is out of range[-300, 300] parameter: temp')
+
+    return temp
+
+
+def validate_ack(args):
+    """ reads ack query parameter choosing when a queued write is acknowledged
+    :return: model keyword arguments, empty when ack is not given
+    :raises ValueError: when ack is unknown
+    """
+    ack = args.get('ack')
+    if ack is None:
+        return {}
+    if ack not in DURABILITIES:
+        raise ValueError(f'ack must be one of: {", ".join(DURABILITIES)}')
+
+    return {'durability': ack}
+
+
+def validate_light_ids(data):
+    """ validates ids of lights bulk status request body
+    :return: list of ids, None when there is no body and all lights are requested
+    :raises ValueError: with a message for the client
+    """
+    if data is None:
+        return None
+    if not isinstance(data, dict):
+        raise ValueError('Lights request body must be an object with ids')
+
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not all(isinstance(id, int) and not isinstance(id, bool) for id in ids):
+        raise ValueError('Lights request body incorrect value type for ids:array of integers')
+    if any(id < 1 for id in ids):
+        raise ValueError('Light id must be strictly greater than 0')
+
+    return ids
+
+
+def validate_history_args(args, max_buckets):
+    """ reads bucket, from and to query parameters of temperature history
+    :return: (start, end, bucket seconds), the last day by hour by default
+    :raises ValueError: with a message for the client
+    """
+    bucket = args.get('bucket', '1h')
+    if bucket not in HISTORY_BUCKETS:
+        raise ValueError(f'bucket must be one of: {", ".join(HISTORY_BUCKETS)}')
+    bucket = HISTORY_BUCKETS[bucket]
+
+    try:
+        end = int(args.get('to', int(time.time()) + 1))
+        start = int(args.get('from', end - HISTORY_BUCKETS['1d']))
+    except ValueError:
+        raise ValueError('from and to must be epoch seconds')
+    if start >= end:
+        raise ValueError('from must be less than to')
+
+    if (end - start) / bucket > max_buckets:
+        raise ValueError(f'Time range has more than {max_buckets} buckets, use a larger bucket')
+
+    return start, end, bucket
+
+
+def validate_search_args(args, default_limit, max_limit):
+    """ reads q, type and limit query parameters of device search
+    :return: (text, searched tables, limit)
+    :raises ValueError: with a message for the client
+    """
+    text = args.get('q', '').strip()
+    if not text:
+        raise ValueError('q must not be empty')
+    if len(text) > SEARCH_MAX_LENGTH:
+        raise ValueError(f'q must be at most {SEARCH_MAX_LENGTH} characters')
+
+    tables = tuple(SEARCH_TABLES)
+    if 'type' in args:
+        if args['type'] not in SEARCH_TABLES:
+            raise ValueError(f'type must be one of: {", ".join(SEARCH_TABLES)}')
+        tables = (args['type'],)
+
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be strictly greater than 0')
+
+    return text, tables, min(limit, max_limit)
+
+
+def validate_changes_args(args, default_limit, max_limit):
+    """ reads since and limit query parameters of changes
+    :return: (since, limit)
+    :raises ValueError: with a message for the client
+    """
+    try:
+        since = int(args.get('since', 0))
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('since and limit must be integers')
+    if since < 0:
+        raise ValueError('since must not be negative')
+    if limit < 1:
+        raise ValueError('limit must be strictly greater than 0')
+
+    return since, min(limit, max_limit)
@@ -1,7 +1,7 @@
 import sqlite3
 from sqlite3 import Error
-from pathlib import Path
 
+from home_automation.database.migrations import migrate
 from home_automation.settings import DB_PATH
 
 
@@ -21,45 +21,14 @@ def _get_connection(db_file):
     return conn
 
 
-def _create_table(conn, create_table_sql):
-    """ create a table from the create_table_sql statement
-    :param conn: Connection object
-    :param create_table_sql: a CREATE TABLE statement
-    :return:
+def create_database():
+    """ creates the database or brings an existing one to the latest schema version
+    :return: (version before, version after, milliseconds spent migrating)
     """
+    conn = _get_connection(DB_PATH)
     try:
-        c = conn.cursor()
-        c.execute(create_table_sql)
-    except Error as e:
-        print(e)
-
-
-def _create_lights(conn):
-    sql_create_ligths = """ CREATE TABLE IF NOT EXISTS lights (
-                                id integer PRIMARY KEY,
-                                name text NOT NULL,
-                                status integer default 0,
-                                creation_date text
-                            ); """
-    _create_table(conn, sql_create_ligths)
-
-
-def _create_thermostats(conn):
-    sql_create_thermostats = """CREATE TABLE IF NOT EXISTS thermostats (
-                                    id integer PRIMARY KEY,
-                                    name text NOT NULL,
-                                    temp integer default 0,
-                                    creation_date text
-                                );"""
-    print(_create_table(conn, sql_create_thermostats))
-
-
-def create_database():
-    db = Path(DB_PATH)
-    if not db.exists():
-        conn = _get_connection(DB_PATH)
-        _create_lights(conn)
-        _create_thermostats(conn)
+        return migrate(conn)
+    finally:
         conn.close()
 
 
@@ -0,0 +1,227 @@
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# STRICT tables need SQLite 3.37, older libraries get the same typed columns without type enforcement
+STRICT = ' STRICT' if sqlite3.sqlite_version_info >= (3, 37, 0) else ''
+
+
+def _rebuild(table, create_sql, columns, indexes):
+    """ statements replacing a table by one created with create_sql, the way SQLite recommends
+        for changes ALTER TABLE can not make: create, copy, drop, rename, recreate indexes
+    :param create_sql: CREATE TABLE statement of the new table, {table} is its name
+    :param columns: SELECT list copying rows from the old table
+    """
+    new_table = f'{table}_new'
+    return [
+        create_sql.format(table=new_table),
+        f"""INSERT INTO {new_table} SELECT {columns} FROM {table}""",
+        f"""DROP TABLE {table}""",
+        f"""ALTER TABLE {new_table} RENAME TO {table}""",
+        *indexes
+    ]
+
+
+_LIGHTS_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS lights_name ON lights (name)""",
+    """CREATE INDEX IF NOT EXISTS lights_creation_date ON lights (creation_date)"""
+]
+
+_THERMOSTATS_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS thermostats_name ON thermostats (name)""",
+    """CREATE INDEX IF NOT EXISTS thermostats_creation_date ON thermostats (creation_date)"""
+]
+
+# covering index, range aggregates per thermostat never touch the table
+_THERMOSTAT_TEMPS_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS thermostat_temps_thermostat_id_recorded_at
+       ON thermostat_temps (thermostat_id, recorded_at, temp)"""
+]
+
+
+def _search_index(table):
+    """ statements of an external content FTS5 index over names of table, kept in sync by triggers
+        rows of table are the content, the index stores only tokens. Updates of other columns
+        than name do not touch it
+    """
+    fts = f'{table}_fts'
+    return [
+        f"""CREATE VIRTUAL TABLE {fts} USING fts5(
+                name, content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""",
+        f"""CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);
+            END""",
+        f"""CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+            END""",
+        f"""CREATE TRIGGER {fts}_update AFTER UPDATE OF name ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);
+            END""",
+        f"""INSERT INTO {fts}({fts}) VALUES ('rebuild')"""
+    ]
+
+
+def _change_tracking(table, columns):
+    """ statements numbering writes to table from the change_sequence counter, shared by all tables.
+        seq of a row is the number of its last create or update, deletes leave a tombstone
+    :param columns: columns whose updates are changes, the UPDATE setting seq is not one of them
+    """
+    changed = ' OR '.join(f'new.{column} IS NOT old.{column}' for column in columns)
+    next_seq = """UPDATE change_sequence SET value = value + 1;"""
+    return [
+        f"""ALTER TABLE {table} ADD COLUMN seq INTEGER NOT NULL DEFAULT 0""",
+        # existing rows get numbers in id order, after those of previous tables
+        f"""UPDATE {table} SET seq = id + (SELECT value FROM change_sequence)""",
+        f"""UPDATE change_sequence SET value = max(value, (SELECT coalesce(max(seq), 0) FROM {table}))""",
+        f"""CREATE INDEX {table}_seq ON {table} (seq)""",
+        f"""CREATE TRIGGER {table}_seq_insert AFTER INSERT ON {table} BEGIN
+                {next_seq}
+                UPDATE {table} SET seq = (SELECT value FROM change_sequence) WHERE id = new.id;
+                DELETE FROM tombstones WHERE device_table = '{table}' AND id = new.id;
+            END""",
+        f"""CREATE TRIGGER {table}_seq_update AFTER UPDATE OF {', '.join(columns)} ON {table}
+            WHEN {changed} BEGIN
+                {next_seq}
+                UPDATE {table} SET seq = (SELECT value FROM change_sequence) WHERE id = new.id;
+            END""",
+        f"""CREATE TRIGGER {table}_seq_delete AFTER DELETE ON {table} BEGIN
+                {next_seq}
+                INSERT OR REPLACE INTO tombstones(device_table, id, seq)
+                VALUES ('{table}', old.id, (SELECT value FROM change_sequence));
+            END"""
+    ]
+
+
+# (version, description, statements) in the order they are applied, PRAGMA user_version
+# of a database is the version of its last applied migration. Released migrations never change,
+# schema changes are new migrations appended to the list.
+MIGRATIONS = [
+    (1, 'initial schema', [
+        # IF NOT EXISTS, databases created before migrations already have these tables
+        """CREATE TABLE IF NOT EXISTS lights (
+               id integer PRIMARY KEY,
+               name text NOT NULL,
+               status integer default 0,
+               creation_date text
+           )""",
+        """CREATE TABLE IF NOT EXISTS thermostats (
+               id integer PRIMARY KEY,
+               name text NOT NULL,
+               temp integer default 0,
+               creation_date text
+           )""",
+        """CREATE TABLE IF NOT EXISTS thermostat_temps (
+               thermostat_id integer NOT NULL,
+               recorded_at integer NOT NULL,
+               temp integer NOT NULL
+           )""",
+        *_THERMOSTAT_TEMPS_INDEXES
+    ]),
+    (2, 'indexes on name and creation_date', [
+        *_LIGHTS_INDEXES,
+        *_THERMOSTATS_INDEXES
+    ]),
+    (3, 'typed columns', [
+        *_rebuild('lights', """CREATE TABLE {table} (
+                                   id INTEGER PRIMARY KEY,
+                                   name TEXT NOT NULL,
+                                   status INTEGER NOT NULL DEFAULT 0,
+                                   creation_date TEXT
+                               )""" + STRICT,
+                  'id, name, COALESCE(status, 0), creation_date', _LIGHTS_INDEXES),
+        *_rebuild('thermostats', """CREATE TABLE {table} (
+                                        id INTEGER PRIMARY KEY,
+                                        name TEXT NOT NULL,
+                                        temp INTEGER NOT NULL DEFAULT 0,
+                                        creation_date TEXT
+                                    )""" + STRICT,
+                  'id, name, COALESCE(temp, 0), creation_date', _THERMOSTATS_INDEXES),
+        *_rebuild('thermostat_temps', """CREATE TABLE {table} (
+                                             thermostat_id INTEGER NOT NULL,
+                                             recorded_at INTEGER NOT NULL,
+                                             temp INTEGER NOT NULL
+                                         )""" + STRICT,
+                  'thermostat_id, recorded_at, temp', _THERMOSTAT_TEMPS_INDEXES)
+    ]),
+    # rowid is the last column of every index, so they also serve ORDER BY <column>, id
+    (4, 'indexes on status and temp', [
+        """CREATE INDEX IF NOT EXISTS lights_status ON lights (status)""",
+        """CREATE INDEX IF NOT EXISTS thermostats_temp ON thermostats (temp)"""
+    ]),
+    (5, 'full-text search of names', [
+        *_search_index('lights'),
+        *_search_index('thermostats')
+    ]),
+    (6, 'change sequence and tombstones', [
+        """CREATE TABLE change_sequence (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               value INTEGER NOT NULL
+           )""" + STRICT,
+        """INSERT INTO change_sequence(id, value) VALUES (1, 0)""",
+        # one per deleted id, an id created again removes it
+        """CREATE TABLE tombstones (
+               device_table TEXT NOT NULL,
+               id INTEGER NOT NULL,
+               seq INTEGER NOT NULL,
+               PRIMARY KEY (device_table, id)
+           )""" + STRICT,
+        """CREATE INDEX tombstones_seq ON tombstones (seq)""",
+        *_change_tracking('lights', ('name', 'status', 'creation_date')),
+        *_change_tracking('thermostats', ('name', 'temp', 'creation_date'))
+    ])
+]
+
+
+def get_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def _apply(conn, version, description, statements):
+    """ applies one migration in its own transaction
+    :return: False when another process applied it first
+    """
+    # IMMEDIATE takes the write lock up front, processes starting together migrate one at a time
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if get_version(conn) >= version:
+            conn.execute('ROLLBACK')
+            return False
+        for sql in statements:
+            conn.execute(sql)
+        conn.execute(f'PRAGMA user_version = {int(version)}')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        logger.exception(f'Database migration {version} {description} failed')
+        raise
+    return True
+
+
+def migrate(conn, migrations=MIGRATIONS):
+    """ applies migrations newer than the version of the database, in order
+    :param conn: connection, its transactions are managed here
+    :return: (version before, version after, milliseconds spent migrating)
+    :raises sqlite3.Error: when a migration fails, it is rolled back and later ones are not applied
+    """
+    start = time.perf_counter()
+    conn.isolation_level = None
+    from_version = get_version(conn)
+
+    for version, description, statements in migrations:
+        if version <= from_version:
+            continue
+        migration_start = time.perf_counter()
+        if _apply(conn, version, description, statements):
+            logger.info(f'Database migration {version} {description} applied in '
+                        f'{(time.perf_counter() - migration_start) * 1000:.1f} ms')
+
+    to_version = get_version(conn)
+    elapsed = (time.perf_counter() - start) * 1000
+    if to_version != from_version:
+        logger.info(f'Database migrated from version {from_version} to {to_version} in {elapsed:.1f} ms')
+    return from_version, to_version, elapsed
@@ -0,0 +1,147 @@
+import atexit
+import logging
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(levelname)s - %(asctime)s / %(message)s / %(name)s / line: %(lineno)d'
+LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+SLOW_QUERY_LOGGER = 'home_automation.slow_queries'
+
+
+class DroppingQueueHandler(QueueHandler):
+    """ QueueHandler which never blocks the logging thread, records are dropped while the queue is full """
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped += 1
+
+    def take_dropped(self):
+        with self._lock_dropped:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class SamplingFilter(logging.Filter):
+    """ keeps only sample_rate of INFO and lower records of the given logger and its children,
+        warnings and errors always pass
+    """
+
+    def __init__(self, name, sample_rate):
+        super().__init__()
+        self.prefix = name
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.sample_rate >= 1:
+            return True
+        if record.name != self.prefix and not record.name.startswith(self.prefix + '.'):
+            return True
+        return random.random() < self.sample_rate
+
+
+class BatchFileHandler(logging.FileHandler):
+    """ FileHandler which leaves flushing to BatchingQueueListener, once per batch """
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(QueueListener):
+    """ QueueListener handling up to batch_size queued records per wake up and flushing handlers once """
+
+    def __init__(self, queue, *handlers, batch_size=100, queue_handler=None):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.queue_handler = queue_handler
+
+    def after_fork(self):
+        """ the writer thread does not survive fork, start a new one with its own queue """
+        log_queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.queue = log_queue
+        if self.queue_handler is not None:
+            self.queue_handler.queue = log_queue
+        self._thread = None
+        self.start()
+
+    def enqueue_sentinel(self):
+        # the queue may be full, wait for the listener to make room
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        stop = False
+        while not stop:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                self.queue.task_done()
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+
+            if self.queue_handler is not None:
+                dropped = self.queue_handler.take_dropped()
+                if dropped:
+                    self.handle(logging.makeLogRecord({
+                        'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                        'msg': f'Log queue full, dropped records: {dropped}'}))
+
+            for handler in self.handlers:
+                handler.flush()
+
+
+def configure_logging(filename, slow_query_filename=None, level=logging.INFO, queue_size=10000, batch_size=100,
+                      sample_rate=1.0, sampled_logger='home_automation.controllers'):
+    """ routes all logging through a bounded queue to a background thread writing the files
+    :param slow_query_filename: file of the slow query log, it is kept out of the main log
+    :param sample_rate: share of per request INFO records of sampled_logger which are kept
+    :return: started listener, it is stopped at exit
+    """
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT)
+    handlers = []
+
+    file_handler = BatchFileHandler(filename)
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+
+    if slow_query_filename:
+        file_handler.addFilter(lambda record: record.name != SLOW_QUERY_LOGGER)
+        slow_query_handler = BatchFileHandler(slow_query_filename)
+        slow_query_handler.setFormatter(logging.Formatter('%(asctime)s / %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+        slow_query_handler.addFilter(lambda record: record.name == SLOW_QUERY_LOGGER)
+        handlers.append(slow_query_handler)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sampled_logger, sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers = [queue_handler]
+
+    listener = BatchingQueueListener(log_queue, *handlers, batch_size=batch_size, queue_handler=queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
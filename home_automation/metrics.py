@@ -0,0 +1,142 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import g, request
+
+# seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram():
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """ cumulative (le, count) pairs, the last one is +Inf """
+        cumulative = 0
+        for le, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield le, cumulative
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class Metrics():
+    """ In process request and database metrics rendered in Prometheus text format """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._request_latency = defaultdict(Histogram)
+        self._responses = defaultdict(int)
+        self._in_flight = defaultdict(int)
+        self._query_latency = defaultdict(Histogram)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def request_started(self, endpoint, method):
+        with self._lock:
+            self._in_flight[(endpoint, method)] += 1
+
+    def request_finished(self, endpoint, method, status, seconds):
+        with self._lock:
+            self._in_flight[(endpoint, method)] -= 1
+            self._responses[(endpoint, method, status)] += 1
+            self._request_latency[(endpoint, method)].observe(seconds)
+
+    def observe_query(self, table, sql, seconds):
+        if not self.enabled:
+            return
+        statement = sql.lstrip().split(None, 1)[0].upper()
+        with self._lock:
+            self._query_latency[(table, statement)].observe(seconds)
+
+    def _render_histogram(self, lines, name, histograms, label_names):
+        for key, histogram in sorted(histograms.items(), key=lambda item: str(item[0])):
+            labels = _labels(**dict(zip(label_names, key)))
+            for le, count in histogram.samples():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+    def render(self, extra=()):
+        """ :param extra: (name, type, help, value) of additional unlabeled metrics """
+        lines = []
+        with self._lock:
+            lines.append('# HELP http_request_duration_seconds Request latency per route')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            self._render_histogram(lines, 'http_request_duration_seconds', self._request_latency,
+                                   ('endpoint', 'method'))
+
+            lines.append('# HELP http_requests_total Responses per route and status code')
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, method, status), count in sorted(self._responses.items(), key=str):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f'http_requests_total{{{labels}}} {count}')
+
+            lines.append('# HELP http_requests_in_flight Requests being handled per route')
+            lines.append('# TYPE http_requests_in_flight gauge')
+            for (endpoint, method), count in sorted(self._in_flight.items()):
+                lines.append(f'http_requests_in_flight{{{_labels(endpoint=endpoint, method=method)}}} {count}')
+
+            lines.append('# HELP db_query_duration_seconds Time spent executing SQL in Model')
+            lines.append('# TYPE db_query_duration_seconds histogram')
+            self._render_histogram(lines, 'db_query_duration_seconds', self._query_latency,
+                                   ('table', 'statement'))
+
+        for name, type, help, value in extra:
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {type}')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_status = 500
+    metrics.request_started(request.endpoint or 'none', request.method)
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    metrics.request_finished(request.endpoint or 'none', request.method, g.pop('metrics_status', 500),
+                             time.perf_counter() - start)
+
+
+def init_app(app):
+    """ records latency, status codes and in flight requests of every route """
+    metrics.enabled = app.config['METRICS_ENABLED']
+    if not metrics.enabled:
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
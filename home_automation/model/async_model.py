@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from home_automation.settings import ASYNC_DB_WORKERS
+
+# SQLite calls of the asyncio app, the number of threads bounds concurrent database work
+executor = ThreadPoolExecutor(max_workers=ASYNC_DB_WORKERS, thread_name_prefix='sqlite')
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class AsyncModel():
+    """ Awaitable facade of a Model, every method call runs on the executor
+    Executor threads keep their own pooled connections, a request waiting
+    for its turn holds neither a thread nor a connection.
+    """
+
+    def __init__(self, model, executor=executor):
+        self._model = model
+        self._executor = executor
+
+    def __getattr__(self, name):
+        method = getattr(self._model, name)
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+        return call
+
+    def get_version(self, id=None):
+        # versions are kept in memory, no need for the executor
+        return self._model.get_version(id)
+
+    async def iterate(self, name, *args, batch_size=500):
+        """ yields rows of a generator method such as iter_lights
+            the generator runs in one executor thread, a SQLite connection can not change threads,
+            and hands rows over batch_size at a time. It stops once the consumer is closed
+        """
+        loop = asyncio.get_event_loop()
+        batches = asyncio.Queue()
+        # at most two batches wait for the consumer
+        slots = threading.Semaphore(2)
+        stop = threading.Event()
+
+        def put(item):
+            while not slots.acquire(timeout=0.5):
+                if stop.is_set():
+                    raise _Stopped()
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                loop.call_soon_threadsafe(batches.put_nowait, item)
+            except RuntimeError:
+                # the event loop is closed
+                raise _Stopped()
+
+        def produce():
+            rows = getattr(self._model, name)(*args)
+            try:
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) == batch_size:
+                        put(batch)
+                        batch = []
+                if batch:
+                    put(batch)
+                put(_DONE)
+            except _Stopped:
+                pass
+            except Exception as e:
+                try:
+                    put(e)
+                except _Stopped:
+                    pass
+            finally:
+                rows.close()
+
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                batch = await batches.get()
+                slots.release()
+                if batch is _DONE:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                for row in batch:
+                    yield row
+            await producer
+        finally:
+            stop.set()
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class Cache():
+    """ Bounded LRU cache with TTL for model reads
+    Keys are tuples starting with (table, kind), kind is either 'list' for
+    collection reads or 'row' followed by the row id. Cached values are shared
+    between callers and must not be mutated.
+    :param max_size: max number of cached entries, least recently used are evicted first
+    :param ttl: seconds an entry stays valid
+    """
+
+    def __init__(self, max_size=1024, ttl=5, enabled=True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        if not self.enabled:
+            return loader()
+
+        table = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generations[table]
+
+        value = loader()
+
+        with self._lock:
+            # a write committed while loading, the value may already be stale
+            if self._generations[table] == generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self, table, ids=None):
+        """ drop collection reads of a table and row reads of given ids,
+            all reads of the table when ids are unknown
+        """
+        with self._lock:
+            self._generations[table] += 1
+            ids = None if ids is None else set(ids)
+            for key in list(self._entries):
+                if key[0] != table:
+                    continue
+                if ids is None or key[1] != 'row' or key[2] in ids:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl
+            }
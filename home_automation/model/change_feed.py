@@ -0,0 +1,53 @@
+import threading
+from collections import deque
+
+
+class ChangeFeed():
+    """ Bounded in memory log of model changes for streaming clients
+    Every change gets a sequence number, clients resume from the last one they got.
+    :param size: number of changes kept for replay
+    """
+
+    def __init__(self, size=1000):
+        self.size = size
+        self._events = deque(maxlen=size)
+        self._last_id = 0
+        self._cond = threading.Condition()
+        self._listeners = []
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, table, ids, op):
+        """ ids None means the whole table changed """
+        with self._cond:
+            for id in ids if ids is not None else (None,):
+                self._last_id += 1
+                self._events.append({'seq': self._last_id, 'table': table, 'id': id, 'op': op})
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener()
+
+    def subscribe(self, listener):
+        """ listener is called without arguments after every publish, from the publishing thread """
+        with self._cond:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._cond:
+            self._listeners.remove(listener)
+
+    def can_resume(self, last_id):
+        """ False when changes after last_id are no longer buffered """
+        with self._cond:
+            oldest = self._events[0]['seq'] if self._events else self._last_id + 1
+            return oldest - 1 <= last_id <= self._last_id
+
+    def wait(self, last_id, timeout):
+        """ changes after last_id, waits up to timeout seconds for the first one """
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id > last_id, timeout)
+            return [event for event in self._events if event['seq'] > last_id]
@@ -0,0 +1,90 @@
+import logging
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from sqlite3 import Error
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool():
+    """ Process wide pool of configured SQLite connections, a connection is used by one thread at a time
+        and handed to any other thread once released, the most recently released first
+    :param db_path: database file
+    :param size: max number of idle connections kept
+    :param max_idle: seconds an idle connection is kept before it is reopened
+    :param busy_timeout: milliseconds to wait on a locked database
+    :param statement_cache_size: number of prepared statements cached per connection
+    """
+
+    def __init__(self, db_path, size=2, max_idle=300, busy_timeout=5000, statement_cache_size=128):
+        self.db_path = db_path
+        self.size = size
+        self.max_idle = max_idle
+        self.busy_timeout = busy_timeout
+        self.statement_cache_size = statement_cache_size
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000,
+                                   cached_statements=self.statement_cache_size, check_same_thread=False)
+        except Error:
+            logger.exception(f'Could not connect to a database: {self.db_path}')
+            raise
+
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+        return conn
+
+    def acquire(self):
+        now = time.monotonic()
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if now - last_used <= self.max_idle:
+                return conn
+            conn.close()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # includes GeneratorExit of a streaming read closed early
+            try:
+                conn.rollback()
+            except Error:
+                # connection is unusable, do not return it to the pool
+                conn.close()
+            else:
+                self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def after_fork(self):
+        """ forget connections inherited from the parent process, SQLite connections must not cross fork """
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+    def close(self):
+        """ close idle connections """
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
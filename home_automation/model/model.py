@@ -1,27 +1,250 @@
-import logging
-import sqlite3
-from sqlite3 import Error
+import threading
+import time
+from contextlib import contextmanager
 
-from home_automation.settings import DB_PATH
+from home_automation.metrics import metrics
+
+from home_automation.model.cache import Cache
+from home_automation.model.change_feed import ChangeFeed
+from home_automation.model.connection_pool import ConnectionPool
+from home_automation.model.query import compile_query
+from home_automation.model.query_trace import QueryTracer
+from home_automation.model.versions import DataVersions
+from home_automation.model.write_queue import WriteQueue
+from home_automation.settings import (DB_PATH, DB_POOL_SIZE, DB_POOL_MAX_IDLE, DB_BUSY_TIMEOUT,
+                                      DB_STATEMENT_CACHE_SIZE, CACHE_ENABLED, CACHE_MAX_SIZE, CACHE_TTL,
+                                      WRITE_QUEUE_ENABLED, WRITE_QUEUE_INTERVAL_MS, WRITE_QUEUE_MAX_OPS,
+                                      WRITE_QUEUE_DURABILITY, CHANGE_FEED_SIZE, QUERY_TRACE_ENABLED,
+                                      SLOW_QUERY_THRESHOLD_MS)
+
+# stay well below SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds
+MAX_SQL_VARIABLES = 500
+
+pool = ConnectionPool(DB_PATH,
+                      size=DB_POOL_SIZE,
+                      max_idle=DB_POOL_MAX_IDLE,
+                      busy_timeout=DB_BUSY_TIMEOUT,
+                      statement_cache_size=DB_STATEMENT_CACHE_SIZE)
+
+cache = Cache(max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL, enabled=CACHE_ENABLED)
+
+versions = DataVersions()
+
+change_feed = ChangeFeed(size=CHANGE_FEED_SIZE)
+
+tracer = QueryTracer(enabled=QUERY_TRACE_ENABLED, slow_threshold_ms=SLOW_QUERY_THRESHOLD_MS)
+
+# connection and pending changes of the transaction open in the current thread
+_local = threading.local()
+
+
+def chunks(values, size=MAX_SQL_VARIABLES):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def placeholders(values):
+    return ', '.join('?' * len(values))
+
+
+def _dicts(cur, rows):
+    """ rows are fetched as plain tuples and turned into dicts once, instead of sqlite3.Row then dict """
+    if not rows:
+        return []
+    fields = [column[0] for column in cur.description]
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _cursor(conn):
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+
+def _observe(table, sql, values, rows, connect_time, execute_time):
+    metrics.observe_query(table, sql, execute_time)
+    tracer.record(sql, values, rows, connect_time, execute_time)
+
+
+def _notify(table, ids, op):
+    # a read between the two must not get the new version with rows cached before the write
+    cache.invalidate(table, ids)
+    versions.bump(table, ids)
+    change_feed.publish(table, ids, op)
+
+
+@contextmanager
+def transaction():
+    """ single write transaction, committed once when the block exits
+        and rolled back on any exception. Model calls made by the same thread
+        inside the block join it, nested blocks join the outermost one.
+        Writes waiting in the write queue are committed before the outermost block
+        begins, otherwise they would be applied after it and overwrite it
+    """
+    if write_queue.enabled and getattr(_local, 'conn', None) is None:
+        write_queue.flush()
+    with _write_transaction() as conn:
+        yield conn
+
+
+@contextmanager
+def _write_transaction():
+    """ transaction of the write queue batches, which must not wait for the queue """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        yield conn
+        return
+
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        connected = time.perf_counter()
+        conn.execute('BEGIN IMMEDIATE')
+        # waiting for the write lock of other connections is part of BEGIN IMMEDIATE
+        _observe('transaction', 'BEGIN IMMEDIATE', '', 0, connected - start, time.perf_counter() - connected)
+        _local.conn, _local.changes = conn, []
+        try:
+            yield conn
+            committing = time.perf_counter()
+            conn.commit()
+            _observe('transaction', 'COMMIT', '', 0, 0.0, time.perf_counter() - committing)
+            changes = _local.changes
+        finally:
+            _local.conn, _local.changes = None, None
+
+    for table, ids, op in changes:
+        _notify(table, ids, op)
+
+
+write_queue = WriteQueue(_write_transaction,
+                         interval=WRITE_QUEUE_INTERVAL_MS / 1000,
+                         max_ops=WRITE_QUEUE_MAX_OPS,
+                         durability=WRITE_QUEUE_DURABILITY,
+                         enabled=WRITE_QUEUE_ENABLED)
+
+
+def after_fork():
+    """ called in every worker of a pre-fork server, cache, versions and change feed are per worker from now on """
+    pool.after_fork()
+    write_queue.after_fork()
+    versions.after_fork()
+    cache.clear()
 
 
 class Model():
+    table = None
+
+    @contextmanager
     def _db_conn(self):
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-        except Error:
-            logging.exception(f'Could not connect to a database: {DB_PATH}')
+        conn = getattr(_local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
 
-        return conn
+        with pool.connection() as conn:
+            yield conn
+
+    def _transaction(self):
+        return transaction()
+
+    def _commit(self, conn):
+        # inside a transaction block the block commits
+        if getattr(_local, 'conn', None) is None:
+            conn.commit()
 
     def _exec(self, sql, values=''):
-        conn = self._db_conn()
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        cur.execute(sql, values)
-        conn.commit()
-        res = [dict(row) for row in cur.fetchall()]
-        conn.close()
+        start = time.perf_counter()
+        with self._db_conn() as conn:
+            connected = time.perf_counter()
+            cur = _cursor(conn)
+            cur.execute(sql, values)
+            self._commit(conn)
+            res = _dicts(cur, cur.fetchall())
+        end = time.perf_counter()
 
+        _observe(self.table, sql, values, len(res), connected - start, end - connected)
         return res
+
+    def _executemany(self, sql, seq_of_values):
+        """ runs sql once per values of seq_of_values, seq_of_values is a list
+        :return: number of changed rows
+        """
+        start = time.perf_counter()
+        with self._db_conn() as conn:
+            connected = time.perf_counter()
+            cur = conn.executemany(sql, seq_of_values)
+            self._commit(conn)
+        end = time.perf_counter()
+
+        # traced with the values of the first execution
+        _observe(self.table, sql, seq_of_values[0] if seq_of_values else '', cur.rowcount,
+                 connected - start, end - connected)
+        return cur.rowcount
+
+    def _iter(self, sql, values='', batch_size=500):
+        """ yields rows one by one while holding only batch_size of them in memory """
+        with self._db_conn() as conn:
+            cur = _cursor(conn)
+            try:
+                cur.execute(sql, values)
+                rows = cur.fetchmany(batch_size)
+                while rows:
+                    yield from _dicts(cur, rows)
+                    rows = cur.fetchmany(batch_size)
+            finally:
+                # an open cursor keeps its read snapshot, the next user of the connection must not inherit it
+                cur.close()
+
+    def _execute(self, sql, values):
+        start = time.perf_counter()
+        with self._db_conn() as conn:
+            connected = time.perf_counter()
+            cur = conn.execute(sql, values)
+            self._commit(conn)
+        end = time.perf_counter()
+
+        _observe(self.table, sql, values, cur.rowcount, connected - start, end - connected)
+        return cur
+
+    def _insert(self, sql, values):
+        return self._execute(sql, values).lastrowid
+
+    def _write(self, sql, values):
+        """ runs an UPDATE or DELETE
+        :return: number of changed rows, writes which change nothing must not call _changed
+        """
+        return self._execute(sql, values).rowcount
+
+    def _queued(self, key, fn, *args, durability=None):
+        """ applies fn through the write queue when it is enabled, writes inside
+            a transaction block are applied right away to keep the block atomic
+        """
+        if write_queue.enabled and getattr(_local, 'conn', None) is None:
+            return write_queue.submit((self.table, *key), fn, *args, durability=durability)
+        return fn(*args)
+
+    def _cached(self, key, sql, values=''):
+        # reads inside a transaction block may see writes which are not committed yet
+        if getattr(_local, 'conn', None) is not None:
+            return self._exec(sql, values)
+        return cache.get_or_load((self.table, *key), lambda: self._exec(sql, values))
+
+    def _query(self, query, limit=None, after_id=0, after=None):
+        """ rows matching a filter and sort Query, keyset paginated after (after, after_id) """
+        sql, values = compile_query(self.table, query, limit, after_id, after)
+        return self._cached(('list', query, limit, after_id, after), sql, values)
+
+    def _changed(self, ids=None, op='update'):
+        """ must be called after every write to the table, op is one of create, update or delete.
+            Inside a transaction block it takes effect once the block commits
+        """
+        changes = getattr(_local, 'changes', None)
+        if changes is not None:
+            changes.append((self.table, ids, op))
+        else:
+            _notify(self.table, ids, op)
+
+    def get_version(self, id=None):
+        """ entity tag of the whole table or of a single row, changes on every write """
+        if id is None:
+            return versions.table_tag(self.table)
+        return versions.row_tag(self.table, id)
@@ -0,0 +1,43 @@
+from home_automation.model.model import Model
+
+# tables whose writes are numbered by the change sequence
+CHANGE_TABLES = ('lights', 'thermostats')
+
+
+class ModelChanges(Model):
+    table = 'changes'
+
+    def get_sequence(self):
+        """ number of the last write to lights or thermostats, 0 before the first one """
+        return self._exec("""SELECT value FROM change_sequence""")[0]['value']
+
+    def get_changes(self, since, limit=1000):
+        """ rows created or updated and ids deleted after the change sequence number since, in write order.
+            A row written several times is returned once with its last seq
+        :param limit: max number of changes, the rest are returned when calling again with the returned since
+        :return: {'since': seq of the last returned change or since, 'more': whether changes are left,
+                  'lights': rows, 'thermostats': rows, 'deleted': {'lights': ids, 'thermostats': ids}}
+        """
+        # one statement reads one snapshot, every branch is a range of a seq index
+        sql = """SELECT seq, 'lights' AS device_table, id, name, status, NULL AS temp, creation_date, 0 AS deleted
+                 FROM lights WHERE seq>:since
+                 UNION ALL
+                 SELECT seq, 'thermostats', id, name, NULL, temp, creation_date, 0
+                 FROM thermostats WHERE seq>:since
+                 UNION ALL
+                 SELECT seq, device_table, id, NULL, NULL, NULL, NULL, 1
+                 FROM tombstones WHERE seq>:since
+                 ORDER BY seq LIMIT :limit"""
+        rows = self._exec(sql, {'since': since, 'limit': limit + 1})
+
+        changes = {'since': since, 'more': len(rows) > limit, 'deleted': {table: [] for table in CHANGE_TABLES}}
+        changes.update((table, []) for table in CHANGE_TABLES)
+        for row in rows[:limit]:
+            changes['since'] = row['seq']
+            if row['deleted']:
+                changes['deleted'][row['device_table']].append(row['id'])
+                continue
+            value = 'status' if row['device_table'] == 'lights' else 'temp'
+            changes[row['device_table']].append({'id': row['id'], 'name': row['name'], value: row[value],
+                                                 'creation_date': row['creation_date'], 'seq': row['seq']})
+        return changes
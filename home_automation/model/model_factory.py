@@ -1,4 +1,8 @@
+from home_automation.model.async_model import AsyncModel
+from home_automation.model.model import transaction
+from home_automation.model.model_changes import ModelChanges
 from home_automation.model.model_lights import ModelLights
+from home_automation.model.model_search import ModelSearch
 from home_automation.model.model_thermostats import ModelThermostats
 
 
@@ -8,3 +12,23 @@ def get_model_lights():
 
 def get_model_thermostats():
     return ModelThermostats()
+
+
+def get_model_changes():
+    return ModelChanges()
+
+
+def get_model_search():
+    return ModelSearch()
+
+
+def get_transaction():
+    return transaction()
+
+
+def get_async_model_lights():
+    return AsyncModel(ModelLights())
+
+
+def get_async_model_thermostats():
+    return AsyncModel(ModelThermostats())
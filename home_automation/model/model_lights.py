@@ -1,31 +1,100 @@
 from datetime import datetime
 
-from home_automation.model.model import Model
+from home_automation.model.model import Model, chunks, placeholders
 
 
 class ModelLights(Model):
-    def get_lights(self):
-        sql = """SELECT * FROM lights"""
-        return self._exec(sql)
+    table = 'lights'
+
+    def get_lights(self, limit=None, after_id=0, query=None, after=None):
+        """ :param query: filters and sort of a Query, rows are ordered by id without it
+        :param after: sort column value of the last row of the previous page of a sorted query
+        """
+        if query is not None:
+            return self._query(query, limit, after_id, after)
+        if limit is None:
+            sql = """SELECT * FROM lights"""
+            return self._cached(('list',), sql)
+
+        sql = """SELECT * FROM lights WHERE id>? ORDER BY id LIMIT ?"""
+        return self._cached(('list', after_id, limit), sql, (after_id, limit))
+
+    def iter_lights(self, batch_size=500):
+        sql = """SELECT * FROM lights ORDER BY id"""
+        return self._iter(sql, batch_size=batch_size)
 
     def get_light(self, id):
         sql = """SELECT * FROM lights WHERE id=?"""
-        return self._exec(sql, (id,))
+        return self._cached(('row', id), sql, (id,))
 
     def save_light(self, name, status=0):
         sql = """INSERT INTO lights(name, status, creation_date)
                  VALUES(?, ?, ?)"""
         creation_date = datetime.now()  # DOCUMENT-IT
-        return self._exec(sql, (name, status, creation_date))
+        id = self._insert(sql, (name, status, creation_date))
+        self._changed([id], 'create')
+        return id
+
+    def save_lights(self, lights):
+        """ inserts (name, status) tuples with one executemany in one transaction
+        :return: ids of created lights in insert order
+        """
+        sql = """INSERT INTO lights(name, status, creation_date)
+                 VALUES(?, ?, ?)"""
+        creation_date = datetime.now()
+        with self._transaction():
+            # new rowids are allocated above the current max and the write lock is held,
+            # so every row above it belongs to this batch
+            last_id = self._exec("""SELECT max(id) AS id FROM lights""")[0]['id'] or 0
+            self._executemany(sql, [(name, status, creation_date) for name, status in lights])
+            ids = [row['id'] for row in self._exec("""SELECT id FROM lights WHERE id>? ORDER BY id""", (last_id,))]
+
+        self._changed(ids, 'create')
+        return ids
 
     def delete_light(self, id):
         sql = """DELETE FROM lights WHERE id=?"""
-        return self._exec(sql, (id,))
+        res = self._write(sql, (id,))
+        if res:
+            self._changed([id], 'delete')
+        return res
+
+    def update_status(self, id, status, durability=None):
+        return self._queued(('status', id), self._update_status, id, status, durability=durability)
 
-    def update_status(self, id, status):
-        sql = """UPDATE lights SET status=? WHERE id=?"""
-        return self._exec(sql, (status, id))
+    def _update_status(self, id, status):
+        sql = """UPDATE lights SET status=? WHERE id=? AND status IS NOT ?"""
+        res = self._write(sql, (status, id, status))
+        if res:
+            self._changed([id])
+        return res
 
     def update_name(self, id, name):
-        sql = """UPDATE lights SET name=? WHERE id=?"""
-        return self._exec(sql, (name, id))
\ No newline at end of file
+        sql = """UPDATE lights SET name=? WHERE id=? AND name IS NOT ?"""
+        res = self._write(sql, (name, id, name))
+        if res:
+            self._changed([id])
+        return res
+
+    def update_status_many(self, status, ids=None):
+        """ sets status for all lights or for lights with given ids in one transaction
+        :return: ids of lights whose status actually changed
+        """
+        # the transaction commits queued status updates first, they can not overwrite these
+        changed = []
+        with self._transaction():
+            if ids is None:
+                sql = """SELECT id FROM lights WHERE status IS NOT ?"""
+                changed = [row['id'] for row in self._exec(sql, (status,))]
+                sql = """UPDATE lights SET status=? WHERE status IS NOT ?"""
+                self._exec(sql, (status, status))
+            else:
+                for chunk in chunks(sorted(set(ids))):
+                    sql = f"""SELECT id FROM lights WHERE status IS NOT ? AND id IN ({placeholders(chunk)})"""
+                    changed.extend(row['id'] for row in self._exec(sql, (status, *chunk)))
+                    sql = f"""UPDATE lights SET status=? WHERE status IS NOT ? AND id IN ({placeholders(chunk)})"""
+                    self._exec(sql, (status, status, *chunk))
+
+        if changed:
+            self._changed(changed)
+        return changed
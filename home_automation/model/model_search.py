@@ -0,0 +1,49 @@
+import re
+
+from home_automation.model.model import Model
+
+# tables of devices with an FTS5 index over their names and the type of device they hold
+SEARCH_TABLES = {'lights': 'light', 'thermostats': 'thermostat'}
+
+_TOKEN = re.compile(r'\w+')
+
+
+def match_expression(text):
+    """ FTS5 query matching names with every word of text as a word prefix, "2nd floor hall"
+        becomes "2nd"* "floor"* "hall"*. Words are quoted, FTS5 syntax in text has no effect
+    :return: expression, None when text has no words
+    """
+    terms = [f'"{token}"*' for token in _TOKEN.findall(text)]
+    if not terms:
+        return None
+    return ' '.join(terms)
+
+
+class ModelSearch(Model):
+    table = 'search'
+
+    def search(self, text, tables=tuple(SEARCH_TABLES), limit=20, candidates=500):
+        """ devices whose names match every word of text by prefix, best bm25 rank first
+            bm25 of separate FTS indexes is not comparable, it depends on the number and length
+            of names of each table. Ranks are divided by the best rank of their table, so the best
+            match of every table scores 1 and the others score their fraction of it
+        :param tables: searched tables of SEARCH_TABLES
+        :param candidates: max number of best ranked matches of every table which are merged. bm25 costs
+            the most per match, a short prefix such as "k" matches most devices
+        :return: type, id and name of matching devices
+        """
+        expression = match_expression(text)
+        if expression is None:
+            return []
+
+        selects = []
+        for table in tables:
+            selects.append(f"""SELECT '{SEARCH_TABLES[table]}' AS type, {table}.id, {table}.name,
+                                      matches.rank / matches.best AS score
+                               FROM (SELECT rowid, rank, min(rank) OVER () AS best
+                                     FROM {table}_fts WHERE {table}_fts MATCH :expression
+                                     ORDER BY rank LIMIT :candidates) AS matches
+                               JOIN {table} ON {table}.id=matches.rowid""")
+        sql = f"""SELECT type, id, name FROM ({' UNION ALL '.join(selects)})
+                  ORDER BY score DESC, type, id LIMIT :limit"""
+        return self._exec(sql, {'expression': expression, 'limit': limit, 'candidates': candidates})
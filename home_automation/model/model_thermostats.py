@@ -1,31 +1,112 @@
+import time
 from datetime import datetime
 
 from home_automation.model.model import Model
 
 
 class ModelThermostats(Model):
-    def get_thermostats(self):
-        sql = """SELECT * FROM thermostats"""
-        return self._exec(sql)
+    table = 'thermostats'
+
+    def get_thermostats(self, limit=None, after_id=0, query=None, after=None):
+        """ :param query: filters and sort of a Query, rows are ordered by id without it
+        :param after: sort column value of the last row of the previous page of a sorted query
+        """
+        if query is not None:
+            return self._query(query, limit, after_id, after)
+        if limit is None:
+            sql = """SELECT * FROM thermostats"""
+            return self._cached(('list',), sql)
+
+        sql = """SELECT * FROM thermostats WHERE id>? ORDER BY id LIMIT ?"""
+        return self._cached(('list', after_id, limit), sql, (after_id, limit))
+
+    def iter_thermostats(self, batch_size=500):
+        sql = """SELECT * FROM thermostats ORDER BY id"""
+        return self._iter(sql, batch_size=batch_size)
 
     def get_thermostat(self, id):
         sql = """SELECT * FROM thermostats WHERE id=?"""
-        return self._exec(sql, (id,))
+        return self._cached(('row', id), sql, (id,))
 
     def save_thermostat(self, name, temp):
         sql = """INSERT INTO thermostats(name, temp, creation_date)
                  VALUES(?, ?, ?)"""
         creation_date = datetime.now()  # DOCUMENT-IT
-        return self._exec(sql, (name, temp, creation_date))
+        with self._transaction():
+            id = self._insert(sql, (name, temp, creation_date))
+            self._record_temps([(id, temp)])
+        self._changed([id], 'create')
+        return id
+
+    def save_thermostats(self, thermostats):
+        """ inserts (name, temp) tuples with one executemany in one transaction
+        :return: ids of created thermostats in insert order
+        """
+        sql = """INSERT INTO thermostats(name, temp, creation_date)
+                 VALUES(?, ?, ?)"""
+        creation_date = datetime.now()
+        with self._transaction():
+            # new rowids are allocated above the current max and the write lock is held,
+            # so every row above it belongs to this batch
+            last_id = self._exec("""SELECT max(id) AS id FROM thermostats""")[0]['id'] or 0
+            self._executemany(sql, [(name, temp, creation_date) for name, temp in thermostats])
+            ids = [row['id'] for row in self._exec("""SELECT id FROM thermostats WHERE id>? ORDER BY id""",
+                                                   (last_id,))]
+            self._record_temps(zip(ids, (temp for _, temp in thermostats)))
+
+        self._changed(ids, 'create')
+        return ids
 
     def delete_thermostat(self, id):
         sql = """DELETE FROM thermostats WHERE id=?"""
-        return self._exec(sql, (id,))
+        with self._transaction():
+            res = self._write(sql, (id,))
+            # ids may be reused by new thermostats
+            self._exec("""DELETE FROM thermostat_temps WHERE thermostat_id=?""", (id,))
+        if res:
+            self._changed([id], 'delete')
+        return res
+
+    def update_temp(self, id, temp, durability=None):
+        return self._queued(('temp', id), self._update_temp, id, temp, durability=durability)
+
+    def _update_temp(self, id, temp):
+        sql = """UPDATE thermostats SET temp=? WHERE id=? AND temp IS NOT ?"""
+        with self._transaction():
+            res = self._write(sql, (temp, id, temp))
+            # an unchanged temperature is still a reading of the history
+            sql = """INSERT INTO thermostat_temps(thermostat_id, recorded_at, temp)
+                     SELECT id, ?, temp FROM thermostats WHERE id=?"""
+            self._exec(sql, (int(time.time()), id))
+        if res:
+            self._changed([id])
+        return res
 
-    def update_temp(self, id, temp):
-        sql = """UPDATE thermostats SET temp=? WHERE id=?"""
-        return self._exec(sql, (temp, id))
+    def _record_temps(self, temps):
+        """ appends (thermostat id, temp) readings to the temperature history """
+        sql = """INSERT INTO thermostat_temps(thermostat_id, recorded_at, temp)
+                 VALUES(?, ?, ?)"""
+        recorded_at = int(time.time())
+        self._executemany(sql, [(id, recorded_at, temp) for id, temp in temps])
+
+    def get_temp_history(self, id, start, end, bucket):
+        """ min, max and avg temperature of a thermostat per bucket
+        :param start: epoch seconds, inclusive
+        :param end: epoch seconds, exclusive
+        :param bucket: bucket length in seconds
+        """
+        sql = """SELECT recorded_at / :bucket * :bucket AS bucket,
+                        MIN(temp) AS min, MAX(temp) AS max, AVG(temp) AS avg, COUNT(*) AS count
+                 FROM thermostat_temps
+                 WHERE thermostat_id=:id AND recorded_at>=:start AND recorded_at<:end
+                 GROUP BY recorded_at / :bucket
+                 ORDER BY bucket"""
+        return self._exec(sql, {'id': id, 'start': start, 'end': end, 'bucket': bucket})
 
     def update_name(self, id, name):
-        sql = """UPDATE thermostats SET name=? WHERE id=?"""
-        return self._exec(sql, (name, id))
+        sql = """UPDATE thermostats SET name=? WHERE id=? AND name IS NOT ?"""
+        res = self._write(sql, (name, id, name))
+        if res:
+            self._changed([id])
+        return res
+
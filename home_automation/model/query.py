@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+# columns of every table which can be filtered and sorted on, with their Python type
+COLUMNS = {
+    'lights': {'id': int, 'name': str, 'status': int, 'creation_date': str},
+    'thermostats': {'id': int, 'name': str, 'temp': int, 'creation_date': str}
+}
+
+OPERATORS = ('=', '>', '>=', '<', '<=', 'prefix')
+
+# operator is one of OPERATORS
+Filter = namedtuple('Filter', ['column', 'operator', 'value'])
+# filters is a tuple of Filter, rows are ordered by sort then id, both descending when descending is set
+Query = namedtuple('Query', ['filters', 'sort', 'descending'])
+
+
+def _prefix_end(prefix):
+    """ smallest string greater than every string starting with prefix, None when there is none
+        BINARY collation compares UTF-8 bytes, which order like code points
+    """
+    last = ord(prefix[-1])
+    if last in (0xD7FF, 0x10FFFF):
+        return None
+    return prefix[:-1] + chr(last + 1)
+
+
+def _check_column(table, column):
+    # column names are put into SQL, only known ones get there
+    if column not in COLUMNS[table]:
+        raise ValueError(f'Unknown column of {table}: {column}')
+
+
+def compile_query(table, query, limit=None, after_id=0, after=None):
+    """ parameterized SELECT of rows of table matching query
+    Filters become WHERE terms the indexes on the filtered and sorted columns can serve,
+    name prefixes become a range instead of LIKE. Pages are keyset paginated on (sort, id).
+    :param after_id: id of the last row of the previous page, 0 for the first page
+    :param after: value of the sort column in the last row of the previous page
+    :return: (sql, params)
+    """
+    where = []
+    params = []
+    for column, operator, value in query.filters:
+        _check_column(table, column)
+        if operator not in OPERATORS:
+            raise ValueError(f'Unknown operator: {operator}')
+        if operator != 'prefix':
+            where.append(f'{column}{operator}?')
+            params.append(value)
+            continue
+
+        end = _prefix_end(value)
+        if end is None:
+            where.append(f'substr({column}, 1, ?)=?')
+            params.extend((len(value), value))
+        else:
+            where.append(f'{column}>=? AND {column}<?')
+            params.extend((value, end))
+
+    _check_column(table, query.sort)
+    direction = ' DESC' if query.descending else ''
+    comparison = '<' if query.descending else '>'
+    if query.sort == 'id':
+        order = f'id{direction}'
+        if after_id:
+            where.append(f'id{comparison}?')
+            params.append(after_id)
+    else:
+        order = f'{query.sort}{direction}, id{direction}'
+        if after_id:
+            where.append(f'({query.sort}, id){comparison}(?, ?)')
+            params.extend((after, after_id))
+
+    sql = f"""SELECT * FROM {table}"""
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {order}'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+
+    return sql, tuple(params)
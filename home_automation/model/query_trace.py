@@ -0,0 +1,61 @@
+import logging
+import threading
+
+slow_query_logger = logging.getLogger('home_automation.slow_queries')
+
+
+class QueryTracer():
+    """ Per statement timing of Model queries
+    :param enabled: aggregate statistics per statement
+    :param slow_threshold_ms: log statements executing longer to the slow query log, 0 disables it
+    :param max_statements: max number of distinct statements aggregated
+    """
+
+    def __init__(self, enabled=False, slow_threshold_ms=200, max_statements=1000):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.max_statements = max_statements
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, values, rows, connect_time, execute_time):
+        if self.slow_threshold and execute_time >= self.slow_threshold:
+            slow_query_logger.warning(f'{execute_time * 1000:.1f} ms / connect {connect_time * 1000:.1f} ms / '
+                                      f'params: {len(values)} / rows: {rows} / {" ".join(sql.split())}')
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    return
+                stats = self._stats[sql] = {'count': 0, 'total': 0.0, 'max': 0.0, 'connect': 0.0, 'rows': 0,
+                                            'params': len(values)}
+            stats['count'] += 1
+            stats['total'] += execute_time
+            stats['max'] = max(stats['max'], execute_time)
+            stats['connect'] += connect_time
+            stats['rows'] += rows
+
+    def top(self, n=10, order='total'):
+        """ statements with the largest total, avg, max execute time or count, times in milliseconds """
+        with self._lock:
+            statements = [{
+                'sql': ' '.join(sql.split()),
+                'count': stats['count'],
+                'params': stats['params'],
+                'total_ms': stats['total'] * 1000,
+                'avg_ms': stats['total'] * 1000 / stats['count'],
+                'max_ms': stats['max'] * 1000,
+                'avg_connect_ms': stats['connect'] * 1000 / stats['count'],
+                'avg_rows': stats['rows'] / stats['count']
+            } for sql, stats in self._stats.items()]
+
+        key = order if order == 'count' else f'{order}_ms'
+        return sorted(statements, key=lambda statement: statement[key], reverse=True)[:n]
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
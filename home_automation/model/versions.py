@@ -0,0 +1,36 @@
+import threading
+import uuid
+from collections import defaultdict
+
+
+class DataVersions():
+    """ Monotonic per table and per row versions bumped by every model write
+    Versions live in process memory, epoch tells apart versions of different
+    processes so a restarted or another worker never matches an old tag.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._tables = defaultdict(int)
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """ forked workers start from the same memory, each needs its own epoch """
+        self._reset()
+
+    def bump(self, table, ids=None):
+        with self._lock:
+            self._tables[table] += 1
+            version = self._tables[table]
+            for id in ids or ():
+                self._rows[(table, id)] = version
+
+    def table_tag(self, table):
+        return f'{self.epoch}-{table}-{self._tables[table]}'
+
+    def row_tag(self, table, id):
+        return f'{self.epoch}-{table}-{id}-{self._rows.get((table, id), 0)}'
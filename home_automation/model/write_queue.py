@@ -0,0 +1,141 @@
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_FLUSH = 'flush'
+DURABILITY_ENQUEUE = 'enqueue'
+DURABILITIES = (DURABILITY_FLUSH, DURABILITY_ENQUEUE)
+
+
+class _Ticket():
+    def __init__(self):
+        self.error = None
+        self._done = threading.Event()
+
+    def set(self, error=None):
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout):
+        if not self._done.wait(timeout):
+            raise TimeoutError('Write was not flushed in time')
+        if self.error is not None:
+            raise self.error
+
+
+class WriteQueue():
+    """ Group commit queue for high frequency updates
+    Submitted writes are applied by a background writer in one transaction
+    every interval seconds or as soon as max_ops writes are pending. Writes
+    submitted with the same key before a flush collapse into the last one.
+    :param transaction: context manager factory of the write transaction
+    :param durability: default acknowledgement, 'flush' waits until the write is committed,
+        'enqueue' returns once it is queued and may lose it if the process dies
+    """
+
+    def __init__(self, transaction, interval=0.005, max_ops=256, durability=DURABILITY_FLUSH,
+                 flush_timeout=10, enabled=False):
+        self.transaction = transaction
+        self.interval = interval
+        self.max_ops = max_ops
+        self.durability = durability
+        self.flush_timeout = flush_timeout
+        self.enabled = enabled
+        self._pending = OrderedDict()
+        # last ticket of the batch being applied, None while the writer waits
+        self._running = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._flush_at_exit = False
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            if not self._flush_at_exit:
+                # registered with the first write, after logging is configured. atexit runs the last
+                # registered first, so the final flush still logs before the log listener stops
+                atexit.register(self.flush)
+                self._flush_at_exit = True
+            self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+            self._thread.start()
+
+    def after_fork(self):
+        """ the writer thread does not survive fork, writes pending in the parent belong to it """
+        self._pending = OrderedDict()
+        self._running = None
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, key, fn, *args, durability=None):
+        durability = durability or self.durability
+        if durability not in DURABILITIES:
+            raise ValueError(f'Unknown durability: {durability}')
+
+        ticket = _Ticket()
+        with self._cond:
+            self._start()
+            _, _, tickets = self._pending.pop(key, (None, None, []))
+            tickets.append(ticket)
+            self._pending[key] = (fn, args, tickets)
+            if len(self._pending) == 1 or len(self._pending) >= self.max_ops:
+                self._cond.notify()
+
+        if durability == DURABILITY_FLUSH:
+            ticket.wait(self.flush_timeout)
+
+    def flush(self):
+        """ blocks until writes pending or being applied at the time of the call are committed,
+            batches are applied in order so the last ticket is set after every earlier write
+        """
+        with self._cond:
+            if self._pending:
+                _, _, tickets = next(reversed(self._pending.values()))
+                ticket = tickets[-1]
+                self._start()
+                self._cond.notify()
+            elif self._running is not None:
+                ticket = self._running
+            else:
+                return
+
+        try:
+            ticket.wait(self.flush_timeout)
+        except Exception:
+            logger.exception('Write queue flush failed')
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # group window, collect writes until it ends or the batch is full
+                deadline = time.monotonic() + self.interval
+                while len(self._pending) < self.max_ops:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                items, self._pending = self._pending, OrderedDict()
+                _, _, tickets = next(reversed(items.values()))
+                self._running = tickets[-1]
+
+            self._apply(items)
+            with self._cond:
+                self._running = None
+
+    def _apply(self, items):
+        error = None
+        try:
+            with self.transaction():
+                for fn, args, _ in items.values():
+                    fn(*args)
+        except Exception as e:
+            logger.exception(f'Write queue flush of {len(items)} writes failed')
+            error = e
+
+        for _, _, tickets in items.values():
+            for ticket in tickets:
+                ticket.set(error)
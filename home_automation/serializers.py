@@ -0,0 +1,72 @@
+import json
+import logging
+
+from flask import current_app
+
+from home_automation.settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MIMETYPE = 'application/json'
+
+
+class JSONSerializer():
+    """ standard library encoder, always available """
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+
+class OrjsonSerializer():
+    """ orjson encoder, several times faster on large collections """
+    name = 'orjson'
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+def get_serializer(backend='auto'):
+    """ :param backend: auto, orjson or json, auto picks orjson when it is installed
+    :raises ValueError: when backend is unknown or orjson is requested but not installed
+    """
+    if backend not in ('auto', 'orjson', 'json'):
+        raise ValueError(f'Unknown JSON backend: {backend}')
+    if backend == 'orjson' and orjson is None:
+        raise ValueError('JSON backend orjson is not installed')
+
+    if backend != 'json' and orjson is not None:
+        return OrjsonSerializer()
+    return JSONSerializer()
+
+
+serializer = get_serializer(JSON_BACKEND)
+
+
+def dumps(obj):
+    """ encodes with the serializer of the current Flask app, outside of it with the one of settings """
+    if current_app:
+        return current_app.extensions.get('serializer', serializer).dumps(obj)
+    return serializer.dumps(obj)
+
+
+def jsonify(*args, **kwargs):
+    """ drop-in for flask.jsonify encoding with the serializer of the app """
+    if args and kwargs:
+        raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+    if len(args) == 1:
+        data = args[0]
+    else:
+        data = args or kwargs
+
+    return current_app.response_class(dumps(data), mimetype=JSON_MIMETYPE)
+
+
+def init_app(app):
+    app.extensions['serializer'] = get_serializer(app.config['JSON_BACKEND'])
+    logger.info(f'JSON backend: {app.extensions["serializer"].name}')
@@ -0,0 +1,58 @@
+import logging
+
+from gunicorn.app.base import BaseApplication
+
+from home_automation.model import model
+
+logger = logging.getLogger(__name__)
+
+
+class GunicornApplication(BaseApplication):
+    """ Serves an already created WSGI app with gunicorn, workers are forked from the current process
+    :param options: gunicorn settings, e.g. bind, workers, threads, keepalive
+    """
+
+    def __init__(self, app, options=None):
+        self.app = app
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.app
+
+
+def run_gunicorn(app, port, threads, keepalive, timeout, graceful_timeout, max_requests, log_listener=None):
+    """ runs app in one worker process of threads threads until the master is stopped.
+        SIGHUP replaces the worker gracefully, SIGTERM stops after graceful_timeout seconds.
+    :param log_listener: logging queue listener restarted in every worker
+    """
+    def post_fork(server, worker):
+        if log_listener is not None:
+            log_listener.after_fork()
+        model.after_fork()
+        logger.info(f'Worker {worker.pid} started')
+
+    options = {
+        'bind': f'0.0.0.0:{port}',
+        # the connection pool, ETag versions, read cache and change feed live in the worker process,
+        # a second worker would answer 304 and miss events for writes made by the other one
+        'workers': 1,
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'keepalive': keepalive,
+        'timeout': timeout,
+        'graceful_timeout': graceful_timeout,
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10,
+        'preload_app': True,
+        'post_fork': post_fork,
+        # access log is off, every request is logged by the controllers already
+        'accesslog': None,
+        'errorlog': '-',
+        'loglevel': 'warning'
+    }
+    GunicornApplication(app, options).run()
@@ -11,7 +11,97 @@ PORT = config('PORT', default=8000, cast=int)
 
 APPLICATION_ROOT = '/api/v1'
 
+# dev runs the Werkzeug development server, gunicorn runs one pre-forked worker of SERVER_THREADS threads.
+# Cache, ETags and the change feed are kept in the worker process, so there is no setting for more workers.
+# uvicorn runs the asyncio app, its SQLite calls run on ASYNC_DB_WORKERS threads
+SERVER = config('SERVER', default='dev', cast=str)
+SERVER_THREADS = config('SERVER_THREADS', default=8, cast=int)
+SERVER_KEEPALIVE = config('SERVER_KEEPALIVE', default=5, cast=int)
+SERVER_TIMEOUT = config('SERVER_TIMEOUT', default=30, cast=int)
+SERVER_GRACEFUL_TIMEOUT = config('SERVER_GRACEFUL_TIMEOUT', default=30, cast=int)
+SERVER_MAX_REQUESTS = config('SERVER_MAX_REQUESTS', default=0, cast=int)
+ASYNC_DB_WORKERS = config('ASYNC_DB_WORKERS', default=8, cast=int)
+
 ALLOWED_CORS_ORIGINS = config('ALLOWED_CORS_ORIGINS', default='*')
 
+# Swagger UI on /apidocs, built on its first request
+API_DOCS = config('API_DOCS', default=True, cast=bool)
+
 
 DB_PATH = config('DB_PATH', default=f'{ROOT_DIR}/database/database.db', cast=str)
+
+# SQLite connection pool shared by the threads of a process, DB_POOL_SIZE idle connections are kept
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=8, cast=int)
+DB_POOL_MAX_IDLE = config('DB_POOL_MAX_IDLE', default=300, cast=int)
+DB_BUSY_TIMEOUT = config('DB_BUSY_TIMEOUT', default=5000, cast=int)
+DB_STATEMENT_CACHE_SIZE = config('DB_STATEMENT_CACHE_SIZE', default=128, cast=int)
+
+# read-through cache for lights and thermostats reads
+CACHE_ENABLED = config('CACHE_ENABLED', default=True, cast=bool)
+CACHE_MAX_SIZE = config('CACHE_MAX_SIZE', default=1024, cast=int)
+CACHE_TTL = config('CACHE_TTL', default=5, cast=float)
+
+# keyset pagination of lights and thermostats collections
+PAGE_SIZE_DEFAULT = config('PAGE_SIZE_DEFAULT', default=100, cast=int)
+PAGE_SIZE_MAX = config('PAGE_SIZE_MAX', default=1000, cast=int)
+
+# rows fetched from SQLite per round trip when streaming exports
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', default=500, cast=int)
+
+# max number of devices created by one bulk request
+BULK_MAX_BATCH_SIZE = config('BULK_MAX_BATCH_SIZE', default=1000, cast=int)
+
+# max number of operations in one /batch request
+BATCH_MAX_OPERATIONS = config('BATCH_MAX_OPERATIONS', default=500, cast=int)
+
+# group commit of light status and thermostat temperature updates,
+# WRITE_QUEUE_DURABILITY is either flush (ack after commit) or enqueue (ack once queued)
+WRITE_QUEUE_ENABLED = config('WRITE_QUEUE_ENABLED', default=False, cast=bool)
+WRITE_QUEUE_INTERVAL_MS = config('WRITE_QUEUE_INTERVAL_MS', default=5, cast=float)
+WRITE_QUEUE_MAX_OPS = config('WRITE_QUEUE_MAX_OPS', default=256, cast=int)
+WRITE_QUEUE_DURABILITY = config('WRITE_QUEUE_DURABILITY', default='flush', cast=str)
+
+# max number of buckets returned by one thermostat temperature history query
+HISTORY_MAX_BUCKETS = config('HISTORY_MAX_BUCKETS', default=10000, cast=int)
+
+# device name search, at most SEARCH_CANDIDATES matches of every device type are ranked
+SEARCH_LIMIT_DEFAULT = config('SEARCH_LIMIT_DEFAULT', default=20, cast=int)
+SEARCH_LIMIT_MAX = config('SEARCH_LIMIT_MAX', default=100, cast=int)
+SEARCH_CANDIDATES = config('SEARCH_CANDIDATES', default=500, cast=int)
+
+# changes since a change sequence number returned by one request
+CHANGES_LIMIT_DEFAULT = config('CHANGES_LIMIT_DEFAULT', default=1000, cast=int)
+CHANGES_LIMIT_MAX = config('CHANGES_LIMIT_MAX', default=10000, cast=int)
+
+# server-sent events change feed, CHANGE_FEED_SIZE changes are kept for resuming clients
+CHANGE_FEED_SIZE = config('CHANGE_FEED_SIZE', default=1000, cast=int)
+CHANGE_FEED_KEEPALIVE = config('CHANGE_FEED_KEEPALIVE', default=15, cast=float)
+# every gunicorn event stream holds a worker thread, streams over CHANGE_FEED_MAX_STREAMS get a 503
+# so that two threads are left for the API, the asyncio app does not limit them
+CHANGE_FEED_MAX_STREAMS = config('CHANGE_FEED_MAX_STREAMS', default=max(SERVER_THREADS - 2, 0), cast=int)
+
+# JSON encoder of responses, auto uses orjson when it is installed and the standard library otherwise
+JSON_BACKEND = config('JSON_BACKEND', default='auto', cast=str)
+
+# gzip, or brotli when it is installed, of responses of at least COMPRESSION_MIN_SIZE bytes,
+# COMPRESSION_CACHE_SIZE compressed bodies are kept by ETag so unchanged data is compressed once
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+COMPRESSION_CACHE_SIZE = config('COMPRESSION_CACHE_SIZE', default=128, cast=int)
+
+# request and query metrics served on /metrics
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+
+# per statement query statistics on /api/v1/stats/queries and slow query log,
+# SLOW_QUERY_THRESHOLD_MS 0 disables the slow query log
+QUERY_TRACE_ENABLED = config('QUERY_TRACE_ENABLED', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+
+# logging through a bounded queue to a background writer, records are dropped while the queue is full.
+# LOG_SAMPLE_RATE is the share of per request INFO lines of controllers which are kept,
+# records of the model, write queue and slow query log are never sampled
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_BATCH_SIZE = config('LOG_BATCH_SIZE', default=100, cast=int)
+LOG_SAMPLE_RATE = config('LOG_SAMPLE_RATE', default=1.0, cast=float)
@@ -0,0 +1,9 @@
+import pytest
+from starlette.testclient import TestClient
+
+from home_automation.asgi.app_factory import create_app
+
+
+@pytest.fixture()
+def get_asgi_client():
+    return TestClient(create_app())
@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+from home_automation.asgi.events import ChangeNotifier
+from home_automation.model.model import change_feed
+
+
+def _run(coro):
+    # asyncio.run is Python 3.7+, the Docker image runs Python 3.6
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def test_notifier_wakes_on_publish_from_thread():
+    async def wait_for_change():
+        notifier = ChangeNotifier()
+        notifier.start()
+        try:
+            loop = asyncio.get_event_loop()
+            loop.call_later(0.05, threading.Thread(target=change_feed.publish, args=('lights', [1], 'update')).start)
+            start = loop.time()
+            await notifier.wait(5)
+            return loop.time() - start
+        finally:
+            notifier.stop()
+
+    assert _run(wait_for_change()) < 5
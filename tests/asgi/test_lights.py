@@ -0,0 +1,175 @@
+import pytest
+
+from unittest.mock import patch
+
+
+@pytest.fixture()
+def get_return_value():
+    return {
+        'creation_date': '2018-20-20',
+        'id': 1,
+        'name': 'Mock light',
+        'status': 0
+    }
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_get_lights_200(get_model_lights, get_asgi_client, get_return_value):
+    with get_asgi_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights')
+        assert result.status_code == 200
+        assert result.json() == [get_return_value]
+        assert result.headers['ETag'] == '"v1"'
+
+        get_model_lights().get_lights.assert_called_once_with()
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_get_lights_304(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+
+        result = app.get('/api/v1/lights/', headers={'If-None-Match': 'W/"v1"'})
+        assert result.status_code == 304
+
+        get_model_lights().get_lights.assert_not_called()
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_get_lights_page_200(get_model_lights, get_asgi_client, get_return_value):
+    with get_asgi_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights?limit=1')
+        assert result.status_code == 200
+        assert result.headers['X-Next-Cursor']
+
+        get_model_lights().get_lights.assert_called_once_with(limit=1, after_id=0)
+
+
+def test_get_lights_page_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.get('/api/v1/lights?limit=0')
+        assert result.status_code == 400
+        assert result.json()['message']
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_get_light_500(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_light.side_effect = Exception()
+
+        result = app.get('/api/v1/lights/1')
+        assert result.status_code == 500
+        assert result.json()['message']
+
+
+def test_get_light_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.get('/api/v1/lights/0')
+        assert result.status_code == 400
+        assert result.json() == {'message': 'Light id must be strictly greater than 0'}
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_save_light_204(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.post('/api/v1/lights', json={'name': 'Mock light', 'status': 1})
+        assert result.status_code == 204
+
+        get_model_lights().save_light.assert_called_once_with('Mock light', 1)
+
+
+def test_save_light_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.post('/api/v1/lights', json={'name': 'Mock light', 'status': 2})
+        assert result.status_code == 400
+        assert result.json() == {'message': 'Light data is out of range[0, 1] parameter: status'}
+
+        result = app.post('/api/v1/lights', data=b'{', headers={'Content-Type': 'application/json'})
+        assert result.status_code == 400
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_save_lights_ndjson_201(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_lights().save_lights.return_value = [1, 2]
+
+        result = app.post('/api/v1/lights/bulk', data=b'{"name": "a"}\n{"name": "b", "status": 1}\n',
+                          headers={'Content-Type': 'application/x-ndjson'})
+        assert result.status_code == 201
+        assert result.json() == {'ids': [1, 2]}
+
+        get_model_lights().save_lights.assert_called_once_with([('a', 0), ('b', 1)])
+
+
+def test_save_lights_413(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.post('/api/v1/lights/bulk', json=[{'name': 'a'}] * (app.app.state.config['BULK_MAX_BATCH_SIZE'] + 1))
+        assert result.status_code == 413
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_on_light_ack_204(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.put('/api/v1/lights/1/on?ack=enqueue')
+        assert result.status_code == 204
+
+        get_model_lights().update_status.assert_called_once_with(1, 1, durability='enqueue')
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_off_lights_200(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_lights().update_status_many.return_value = [2]
+
+        result = app.put('/api/v1/lights/off', json={'ids': [1, 2]})
+        assert result.status_code == 200
+        assert result.json() == {'changed': [2]}
+
+        get_model_lights().update_status_many.assert_called_once_with(0, [1, 2])
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_remove_light_204(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.delete('/api/v1/lights/1')
+        assert result.status_code == 204
+
+        get_model_lights().delete_light.assert_called_once_with(1)
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_update_name_204(get_model_lights, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.put('/api/v1/lights/1/name', json={'name': 'New name'})
+        assert result.status_code == 204
+
+        get_model_lights().update_name.assert_called_once_with(1, 'New name')
+
+
+@patch('home_automation.asgi.lights.get_model_lights')
+def test_get_lights_gzip(get_model_lights, get_asgi_client, get_return_value):
+    rows = [dict(get_return_value, id=id) for id in range(1, 101)]
+    with get_asgi_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = rows
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip'})
+        assert result.headers['Content-Encoding'] == 'gzip'
+        assert result.headers['ETag'] == '"v1-gzip"'
+        assert 'Accept-Encoding' in result.headers['Vary']
+        assert result.json() == rows
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"v1-gzip"'})
+        assert result.status_code == 304
+        assert result.headers['ETag'] == '"v1-gzip"'
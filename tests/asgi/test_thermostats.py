@@ -0,0 +1,136 @@
+import pytest
+
+from home_automation.controllers.negotiation import msgpack
+from home_automation.model.query import Filter, Query
+from unittest.mock import patch
+
+requires_msgpack = pytest.mark.skipif(msgpack is None, reason='msgpack is not installed')
+
+
+@pytest.fixture()
+def get_return_value():
+    return {
+        'creation_date': '2018-20-20',
+        'id': 1,
+        'name': 'Mock thermostat',
+        'temp': 20
+    }
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_get_thermostats_200(get_model_thermostats, get_asgi_client, get_return_value):
+    with get_asgi_client as app:
+        get_model_thermostats().get_version.return_value = 'v1'
+        get_model_thermostats().get_thermostats.return_value = [get_return_value]
+
+        result = app.get('/api/v1/thermostats')
+        assert result.status_code == 200
+        assert result.json() == [get_return_value]
+
+        get_model_thermostats().get_thermostats.assert_called_once_with()
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_get_thermostat_304(get_model_thermostats, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_thermostats().get_version.return_value = 'v1'
+
+        result = app.get('/api/v1/thermostats/1', headers={'If-None-Match': '"v1"'})
+        assert result.status_code == 304
+
+        get_model_thermostats().get_thermostat.assert_not_called()
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_save_thermostat_204(get_model_thermostats, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.post('/api/v1/thermostats', json={'name': 'Mock thermostat', 'temp': 20})
+        assert result.status_code == 204
+
+        get_model_thermostats().save_thermostat.assert_called_once_with('Mock thermostat', 20)
+
+
+def test_save_thermostat_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.post('/api/v1/thermostats', json={'name': 'Mock thermostat', 'temp': 301})
+        assert result.status_code == 400
+        assert result.json() == {'message': 'Thermostats data is out of range[-300, 300] parameter: temp'}
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_update_temp_500(get_model_thermostats, get_asgi_client):
+    with get_asgi_client as app:
+        get_model_thermostats().update_temp.side_effect = Exception()
+
+        result = app.put('/api/v1/thermostats/1/temp', json={'temp': 21})
+        assert result.status_code == 500
+        assert result.json()['message']
+
+        get_model_thermostats().update_temp.assert_called_once_with(1, 21)
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_get_temp_history_200(get_model_thermostats, get_asgi_client):
+    with get_asgi_client as app:
+        history = [{'bucket': 0, 'min': 20, 'max': 22, 'avg': 21.0, 'count': 2}]
+        get_model_thermostats().get_temp_history.return_value = history
+
+        result = app.get('/api/v1/thermostats/1/history?bucket=1h&from=0&to=3600')
+        assert result.status_code == 200
+        assert result.json() == history
+
+        get_model_thermostats().get_temp_history.assert_called_once_with(1, 0, 3600, 3600)
+
+
+def test_get_temp_history_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.get('/api/v1/thermostats/1/history?bucket=1y')
+        assert result.status_code == 400
+        assert result.json()['message']
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_update_name_204(get_model_thermostats, get_asgi_client):
+    with get_asgi_client as app:
+
+        result = app.put('/api/v1/thermostats/1/name/', json={'name': 'New name'})
+        assert result.status_code == 204
+
+        get_model_thermostats().update_name.assert_called_once_with(1, 'New name')
+
+
+@requires_msgpack
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_get_thermostats_columnar_msgpack_200(get_model_thermostats, get_asgi_client, get_return_value):
+    with get_asgi_client as app:
+        get_model_thermostats().get_version.return_value = 'v1'
+        get_model_thermostats().get_thermostats.return_value = [get_return_value]
+
+        result = app.get('/api/v1/thermostats',
+                         headers={'Accept': 'application/vnd.home-automation.columnar+msgpack'})
+        assert result.status_code == 200
+        assert 'Accept' in result.headers['Vary']
+        assert result.headers['ETag'] == '"v1-columnar-msgpack"'
+        assert msgpack.unpackb(result.content) == {name: [value] for name, value in get_return_value.items()}
+
+
+@patch('home_automation.asgi.thermostats.get_model_thermostats')
+def test_get_thermostats_filtered_200(get_model_thermostats, get_asgi_client, get_return_value):
+    with get_asgi_client as app:
+        get_model_thermostats().get_version.return_value = 'v1'
+        get_model_thermostats().get_thermostats.return_value = [get_return_value]
+
+        result = app.get('/api/v1/thermostats?temp_gte=18&sort=temp&limit=1')
+        assert result.status_code == 200
+        assert 'temp_gte=18&sort=temp&limit=1&cursor=' in result.headers['Link']
+
+        query = Query((Filter('temp', '>=', 18),), 'temp', False)
+        get_model_thermostats().get_thermostats.assert_called_once_with(limit=1, after_id=0, query=query, after=None)
+
+
+def test_get_thermostats_filtered_400(get_asgi_client):
+    with get_asgi_client as app:
+        result = app.get('/api/v1/thermostats?temp_gt=warm')
+        assert result.status_code == 400
+        assert result.json()['message']
@@ -1,8 +1,15 @@
 import pytest
 
 from home_automation.app_factory import create_app
+from home_automation.compression import compressor
 
 
 @pytest.fixture()
 def get_test_client():
     return create_app().test_client()
+
+
+@pytest.fixture(autouse=True)
+def clear_compressor():
+    # mocked models reuse ETags across tests, compressed bodies must not leak between them
+    compressor.clear()
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from unittest.mock import patch
+
+
+@patch('home_automation.controllers.batch.get_transaction')
+@patch('home_automation.controllers.batch.get_model_thermostats')
+@patch('home_automation.controllers.batch.get_model_lights')
+def test_run_batch_200(get_model_lights, get_model_thermostats, get_transaction, get_test_client):
+    with get_test_client as app:
+        get_model_lights().save_light.return_value = 3
+        request_body = [
+            {'op': 'lights.create', 'name': 'Test light'},
+            {'op': 'lights.on', 'id': 1},
+            {'op': 'lights.update_name', 'id': 2, 'name': 'Test change name'},
+            {'op': 'thermostats.update_temp', 'id': 1, 'temp': 64},
+            {'op': 'thermostats.delete', 'id': 2}
+        ]
+
+        result = app.post('/api/v1/batch', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert [res['id'] for res in data['results']] == [3, 1, 2, 1, 2]
+        assert [res['op'] for res in data['results']] == [op['op'] for op in request_body]
+
+        get_transaction.assert_called_once_with()
+        get_model_lights().save_light.assert_called_once_with('Test light', 0)
+        get_model_lights().update_status.assert_called_once_with(1, 1)
+        get_model_lights().update_name.assert_called_once_with(2, 'Test change name')
+        get_model_thermostats().update_temp.assert_called_once_with(1, 64)
+        get_model_thermostats().delete_thermostat.assert_called_once_with(2)
+
+
+@pytest.mark.parametrize('request_body',
+                         [
+                             None,
+                             [],
+                             {'op': 'lights.on', 'id': 1},
+                             [{'op': 'lights.switch', 'id': 1}],
+                             [{'op': 'lights.on', 'id': 0}],
+                             [{'op': 'lights.on', 'id': 1}, {'op': 'thermostats.update_temp', 'id': 1, 'temp': 301}],
+                             [{'op': 'thermostats.create', 'name': 'Test thermostat'}],
+                             ['lights.on']
+                         ])
+@patch('home_automation.controllers.batch.get_model_lights')
+def test_run_batch_400(get_model_lights, get_test_client, request_body):
+    with get_test_client as app:
+        result = app.post('/api/v1/batch', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+        get_model_lights().update_status.assert_not_called()
+
+
+def test_run_batch_413(get_test_client):
+    with get_test_client as app:
+        app.application.config['BATCH_MAX_OPERATIONS'] = 1
+        request_body = [{'op': 'lights.on', 'id': 1}, {'op': 'lights.off', 'id': 2}]
+
+        result = app.post('/api/v1/batch', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 413
+        assert data['message']
+
+
+@patch('home_automation.controllers.batch.get_transaction')
+@patch('home_automation.controllers.batch.get_model_lights')
+def test_run_batch_500(get_model_lights, get_transaction, get_test_client):
+    with get_test_client as app:
+        get_model_lights().update_status.side_effect = Exception()
+
+        result = app.post('/api/v1/batch', json=[{'op': 'lights.on', 'id': 1}])
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from unittest.mock import patch
+
+CHANGES = {'since': 12, 'more': False, 'lights': [], 'thermostats': [],
+           'deleted': {'lights': [3], 'thermostats': []}}
+
+
+@patch('home_automation.controllers.changes.get_model_changes')
+def test_get_changes_200(get_model_changes, get_test_client):
+    with get_test_client as app:
+        get_model_changes().get_sequence.return_value = 12
+        get_model_changes().get_changes.return_value = CHANGES
+
+        result = app.get('/api/v1/changes?since=10&limit=50000')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data == CHANGES
+
+        get_model_changes().get_changes.assert_called_with(10, 10000)
+
+
+@patch('home_automation.controllers.changes.get_model_changes')
+def test_get_changes_410(get_model_changes, get_test_client):
+    with get_test_client as app:
+        get_model_changes().get_sequence.return_value = 12
+
+        result = app.get('/api/v1/changes?since=13')
+        assert result.status_code == 410
+        get_model_changes().get_changes.assert_not_called()
+
+
+@pytest.mark.parametrize('query', ['since=a', 'since=-1', 'limit=0', 'limit=a'])
+def test_get_changes_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/changes?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message'].startswith('Changes incorrect parameters')
+
+
+@patch('home_automation.controllers.changes.get_model_changes')
+def test_get_changes_500(get_model_changes, get_test_client):
+    with get_test_client as app:
+        get_model_changes().get_sequence.side_effect = Exception('error')
+
+        result = app.get('/api/v1/changes?since=1')
+        assert result.status_code == 500
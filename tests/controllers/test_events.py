@@ -0,0 +1,54 @@
+import json
+
+from home_automation.controllers.events import streams
+from home_automation.model.model import change_feed, versions
+
+
+def _read_chunks(result, count):
+    chunks = iter(result.response)
+    return [next(chunks).decode() for _ in range(count)]
+
+
+def test_get_events_resume_200(get_test_client):
+    with get_test_client as app:
+        last_id = change_feed.last_id
+        change_feed.publish('lights', [1], 'update')
+        change_feed.publish('thermostats', [2], 'delete')
+
+        result = app.get('/api/v1/events', headers={'Last-Event-ID': f'{versions.epoch}-{last_id}'}, buffered=False)
+        assert result.status_code == 200
+        assert result.mimetype == 'text/event-stream'
+
+        _, first, second = _read_chunks(result, 3)
+        assert f'id: {versions.epoch}-{last_id + 1}\n' in first
+        assert json.loads(first.split('data: ')[1]) == {'table': 'lights', 'id': 1, 'op': 'update'}
+        assert json.loads(second.split('data: ')[1]) == {'table': 'thermostats', 'id': 2, 'op': 'delete'}
+        result.close()
+
+
+def test_get_events_reset_200(get_test_client):
+    with get_test_client as app:
+        result = app.get('/api/v1/events?last_event_id=unknown-1', buffered=False)
+        assert result.status_code == 200
+
+        _, reset = _read_chunks(result, 2)
+        assert 'event: reset\n' in reset
+        result.close()
+
+
+def test_get_events_too_many_streams_503(get_test_client):
+    get_test_client.application.config['CHANGE_FEED_MAX_STREAMS'] = 1
+    with get_test_client as app:
+        result = app.get('/api/v1/events', buffered=False)
+        assert result.status_code == 200
+        assert streams.open == 1
+
+        rejected = app.get('/api/v1/events')
+        assert rejected.status_code == 503
+        assert rejected.headers['Retry-After'] == '15'
+
+        result.close()
+        assert streams.open == 0
+        result = app.get('/api/v1/events', buffered=False)
+        assert result.status_code == 200
+        result.close()
@@ -0,0 +1,42 @@
+import pytest
+
+from home_automation.controllers.filtering import list_args, parse_query
+from home_automation.controllers.pagination import Page
+from home_automation.model.query import Filter, Query
+
+
+def test_parse_query():
+    args = {'status': '1', 'id_gte': '3', 'name_prefix': 'Kit', 'sort': '-name', 'limit': '10'}
+
+    assert parse_query(args, 'lights') == Query(
+        (Filter('id', '>=', 3), Filter('name', 'prefix', 'Kit'), Filter('status', '=', 1)), 'name', True)
+    assert parse_query({'temp_lt': '-5'}, 'thermostats') == Query((Filter('temp', '<', -5),), 'id', False)
+    assert parse_query({'limit': '10', 'cursor': 'abc'}, 'lights') is None
+
+
+def test_parse_query_ignores_unknown():
+    assert parse_query({'_': '1700000000000', 'stauts': '1'}, 'lights') is None
+    assert parse_query({'_': '1700000000000', 'status': '1'}, 'lights') == Query(
+        (Filter('status', '=', 1),), 'id', False)
+    assert parse_query({'temp': '20'}, 'lights') is None
+
+
+@pytest.mark.parametrize('args', [
+    {'status': 'on'},
+    {'id_gt': ''},
+    {'name_prefix': ''},
+    {'sort': 'temp'},
+    {'sort': 'name', 'after_id': '5'}
+])
+def test_parse_query_invalid(args):
+    page = Page(10, int(args.get('after_id', 0)), None)
+    with pytest.raises(ValueError):
+        parse_query(args, 'lights', page)
+
+
+def test_list_args():
+    query = Query((), 'name', False)
+
+    assert list_args(None, None) == {}
+    assert list_args(Page(10, 0, None), None) == {'limit': 10, 'after_id': 0}
+    assert list_args(Page(10, 5, 'Kitchen'), query) == {'limit': 10, 'after_id': 5, 'query': query, 'after': 'Kitchen'}
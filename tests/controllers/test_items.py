@@ -0,0 +1,30 @@
+import pytest
+
+from home_automation.controllers.handlers.items import NdjsonItems, TooManyItems, json_items
+
+
+def test_ndjson_items_chunks():
+    items = NdjsonItems(3)
+    for chunk in (b'{"name": "Kit', b'chen"}\n\n', b'{"name": "Hall"}\n{"name"', b': "Office"}'):
+        items.feed(chunk)
+
+    assert items.close() == [{'name': 'Kitchen'}, {'name': 'Hall'}, {'name': 'Office'}]
+
+
+def test_ndjson_items_invalid():
+    items = NdjsonItems(1)
+    items.feed(b'{}\n\n')
+    with pytest.raises(TooManyItems):
+        items.feed(b'{}\n')
+
+    items = NdjsonItems(5)
+    with pytest.raises(ValueError, match='line 3'):
+        items.feed(b'{}\n\n{\n')
+
+
+def test_json_items():
+    assert json_items([{}], 1) == [{}]
+    with pytest.raises(TooManyItems):
+        json_items([{}, {}], 1)
+    with pytest.raises(ValueError):
+        json_items({}, 1)
@@ -2,8 +2,12 @@ import json
 
 import pytest
 
+from home_automation.controllers.negotiation import msgpack
+from home_automation.model.query import Filter, Query
 from unittest.mock import patch
 
+requires_msgpack = pytest.mark.skipif(msgpack is None, reason='msgpack is not installed')
+
 
 @pytest.fixture()
 def get_return_value():
@@ -246,3 +250,320 @@ def test_update_name_500(get_model_lights, get_test_client):
         data = json.loads(result.data)
         assert result.status_code == 500
         assert data['message']
+
+
+@pytest.mark.parametrize('action, status', [('on', 1), ('off', 0)])
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_update_status_many_all_200(get_model_lights, get_test_client, action, status):
+    with get_test_client as app:
+        get_model_lights().update_status_many.return_value = [1, 2]
+
+        result = app.put(f'/api/v1/lights/{action}')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data['changed'] == [1, 2]
+
+        get_model_lights().update_status_many.assert_called_once_with(status, None)
+
+
+@pytest.mark.parametrize('action, status', [('on', 1), ('off', 0)])
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_update_status_many_ids_200(get_model_lights, get_test_client, action, status):
+    with get_test_client as app:
+        get_model_lights().update_status_many.return_value = [2]
+
+        result = app.put(f'/api/v1/lights/{action}', json={'ids': [1, 2]})
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data['changed'] == [2]
+
+        get_model_lights().update_status_many.assert_called_once_with(status, [1, 2])
+
+
+@pytest.mark.parametrize('request_body',
+                         [
+                             {'ids': 1},
+                             {'ids': [0]},
+                             {'ids': ['1']},
+                             {'ids': [True]},
+                             {'name': 'Test light'},
+                             {},
+                             [],
+                             [1]
+                         ])
+def test_update_status_many_400(get_test_client, request_body):
+    with get_test_client as app:
+        result = app.put('/api/v1/lights/on', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_update_status_many_500(get_model_lights, get_test_client):
+    with get_test_client as app:
+        get_model_lights().update_status_many.side_effect = Exception()
+
+        result = app.put('/api/v1/lights/off')
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_etag(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+        get_model().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights')
+        assert result.status_code == 200
+        assert result.headers['ETag'] == '"v1"'
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_304(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+
+        result = app.get('/api/v1/lights', headers={'If-None-Match': '"v1"'})
+        assert result.status_code == 304
+        assert result.headers['ETag'] == '"v1"'
+        assert not result.data
+
+        get_model().get_lights.assert_not_called()
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_light_304(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1-1'
+
+        result = app.get('/api/v1/lights/1', headers={'If-None-Match': '"v1-1"'})
+        assert result.status_code == 304
+
+        get_model().get_version.assert_called_with(1)
+        get_model().get_light.assert_not_called()
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_page_200(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights?limit=1&after_id=0')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data[0]['id'] == 1
+        get_model().get_lights.assert_called_once_with(limit=1, after_id=0)
+
+        cursor = result.headers['X-Next-Cursor']
+        result = app.get(f'/api/v1/lights?cursor={cursor}')
+        assert result.status_code == 200
+        get_model().get_lights.assert_called_with(limit=100, after_id=1)
+        assert 'X-Next-Cursor' not in result.headers
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_page_limit_capped(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_lights.return_value = []
+
+        result = app.get('/api/v1/lights?limit=100000')
+        assert result.status_code == 200
+        get_model().get_lights.assert_called_once_with(limit=1000, after_id=0)
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_filtered_200(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+        get_model().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights?status=1&name_prefix=Mock&sort=-name&limit=1')
+        assert result.status_code == 200
+        query = Query((Filter('name', 'prefix', 'Mock'), Filter('status', '=', 1)), 'name', True)
+        get_model().get_lights.assert_called_once_with(limit=1, after_id=0, query=query, after=None)
+        assert result.headers['ETag'] != '"v1-0-1"'
+
+        # the next page keeps filters and sort, the cursor carries the sort value
+        assert 'status=1&name_prefix=Mock&sort=-name&limit=1&cursor=' in result.headers['Link']
+        result = app.get(f'/api/v1/lights?status=1&name_prefix=Mock&sort=-name&cursor={result.headers["X-Next-Cursor"]}')
+        assert result.status_code == 200
+        get_model().get_lights.assert_called_with(limit=100, after_id=1, query=query, after='Mock light')
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_unknown_parameter_200(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+        get_model().get_lights.return_value = []
+
+        result = app.get('/api/v1/lights?_=1700000000000')
+        assert result.status_code == 200
+        get_model().get_lights.assert_called_once_with()
+
+
+@pytest.mark.parametrize('query', ['status_gt=on', 'status=on', 'sort=temp', 'sort=name&after_id=1'])
+def test_get_lights_filtered_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/lights?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=a', 'after_id=-1', 'cursor=invalid'])
+def test_get_lights_page_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/lights?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_export_lights_200(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().iter_lights.return_value = iter([get_return_value, get_return_value])
+
+        result = app.get('/api/v1/lights/export')
+        lines = result.data.decode().splitlines()
+        assert result.status_code == 200
+        assert result.mimetype == 'application/x-ndjson'
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == get_return_value
+
+        get_model().iter_lights.assert_called_once_with(500)
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_export_lights_500(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().iter_lights.side_effect = Exception()
+
+        result = app.get('/api/v1/lights/export')
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_save_lights_bulk_201(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_lights.return_value = [1, 2]
+
+        result = app.post('/api/v1/lights/bulk', json=[{'name': 'Test light'}, {'name': 'Test light', 'status': 1}])
+        data = json.loads(result.data)
+        assert result.status_code == 201
+        assert data['ids'] == [1, 2]
+
+        get_model().save_lights.assert_called_once_with([('Test light', 0), ('Test light', 1)])
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_save_lights_bulk_ndjson_201(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_lights.return_value = [1, 2]
+
+        body = '\n'.join(json.dumps(item) for item in [{'name': 'Test light'}, {'name': 'Test light', 'status': 1}]) + '\n'
+        result = app.post('/api/v1/lights/bulk', data=body, content_type='application/x-ndjson')
+        assert result.status_code == 201
+
+        get_model().save_lights.assert_called_once_with([('Test light', 0), ('Test light', 1)])
+
+
+@pytest.mark.parametrize('request_body',
+                         [
+                             None,
+                             [],
+                             {'name': 'Test light'},
+                             [{'name': ''}],
+                             [[{'name': 'Test light'}, {'name': 'Test light', 'status': 1}][0], {'name': ''}]
+                         ])
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_save_lights_bulk_400(get_model, get_test_client, request_body):
+    with get_test_client as app:
+        result = app.post('/api/v1/lights/bulk', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+        get_model().save_lights.assert_not_called()
+
+
+def test_save_lights_bulk_ndjson_400(get_test_client):
+    with get_test_client as app:
+        result = app.post('/api/v1/lights/bulk', data='{"name": \n', content_type='application/x-ndjson')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+def test_save_lights_bulk_413(get_test_client):
+    with get_test_client as app:
+        app.application.config['BULK_MAX_BATCH_SIZE'] = 1
+        result = app.post('/api/v1/lights/bulk', json=[{'name': 'Test light'}, {'name': 'Test light', 'status': 1}])
+        data = json.loads(result.data)
+        assert result.status_code == 413
+        assert data['message']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_save_lights_bulk_500(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_lights.side_effect = Exception()
+
+        result = app.post('/api/v1/lights/bulk', json=[{'name': 'Test light'}, {'name': 'Test light', 'status': 1}])
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
+
+
+@pytest.mark.parametrize('ack', ['flush', 'enqueue'])
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_on_light_ack_204(get_model_lights, get_test_client, ack):
+    with get_test_client as app:
+        result = app.put(f'/api/v1/lights/1/on?ack={ack}')
+        assert result.status_code == 204
+
+        get_model_lights().update_status.assert_called_once_with(1, 1, durability=ack)
+
+
+def test_off_light_ack_400(get_test_client):
+    with get_test_client as app:
+        result = app.put('/api/v1/lights/1/off?ack=never')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@requires_msgpack
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_msgpack_200(get_model_lights, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights', headers={'Accept': 'application/msgpack'})
+        assert result.status_code == 200
+        assert result.mimetype == 'application/msgpack'
+        assert 'Accept' in result.headers['Vary']
+        assert msgpack.unpackb(result.data) == [get_return_value]
+
+        # the JSON entity tag does not match the MessagePack representation
+        result = app.get('/api/v1/lights', headers={'Accept': 'application/msgpack', 'If-None-Match': '"v1"'})
+        assert result.status_code == 200
+        result = app.get('/api/v1/lights', headers={'Accept': 'application/msgpack', 'If-None-Match': '"v1-msgpack"'})
+        assert result.status_code == 304
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_columnar_200(get_model_lights, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = [get_return_value]
+
+        result = app.get('/api/v1/lights', headers={'Accept': 'application/vnd.home-automation.columnar+json'})
+        assert result.status_code == 200
+        assert json.loads(result.data) == {name: [value] for name, value in get_return_value.items()}
@@ -0,0 +1,17 @@
+from home_automation.metrics import metrics
+
+
+def test_get_metrics_200(get_test_client):
+    with get_test_client as app:
+        metrics.clear()
+        app.get('/api/v1/lights/0')
+
+        result = app.get('/metrics')
+        text = result.data.decode()
+        assert result.status_code == 200
+        assert result.mimetype == 'text/plain'
+        assert 'http_requests_total{endpoint="lights.get_light",method="GET",status="400"} 1' in text
+        assert 'http_request_duration_seconds_count{endpoint="lights.get_light",method="GET"} 1' in text
+        assert 'http_requests_in_flight{endpoint="lights.get_light",method="GET"} 0' in text
+        assert 'cache_hits_total' in text
+
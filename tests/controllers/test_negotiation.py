@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from home_automation.controllers.negotiation import (COLUMNAR_JSON_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE,
+                                                     JSON_MIMETYPE, MSGPACK_MIMETYPE, columns, msgpack, negotiate,
+                                                     render, representation_etag)
+
+requires_msgpack = pytest.mark.skipif(msgpack is None, reason='msgpack is not installed')
+
+ROWS = [{'id': 1, 'name': 'Light', 'status': 0}, {'id': 2, 'name': 'Other light', 'status': 1}]
+
+
+@pytest.mark.parametrize('accept, mimetype', [
+    (None, JSON_MIMETYPE),
+    ('*/*', JSON_MIMETYPE),
+    ('text/html', JSON_MIMETYPE),
+    pytest.param('application/msgpack', MSGPACK_MIMETYPE, marks=requires_msgpack),
+    pytest.param('application/json;q=0.5, application/msgpack', MSGPACK_MIMETYPE, marks=requires_msgpack),
+    (COLUMNAR_JSON_MIMETYPE, COLUMNAR_JSON_MIMETYPE),
+    pytest.param(COLUMNAR_MSGPACK_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE, marks=requires_msgpack)
+])
+def test_negotiate(accept, mimetype):
+    assert negotiate(accept) == mimetype
+
+
+def test_columns():
+    assert columns(ROWS) == {'id': [1, 2], 'name': ['Light', 'Other light'], 'status': [0, 1]}
+    assert columns([]) == {}
+
+
+def test_render(get_test_client):
+    with get_test_client.application.app_context():
+        assert json.loads(render(ROWS, JSON_MIMETYPE)) == ROWS
+        assert json.loads(render(ROWS, COLUMNAR_JSON_MIMETYPE)) == columns(ROWS)
+
+
+@requires_msgpack
+def test_render_msgpack():
+    assert msgpack.unpackb(render(ROWS, MSGPACK_MIMETYPE)) == ROWS
+    assert msgpack.unpackb(render(ROWS, COLUMNAR_MSGPACK_MIMETYPE)) == columns(ROWS)
+
+
+def test_representation_etag():
+    etags = {representation_etag('v1', mimetype) for mimetype in
+             (JSON_MIMETYPE, MSGPACK_MIMETYPE, COLUMNAR_JSON_MIMETYPE, COLUMNAR_MSGPACK_MIMETYPE)}
+
+    assert len(etags) == 4
+    assert representation_etag('v1', JSON_MIMETYPE) == 'v1'
+
+
+def test_negotiate_without_msgpack(monkeypatch):
+    monkeypatch.setattr('home_automation.controllers.negotiation.msgpack', None)
+
+    assert negotiate('application/msgpack') == JSON_MIMETYPE
+    assert negotiate('application/msgpack, application/json;q=0.1') == JSON_MIMETYPE
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from unittest.mock import patch
+
+
+@patch('home_automation.controllers.search.get_model_search')
+def test_search_200(get_model_search, get_test_client):
+    with get_test_client as app:
+        get_model_search().search.return_value = [{'type': 'light', 'id': 1, 'name': 'Kitchen lamp'}]
+
+        result = app.get('/api/v1/search?q=kit%20lamp&type=lights&limit=5')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data == [{'type': 'light', 'id': 1, 'name': 'Kitchen lamp'}]
+
+        get_model_search().search.assert_called_with('kit lamp', ('lights',), 5, 500)
+
+
+@patch('home_automation.controllers.search.get_model_search')
+def test_search_defaults(get_model_search, get_test_client):
+    with get_test_client as app:
+        get_model_search().search.return_value = []
+
+        assert app.get('/api/v1/search?q=kit').status_code == 200
+        get_model_search().search.assert_called_with('kit', ('lights', 'thermostats'), 20, 500)
+
+        assert app.get('/api/v1/search?q=kit&limit=1000').status_code == 200
+        get_model_search().search.assert_called_with('kit', ('lights', 'thermostats'), 100, 500)
+
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=%20', f'q={"a" * 201}', 'q=kit&type=doors', 'q=kit&limit=0',
+                                   'q=kit&limit=a'])
+def test_search_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/search?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message'].startswith('Search incorrect parameters')
+
+
+@patch('home_automation.controllers.search.get_model_search')
+def test_search_500(get_model_search, get_test_client):
+    with get_test_client as app:
+        get_model_search().search.side_effect = Exception('error')
+
+        result = app.get('/api/v1/search?q=kit')
+        assert result.status_code == 500
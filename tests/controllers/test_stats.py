@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from unittest.mock import patch
+
+
+def test_get_cache_stats_200(get_test_client):
+    with get_test_client as app:
+        result = app.get('/api/v1/stats/cache')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data['hits'] >= 0
+        assert data['misses'] >= 0
+        assert 0 <= data['hit_rate'] <= 1
+
+
+@patch('home_automation.controllers.stats.tracer')
+def test_get_query_stats_200(tracer, get_test_client):
+    with get_test_client as app:
+        tracer.enabled = True
+        tracer.top.return_value = [{'sql': 'SELECT * FROM lights', 'count': 1}]
+
+        result = app.get('/api/v1/stats/queries?top=5&order=max')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data['enabled']
+        assert data['statements'][0]['sql'] == 'SELECT * FROM lights'
+
+        tracer.top.assert_called_once_with(5, 'max')
+
+
+@pytest.mark.parametrize('query', ['top=0', 'top=a', 'order=rows'])
+def test_get_query_stats_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/stats/queries?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
@@ -232,3 +232,232 @@ def test_update_name_500(get_model_thermostats, get_test_client):
         data = json.loads(result.data)
         assert result.status_code == 500
         assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_thermostats_etag(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+        get_model().get_thermostats.return_value = [get_return_value]
+
+        result = app.get('/api/v1/thermostats')
+        assert result.status_code == 200
+        assert result.headers['ETag'] == '"v1"'
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_thermostats_304(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1'
+
+        result = app.get('/api/v1/thermostats', headers={'If-None-Match': '"v1"'})
+        assert result.status_code == 304
+        assert result.headers['ETag'] == '"v1"'
+        assert not result.data
+
+        get_model().get_thermostats.assert_not_called()
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_thermostat_304(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_version.return_value = 'v1-1'
+
+        result = app.get('/api/v1/thermostats/1', headers={'If-None-Match': '"v1-1"'})
+        assert result.status_code == 304
+
+        get_model().get_version.assert_called_with(1)
+        get_model().get_thermostat.assert_not_called()
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_thermostats_page_200(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().get_thermostats.return_value = [get_return_value]
+
+        result = app.get('/api/v1/thermostats?limit=1&after_id=0')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data[0]['id'] == 1
+        get_model().get_thermostats.assert_called_once_with(limit=1, after_id=0)
+
+        cursor = result.headers['X-Next-Cursor']
+        result = app.get(f'/api/v1/thermostats?cursor={cursor}')
+        assert result.status_code == 200
+        get_model().get_thermostats.assert_called_with(limit=100, after_id=1)
+        assert 'X-Next-Cursor' not in result.headers
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_thermostats_page_limit_capped(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().get_thermostats.return_value = []
+
+        result = app.get('/api/v1/thermostats?limit=100000')
+        assert result.status_code == 200
+        get_model().get_thermostats.assert_called_once_with(limit=1000, after_id=0)
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=a', 'after_id=-1', 'cursor=invalid'])
+def test_get_thermostats_page_400(get_test_client, query):
+    with get_test_client as app:
+        result = app.get(f'/api/v1/thermostats?{query}')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_export_thermostats_200(get_model, get_test_client, get_return_value):
+    with get_test_client as app:
+        get_model().iter_thermostats.return_value = iter([get_return_value, get_return_value])
+
+        result = app.get('/api/v1/thermostats/export')
+        lines = result.data.decode().splitlines()
+        assert result.status_code == 200
+        assert result.mimetype == 'application/x-ndjson'
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == get_return_value
+
+        get_model().iter_thermostats.assert_called_once_with(500)
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_export_thermostats_500(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().iter_thermostats.side_effect = Exception()
+
+        result = app.get('/api/v1/thermostats/export')
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_save_thermostats_bulk_201(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_thermostats.return_value = [1, 2]
+
+        result = app.post('/api/v1/thermostats/bulk', json=[{'name': 'Test thermostat', 'temp': 20}, {'name': 'Test thermostat', 'temp': 0}])
+        data = json.loads(result.data)
+        assert result.status_code == 201
+        assert data['ids'] == [1, 2]
+
+        get_model().save_thermostats.assert_called_once_with([('Test thermostat', 20), ('Test thermostat', 0)])
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_save_thermostats_bulk_ndjson_201(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_thermostats.return_value = [1, 2]
+
+        body = '\n'.join(json.dumps(item) for item in [{'name': 'Test thermostat', 'temp': 20}, {'name': 'Test thermostat', 'temp': 0}]) + '\n'
+        result = app.post('/api/v1/thermostats/bulk', data=body, content_type='application/x-ndjson')
+        assert result.status_code == 201
+
+        get_model().save_thermostats.assert_called_once_with([('Test thermostat', 20), ('Test thermostat', 0)])
+
+
+@pytest.mark.parametrize('request_body',
+                         [
+                             None,
+                             [],
+                             {'name': 'Test thermostat'},
+                             [{'name': 'Test thermostat', 'temp': 301}],
+                             [[{'name': 'Test thermostat', 'temp': 20}, {'name': 'Test thermostat', 'temp': 0}][0], {'name': 'Test thermostat', 'temp': 301}]
+                         ])
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_save_thermostats_bulk_400(get_model, get_test_client, request_body):
+    with get_test_client as app:
+        result = app.post('/api/v1/thermostats/bulk', json=request_body)
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+        get_model().save_thermostats.assert_not_called()
+
+
+def test_save_thermostats_bulk_ndjson_400(get_test_client):
+    with get_test_client as app:
+        result = app.post('/api/v1/thermostats/bulk', data='{"name": \n', content_type='application/x-ndjson')
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+def test_save_thermostats_bulk_413(get_test_client):
+    with get_test_client as app:
+        app.application.config['BULK_MAX_BATCH_SIZE'] = 1
+        result = app.post('/api/v1/thermostats/bulk', json=[{'name': 'Test thermostat', 'temp': 20}, {'name': 'Test thermostat', 'temp': 0}])
+        data = json.loads(result.data)
+        assert result.status_code == 413
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_save_thermostats_bulk_500(get_model, get_test_client):
+    with get_test_client as app:
+        get_model().save_thermostats.side_effect = Exception()
+
+        result = app.post('/api/v1/thermostats/bulk', json=[{'name': 'Test thermostat', 'temp': 20}, {'name': 'Test thermostat', 'temp': 0}])
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_update_temp_ack_204(get_model_thermostats, get_test_client):
+    with get_test_client as app:
+        result = app.put('/api/v1/thermostats/1/temp?ack=enqueue', json={'temp': 64})
+        assert result.status_code == 204
+
+        get_model_thermostats().update_temp.assert_called_once_with(1, 64, durability='enqueue')
+
+
+def test_update_temp_ack_400(get_test_client):
+    with get_test_client as app:
+        result = app.put('/api/v1/thermostats/1/temp?ack=never', json={'temp': 64})
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_temp_history_200(get_model_thermostats, get_test_client):
+    with get_test_client as app:
+        history = [{'bucket': 3600, 'min': 60, 'max': 64, 'avg': 62.0, 'count': 2}]
+        get_model_thermostats().get_temp_history.return_value = history
+
+        result = app.get('/api/v1/thermostats/1/history?bucket=1h&from=0&to=86400')
+        data = json.loads(result.data)
+        assert result.status_code == 200
+        assert data == history
+
+        get_model_thermostats().get_temp_history.assert_called_once_with(1, 0, 86400, 3600)
+
+
+@pytest.mark.parametrize('url',
+                         [
+                             '/api/v1/thermostats/0/history',
+                             '/api/v1/thermostats/1/history?bucket=1w',
+                             '/api/v1/thermostats/1/history?from=a',
+                             '/api/v1/thermostats/1/history?from=10&to=5',
+                             '/api/v1/thermostats/1/history?bucket=1m&from=0&to=31536000'
+                         ])
+def test_get_temp_history_400(get_test_client, url):
+    with get_test_client as app:
+        result = app.get(url)
+        data = json.loads(result.data)
+        assert result.status_code == 400
+        assert data['message']
+
+
+@patch('home_automation.controllers.thermostats.get_model_thermostats')
+def test_get_temp_history_500(get_model_thermostats, get_test_client):
+    with get_test_client as app:
+        get_model_thermostats().get_temp_history.side_effect = Exception()
+
+        result = app.get('/api/v1/thermostats/1/history')
+        data = json.loads(result.data)
+        assert result.status_code == 500
+        assert data['message']
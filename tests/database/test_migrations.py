@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from home_automation.database.migrations import MIGRATIONS, STRICT, get_version, migrate
+
+
+@pytest.fixture()
+def get_connection(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'test.db'))
+    yield conn
+    conn.close()
+
+
+def _indexes(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA index_list({table})')}
+
+
+def test_migrate_new_database(get_connection):
+    from_version, to_version, elapsed = migrate(get_connection)
+
+    assert (from_version, to_version) == (0, MIGRATIONS[-1][0])
+    assert elapsed >= 0
+    assert get_version(get_connection) == to_version
+    assert {'lights_name', 'lights_creation_date'} <= _indexes(get_connection, 'lights')
+    assert {'thermostats_name', 'thermostats_creation_date'} <= _indexes(get_connection, 'thermostats')
+
+    # nothing left to apply
+    assert migrate(get_connection)[:2] == (to_version, to_version)
+
+
+def test_migrate_keeps_rows_of_unversioned_database(get_connection):
+    # schema created by create_database before migrations existed
+    get_connection.execute("""CREATE TABLE lights (id integer PRIMARY KEY, name text NOT NULL,
+                                                   status integer default 0, creation_date text)""")
+    get_connection.execute("""INSERT INTO lights(name, status, creation_date) VALUES ('Light', NULL, '2020-08-27')""")
+    get_connection.commit()
+
+    migrate(get_connection)
+
+    assert get_connection.execute("""SELECT id, name, status FROM lights""").fetchall() == [(1, 'Light', 0)]
+    # the search index is built from existing rows
+    matches = get_connection.execute("""SELECT rowid FROM lights_fts WHERE lights_fts MATCH 'light'""").fetchall()
+    assert matches == [(1,)]
+    # existing rows are numbered by the change sequence
+    assert get_connection.execute("""SELECT seq FROM lights""").fetchall() == [(1,)]
+    assert get_connection.execute("""SELECT value FROM change_sequence""").fetchall() == [(1,)]
+
+
+@pytest.mark.skipif(not STRICT, reason='STRICT tables need SQLite 3.37')
+def test_strict_columns(get_connection):
+    migrate(get_connection)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        get_connection.execute("""INSERT INTO lights(name, status) VALUES ('Light', 'on')""")
+
+
+def test_failed_migration_rolled_back(get_connection):
+    migrations = MIGRATIONS + [(100, 'broken', ["""CREATE TABLE broken (id integer)""", """SELECT * FROM missing"""])]
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(get_connection, migrations)
+
+    assert get_version(get_connection) == MIGRATIONS[-1][0]
+    assert not get_connection.execute("""SELECT name FROM sqlite_master WHERE name='broken'""").fetchall()
@@ -0,0 +1,15 @@
+import pytest
+
+from home_automation.database.database import create_database
+from home_automation.model.connection_pool import ConnectionPool
+from home_automation.model.model import cache
+
+
+@pytest.fixture()
+def get_test_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr('home_automation.database.database.DB_PATH', db_path)
+    create_database()
+    monkeypatch.setattr('home_automation.model.model.pool', ConnectionPool(db_path))
+    cache.clear()
+    return db_path
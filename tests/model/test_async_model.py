@@ -0,0 +1,58 @@
+import asyncio
+
+from home_automation.model.async_model import AsyncModel
+from home_automation.model.model_lights import ModelLights
+
+
+def _run(coro):
+    # asyncio.run is Python 3.7+, the Docker image runs Python 3.6
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def test_calls_run_on_executor(get_test_db):
+    async def run():
+        model = AsyncModel(ModelLights())
+        id = await model.save_light('Light', 1)
+        return id, await model.get_light(id), model.get_version(id)
+
+    id, res, version = _run(run())
+    assert res == [{'id': id, 'name': 'Light', 'status': 1, 'creation_date': res[0]['creation_date'],
+                    'seq': 1}]
+    assert version
+
+
+def test_iterate_in_batches(get_test_db):
+    ModelLights().save_lights([(f'Light {i}', 0) for i in range(5)])
+
+    async def run():
+        return [row['name'] async for row in AsyncModel(ModelLights()).iterate('iter_lights', batch_size=2)]
+
+    assert _run(run()) == [f'Light {i}' for i in range(5)]
+
+
+def test_iterate_closed_early(get_test_db):
+    ModelLights().save_lights([(f'Light {i}', 0) for i in range(10)])
+
+    async def run():
+        rows = AsyncModel(ModelLights()).iterate('iter_lights', batch_size=1)
+        first = [row async for row in _take(rows, 2)]
+        await rows.aclose()
+        # the producer stops and returns its connection, later calls still get a thread
+        return first, await AsyncModel(ModelLights()).get_light(1)
+
+    first, res = _run(asyncio.wait_for(run(), 5))
+    assert [row['id'] for row in first] == [1, 2]
+    assert res[0]['id'] == 1
+
+
+async def _take(rows, count):
+    async for row in rows:
+        yield row
+        count -= 1
+        if not count:
+            return
@@ -0,0 +1,58 @@
+from home_automation.model.cache import Cache
+
+
+def test_hit_and_miss():
+    cache = Cache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [1]
+
+    assert cache.get_or_load(('lights', 'list'), loader) == [1]
+    assert cache.get_or_load(('lights', 'list'), loader) == [1]
+    assert len(loads) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_ttl_expired():
+    cache = Cache(ttl=-1)
+    cache.get_or_load(('lights', 'list'), lambda: [1])
+    assert cache.get_or_load(('lights', 'list'), lambda: [2]) == [2]
+
+
+def test_lru_eviction():
+    cache = Cache(max_size=2)
+    cache.get_or_load(('lights', 'row', 1), lambda: 1)
+    cache.get_or_load(('lights', 'row', 2), lambda: 2)
+    cache.get_or_load(('lights', 'row', 1), lambda: 1)
+    cache.get_or_load(('lights', 'row', 3), lambda: 3)
+
+    assert cache.get_or_load(('lights', 'row', 1), lambda: None) == 1
+    assert cache.get_or_load(('lights', 'row', 2), lambda: None) is None
+
+
+def test_invalidate_ids():
+    cache = Cache()
+    cache.get_or_load(('lights', 'list'), lambda: [1, 2])
+    cache.get_or_load(('lights', 'row', 1), lambda: 1)
+    cache.get_or_load(('lights', 'row', 2), lambda: 2)
+    cache.get_or_load(('thermostats', 'list'), lambda: [1])
+    cache.invalidate('lights', [1])
+
+    assert cache.get_or_load(('lights', 'list'), lambda: None) is None
+    assert cache.get_or_load(('lights', 'row', 1), lambda: None) is None
+    assert cache.get_or_load(('lights', 'row', 2), lambda: None) == 2
+    assert cache.get_or_load(('thermostats', 'list'), lambda: None) == [1]
+
+
+def test_write_while_loading_not_cached():
+    cache = Cache()
+
+    def loader():
+        cache.invalidate('lights', [1])
+        return 'stale'
+
+    cache.get_or_load(('lights', 'row', 1), loader)
+    assert cache.get_or_load(('lights', 'row', 1), lambda: 'fresh') == 'fresh'
@@ -0,0 +1,34 @@
+from home_automation.model.change_feed import ChangeFeed
+
+
+def test_wait_returns_changes_after_last_id():
+    feed = ChangeFeed()
+    feed.publish('lights', [1, 2], 'update')
+    feed.publish('thermostats', None, 'create')
+
+    changes = feed.wait(1, timeout=0)
+    assert [(c['seq'], c['table'], c['id']) for c in changes] == [(2, 'lights', 2), (3, 'thermostats', None)]
+    assert feed.wait(3, timeout=0) == []
+
+
+def test_can_resume_within_buffer():
+    feed = ChangeFeed(size=2)
+    feed.publish('lights', [1, 2, 3], 'update')
+
+    assert feed.can_resume(1)
+    assert feed.can_resume(3)
+    assert not feed.can_resume(0)
+    assert not feed.can_resume(4)
+
+
+def test_listeners_called_on_publish():
+    feed = ChangeFeed()
+    calls = []
+    feed.subscribe(lambda: calls.append(feed.last_id))
+
+    feed.publish('lights', [1, 2], 'update')
+    assert calls == [2]
+
+    feed.unsubscribe(feed._listeners[0])
+    feed.publish('lights', [3], 'update')
+    assert calls == [2]
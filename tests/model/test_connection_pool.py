@@ -0,0 +1,100 @@
+import threading
+
+from home_automation.model.connection_pool import ConnectionPool
+
+
+def test_connection_reused(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+
+    with pool.connection() as conn:
+        first = conn
+    with pool.connection() as conn:
+        assert conn is first
+
+
+def test_connection_configured(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), busy_timeout=1234)
+
+    with pool.connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 1234
+
+
+def test_idle_connection_expired(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), max_idle=-1)
+
+    with pool.connection() as conn:
+        first = conn
+    with pool.connection() as conn:
+        assert conn is not first
+
+
+def test_pool_size_bounded(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), size=1)
+
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    assert pool._idle.qsize() == 1
+
+
+def test_connection_reused_across_threads(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+    connections = []
+
+    def borrow():
+        with pool.connection() as conn:
+            conn.execute('SELECT 1')
+            connections.append(conn)
+
+    borrow()
+    for _ in range(3):
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        thread.join()
+    assert all(conn is connections[0] for conn in connections)
+
+
+def test_connection_used_by_one_thread_at_a_time(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+    connections = []
+    borrowed = threading.Barrier(2)
+
+    def borrow():
+        with pool.connection() as conn:
+            connections.append(conn)
+            borrowed.wait()
+
+    threads = [threading.Thread(target=borrow) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert connections[0] is not connections[1]
+
+
+def test_rollback_on_exception(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+    with pool.connection() as conn:
+        conn.execute('CREATE TABLE t (id integer)')
+
+    try:
+        with pool.connection() as conn:
+            conn.execute('INSERT INTO t VALUES (1)')
+            raise ValueError()
+    except ValueError:
+        pass
+
+    with pool.connection() as conn:
+        assert conn.execute('SELECT count(*) FROM t').fetchone()[0] == 0
+
+
+def test_after_fork_forgets_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+
+    with pool.connection() as conn:
+        first = conn
+    pool.after_fork()
+    with pool.connection() as conn:
+        assert conn is not first
@@ -0,0 +1,41 @@
+import pytest
+
+from home_automation.model.model import transaction
+from home_automation.model.model_lights import ModelLights
+from home_automation.model.model_thermostats import ModelThermostats
+
+
+def test_transaction_commit(get_test_db):
+    lights = ModelLights()
+    thermostats = ModelThermostats()
+    version = lights.get_version()
+
+    with transaction():
+        id = lights.save_light('Test light', 0)
+        lights.update_status(id, 1)
+        thermostats.save_thermostat('Test thermostat', 64)
+        assert lights.get_version() == version
+
+    assert lights.get_light(id)[0]['status'] == 1
+    assert len(thermostats.get_thermostats()) == 1
+    assert lights.get_version() != version
+
+
+def test_transaction_rollback(get_test_db):
+    lights = ModelLights()
+    thermostats = ModelThermostats()
+    lights.save_light('Test light', 0)
+    assert lights.get_lights()[0]['status'] == 0
+    version = lights.get_version()
+
+    with pytest.raises(ValueError):
+        with transaction():
+            lights.update_status(1, 1)
+            lights.save_lights([('Test light 2', 1)])
+            thermostats.save_thermostat('Test thermostat', 64)
+            raise ValueError()
+
+    assert len(lights.get_lights()) == 1
+    assert lights.get_lights()[0]['status'] == 0
+    assert thermostats.get_thermostats() == []
+    assert lights.get_version() == version
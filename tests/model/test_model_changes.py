@@ -0,0 +1,72 @@
+from home_automation.model.model_changes import ModelChanges
+from home_automation.model.model_lights import ModelLights
+from home_automation.model.model_thermostats import ModelThermostats
+
+
+def _ids(changes, table):
+    return [row['id'] for row in changes[table]]
+
+
+def test_every_write_bumps_sequence(get_test_db):
+    lights = ModelLights()
+    assert ModelChanges().get_sequence() == 0
+
+    id = lights.save_light('Light', 0)
+    assert lights.get_light(id)[0]['seq'] == 1
+    lights.update_status(id, 1)
+    lights.update_name(id, 'Kitchen')
+    assert lights.get_light(id)[0]['seq'] == 3
+
+    # writing the same value is not a change
+    lights.update_status(id, 1)
+    assert ModelChanges().get_sequence() == 3
+
+
+def test_get_changes(get_test_db):
+    lights = ModelLights()
+    thermostats = ModelThermostats()
+    lights.save_lights([('Light 1', 0), ('Light 2', 0), ('Light 3', 0)])
+    thermostats.save_thermostat('Thermostat', 20)
+    since = ModelChanges().get_sequence()
+
+    lights.update_status(2, 1)
+    thermostats.update_temp(1, 22)
+    lights.delete_light(3)
+    lights.update_name(2, 'Kitchen')
+
+    changes = ModelChanges().get_changes(since)
+    assert changes['since'] == since + 4
+    assert not changes['more']
+    assert [(row['id'], row['name'], row['status']) for row in changes['lights']] == [(2, 'Kitchen', 1)]
+    assert [(row['id'], row['temp']) for row in changes['thermostats']] == [(1, 22)]
+    assert changes['deleted'] == {'lights': [3], 'thermostats': []}
+
+    assert ModelChanges().get_changes(changes['since']) == {
+        'since': changes['since'], 'more': False, 'lights': [], 'thermostats': [],
+        'deleted': {'lights': [], 'thermostats': []}}
+
+
+def test_get_changes_pages(get_test_db):
+    ModelLights().save_lights([(f'Light {i}', 0) for i in range(5)])
+    ModelThermostats().delete_thermostat(ModelThermostats().save_thermostat('Thermostat', 20))
+
+    first = ModelChanges().get_changes(0, limit=4)
+    assert first['more']
+    assert _ids(first, 'lights') == [1, 2, 3, 4]
+
+    second = ModelChanges().get_changes(first['since'], limit=4)
+    assert not second['more']
+    assert _ids(second, 'lights') == [5]
+    assert _ids(second, 'thermostats') == []
+    assert second['deleted']['thermostats'] == [1]
+
+
+def test_id_created_again_removes_tombstone(get_test_db):
+    thermostats = ModelThermostats()
+    id = thermostats.save_thermostat('Thermostat', 20)
+    thermostats.delete_thermostat(id)
+    assert thermostats.save_thermostat('Hall', 18) == id
+
+    changes = ModelChanges().get_changes(0)
+    assert _ids(changes, 'thermostats') == [id]
+    assert changes['deleted']['thermostats'] == []
@@ -0,0 +1,237 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from home_automation.model.connection_pool import ConnectionPool
+from home_automation.model.model import change_feed, transaction, versions, write_queue
+from home_automation.model.model_lights import ModelLights
+from home_automation.model.query import Filter, Query
+
+
+def test_update_status_many_all(get_test_db):
+    model = ModelLights()
+    model.save_light('Test light 1', 0)
+    model.save_light('Test light 2', 1)
+
+    assert model.update_status_many(1) == [1]
+    assert [light['status'] for light in model.get_lights()] == [1, 1]
+    assert model.update_status_many(1) == []
+
+
+def test_update_status_many_ids(get_test_db):
+    model = ModelLights()
+    for i in range(3):
+        model.save_light(f'Test light {i}', 0)
+
+    assert model.update_status_many(1, [1, 3, 99]) == [1, 3]
+    assert [light['status'] for light in model.get_lights()] == [1, 0, 1]
+    assert model.update_status_many(1, []) == []
+
+
+def test_writes_invalidate_cache(get_test_db):
+    model = ModelLights()
+    assert model.get_light(1) == []
+    assert model.get_lights() == []
+
+    id = model.save_light('Test light', 0)
+    assert model.get_light(id)[0]['name'] == 'Test light'
+    assert len(model.get_lights()) == 1
+
+    model.update_name(id, 'Test change name')
+    assert model.get_light(id)[0]['name'] == 'Test change name'
+    assert model.get_lights()[0]['name'] == 'Test change name'
+
+    model.update_status_many(1)
+    assert model.get_light(id)[0]['status'] == 1
+
+    model.delete_light(id)
+    assert model.get_light(id) == []
+    assert model.get_lights() == []
+
+
+def test_writes_bump_version(get_test_db):
+    model = ModelLights()
+    table_version = model.get_version()
+    row_version = model.get_version(1)
+
+    id = model.save_light('Test light', 0)
+    assert model.get_version() != table_version
+    assert model.get_version(id) != row_version
+
+    table_version = model.get_version()
+    other_row_version = model.get_version(id + 1)
+    model.update_status(id, 1)
+    assert model.get_version() != table_version
+    assert model.get_version(id + 1) == other_row_version
+
+
+def test_version_bumped_after_cache_invalidated(get_test_db, monkeypatch):
+    model = ModelLights()
+    id = model.save_light('Test light', 0)
+    model.get_light(id)
+    read_at_bump = []
+    bump = versions.bump
+
+    def reading_bump(table, ids):
+        # a concurrent read right before the new version is visible
+        read_at_bump.append(model.get_light(id)[0]['status'])
+        bump(table, ids)
+
+    monkeypatch.setattr(versions, 'bump', reading_bump)
+    model.update_status(id, 1)
+    assert read_at_bump == [1]
+
+
+def test_get_lights_page(get_test_db):
+    model = ModelLights()
+    for i in range(5):
+        model.save_light(f'Test light {i}', 0)
+
+    assert [light['id'] for light in model.get_lights(limit=2)] == [1, 2]
+    assert [light['id'] for light in model.get_lights(limit=2, after_id=2)] == [3, 4]
+    assert [light['id'] for light in model.get_lights(limit=2, after_id=4)] == [5]
+
+
+def test_get_lights_query(get_test_db):
+    model = ModelLights()
+    for name, status in [('Kitchen', 1), ('Hall', 1), ('Kitchen spot', 0), ('Bedroom', 1), ('Kitchen', 1)]:
+        model.save_light(name, status)
+
+    query = Query((Filter('name', 'prefix', 'Kitchen'), Filter('status', '=', 1)), 'id', False)
+    assert [light['id'] for light in model.get_lights(query=query)] == [1, 5]
+
+    # keyset pages on (name, id) in descending order
+    query = Query((Filter('status', '=', 1),), 'name', True)
+    assert [light['id'] for light in model.get_lights(limit=2, query=query)] == [5, 1]
+    assert [light['id'] for light in model.get_lights(limit=2, after_id=1, after='Kitchen', query=query)] == [2, 4]
+
+    model.update_status(1, 0)
+    assert [light['id'] for light in model.get_lights(limit=2, query=query)] == [5, 2]
+
+
+def test_iter_lights(get_test_db):
+    model = ModelLights()
+    for i in range(5):
+        model.save_light(f'Test light {i}', 0)
+
+    assert [light['id'] for light in model.iter_lights(batch_size=2)] == [1, 2, 3, 4, 5]
+
+
+def test_iter_lights_closed_early(get_test_db, monkeypatch):
+    model = ModelLights()
+    model.save_lights([(f'Test light {i}', 0) for i in range(5)])
+    writes = []
+
+    class WritingPool(ConnectionPool):
+        def release(self, conn):
+            # another thread commits and borrows the connection as soon as it is released
+            with sqlite3.connect(get_test_db) as other:
+                other.execute("""UPDATE lights SET name='Renamed' WHERE id=5""")
+            other.close()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.rollback()
+                writes.append('ok')
+            except sqlite3.OperationalError as e:
+                writes.append(str(e))
+            super().release(conn)
+
+    monkeypatch.setattr('home_automation.model.model.pool', WritingPool(get_test_db))
+    lights = model.iter_lights(batch_size=2)
+    assert next(lights)['id'] == 1
+    lights.close()
+
+    assert writes == ['ok']
+
+
+def test_save_lights(get_test_db):
+    model = ModelLights()
+    model.save_light('Test light', 0)
+
+    assert model.save_lights([('Test light 1', 0), ('Test light 2', 1)]) == [2, 3]
+    assert [light['status'] for light in model.get_lights()] == [0, 0, 1]
+
+
+def test_update_status_write_queue(get_test_db, monkeypatch):
+    monkeypatch.setattr(write_queue, 'enabled', True)
+    model = ModelLights()
+    id = model.save_light('Test light', 0)
+
+    model.update_status(id, 1, durability='enqueue')
+    model.update_status(id, 0, durability='enqueue')
+    model.update_status(id, 1)
+    assert model.get_light(id)[0]['status'] == 1
+
+
+def test_transaction_after_queued_write(get_test_db, monkeypatch):
+    monkeypatch.setattr(write_queue, 'enabled', True)
+    monkeypatch.setattr(write_queue, 'interval', 0.05)
+    model = ModelLights()
+    id = model.save_light('Test light', 0)
+
+    model.update_status(id, 1, durability='enqueue')
+    with transaction():
+        model.update_status(id, 0)
+    write_queue.flush()
+    assert model.get_light(id)[0]['status'] == 0
+
+
+def test_update_status_many_after_queued_batch(get_test_db, monkeypatch):
+    monkeypatch.setattr(write_queue, 'enabled', True)
+    model = ModelLights()
+    id = model.save_light('Test light', 0)
+    applying, release, committed = threading.Event(), threading.Event(), threading.Event()
+
+    write_transaction = write_queue.transaction
+
+    @contextmanager
+    def delayed_transaction():
+        # the writer took the batch but has not begun its transaction yet
+        applying.set()
+        release.wait(5)
+        with write_transaction() as conn:
+            yield conn
+        committed.set()
+
+    monkeypatch.setattr(write_queue, 'transaction', delayed_transaction)
+    model.update_status(id, 1, durability='enqueue')
+    assert applying.wait(5)
+
+    off = threading.Thread(target=model.update_status_many, args=(0,))
+    off.start()
+    time.sleep(0.05)
+    release.set()
+    off.join(5)
+    assert committed.wait(5)
+
+    assert model.get_light(id)[0]['status'] == 0
+
+
+def test_writes_publish_changes(get_test_db):
+    model = ModelLights()
+    last_id = change_feed.last_id
+
+    id = model.save_light('Test light', 0)
+    model.update_name(id, 'Test change name')
+    model.delete_light(id)
+
+    changes = change_feed.wait(last_id, timeout=0)
+    assert [(c['table'], c['id'], c['op']) for c in changes] == [
+        ('lights', id, 'create'), ('lights', id, 'update'), ('lights', id, 'delete')]
+
+
+def test_writes_changing_nothing_publish_nothing(get_test_db):
+    model = ModelLights()
+    id = model.save_light('Test light', 1)
+    last_id = change_feed.last_id
+    version = model.get_version()
+
+    assert model.update_status(id, 1) == 0
+    assert model.update_name(id, 'Test light') == 0
+    assert model.update_name(id + 1, 'Missing light') == 0
+    assert model.delete_light(id + 1) == 0
+
+    assert change_feed.wait(last_id, timeout=0) == []
+    assert model.get_version() == version
+    assert model.update_status(id, 0) == 1
@@ -0,0 +1,76 @@
+from home_automation.model.model_lights import ModelLights
+from home_automation.model.model_search import ModelSearch, match_expression
+from home_automation.model.model_thermostats import ModelThermostats
+
+
+def _names(results):
+    return [(result['type'], result['name']) for result in results]
+
+
+def test_match_expression():
+    assert match_expression('2nd floor hall') == '"2nd"* "floor"* "hall"*'
+    assert match_expression('kitchen OR "lamp') == '"kitchen"* "OR"* "lamp"*'
+    assert match_expression(' -* ') is None
+
+
+def test_search_prefix(get_test_db):
+    ModelLights().save_light('Kitchen lamp', 0)
+    ModelLights().save_light('Hall lamp', 0)
+    ModelThermostats().save_thermostat('Kitchen', 20)
+
+    assert sorted(_names(ModelSearch().search('kit'))) == [('light', 'Kitchen lamp'), ('thermostat', 'Kitchen')]
+    assert _names(ModelSearch().search('KIT la')) == [('light', 'Kitchen lamp')]
+    assert _names(ModelSearch().search('kit', tables=('thermostats',))) == [('thermostat', 'Kitchen')]
+    assert ModelSearch().search('garage') == []
+    assert ModelSearch().search('"') == []
+
+
+def test_search_ranking(get_test_db):
+    ModelLights().save_light('Lamp next to the kitchen door in the hall', 0)
+    ModelLights().save_light('Kitchen', 0)
+
+    results = ModelSearch().search('kitchen')
+    assert [result['id'] for result in results] == [2, 1]
+    assert ModelSearch().search('kitchen', limit=1) == [{'type': 'light', 'id': 2, 'name': 'Kitchen'}]
+
+
+def test_search_diacritics(get_test_db):
+    ModelThermostats().save_thermostat('Salle de séjour', 20)
+
+    assert _names(ModelSearch().search('sejour')) == [('thermostat', 'Salle de séjour')]
+
+
+def test_search_follows_writes(get_test_db):
+    model = ModelLights()
+    model.save_light('Kitchen lamp', 0)
+    model.save_lights([('Hall lamp', 0), ('Garage lamp', 1)])
+
+    model.update_name(1, 'Office lamp')
+    model.update_status(2, 1)
+    model.delete_light(3)
+
+    assert ModelSearch().search('kitchen') == []
+    assert _names(ModelSearch().search('office')) == [('light', 'Office lamp')]
+    assert _names(ModelSearch().search('hall')) == [('light', 'Hall lamp')]
+    assert ModelSearch().search('garage') == []
+
+
+def test_search_candidates_best_ranked(get_test_db):
+    ModelLights().save_light('Lamp next to the kitchen door in the hall', 0)
+    ModelLights().save_light('Kitchen', 0)
+
+    assert _names(ModelSearch().search('kitchen', candidates=1)) == [('light', 'Kitchen')]
+
+
+def test_search_ranking_across_tables(get_test_db):
+    ModelLights().save_lights([('Kitchen lamp', 0), ('Kitchen spot', 0), ('Kitchen strip', 0),
+                               ('Lamp next to the kitchen door in the hall', 0)])
+    ModelThermostats().save_thermostat('Radiator under the kitchen window by the door', 20)
+    ModelThermostats().save_thermostat('Kitchen', 20)
+    ModelThermostats().save_thermostat('Office', 20)
+
+    results = _names(ModelSearch().search('kitchen'))
+    assert results[:4] == [('light', 'Kitchen lamp'), ('light', 'Kitchen spot'), ('light', 'Kitchen strip'),
+                           ('thermostat', 'Kitchen')]
+    assert sorted(results[4:]) == [('light', 'Lamp next to the kitchen door in the hall'),
+                                   ('thermostat', 'Radiator under the kitchen window by the door')]
@@ -0,0 +1,47 @@
+import time
+
+from home_automation.model.model import change_feed
+from home_automation.model.model_thermostats import ModelThermostats
+
+
+def test_temp_history(get_test_db, monkeypatch):
+    model = ModelThermostats()
+    now = time.time()
+
+    monkeypatch.setattr(time, 'time', lambda: now)
+    id = model.save_thermostat('Test thermostat', 60)
+    model.update_temp(id, 70)
+    monkeypatch.setattr(time, 'time', lambda: now + 3600)
+    model.update_temp(id, 50)
+    model.update_temp(id + 1, 10)
+
+    start = int(now) // 3600 * 3600
+    history = model.get_temp_history(id, start, start + 7200, 3600)
+    assert [(h['min'], h['max'], h['avg'], h['count']) for h in history] == [(60, 70, 65.0, 2), (50, 50, 50.0, 1)]
+    assert history[0]['bucket'] == start
+
+    model.delete_thermostat(id)
+    assert model.get_temp_history(id, start, start + 7200, 3600) == []
+
+
+def test_save_thermostats_records_history(get_test_db):
+    model = ModelThermostats()
+    ids = model.save_thermostats([('Test thermostat 1', 20), ('Test thermostat 2', 30)])
+
+    now = int(time.time())
+    assert model.get_temp_history(ids[1], now - 60, now + 60, 60)[0]['max'] == 30
+
+
+def test_writes_changing_nothing_publish_nothing(get_test_db):
+    model = ModelThermostats()
+    id = model.save_thermostat('Test thermostat', 20)
+    last_id = change_feed.last_id
+
+    assert model.update_temp(id, 20) == 0
+    assert model.update_temp(id + 1, 30) == 0
+    assert model.update_name(id, 'Test thermostat') == 0
+    assert model.delete_thermostat(id + 1) == 0
+
+    assert change_feed.wait(last_id, timeout=0) == []
+    now = int(time.time())
+    assert model.get_temp_history(id, now - 60, now + 60, 60)[0]['count'] == 2
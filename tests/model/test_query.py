@@ -0,0 +1,41 @@
+import pytest
+
+from home_automation.model.query import Filter, Query, compile_query
+
+
+def test_compile_filters():
+    query = Query((Filter('status', '=', 1), Filter('name', 'prefix', 'Kit')), 'id', False)
+
+    sql, params = compile_query('lights', query, limit=10, after_id=5)
+    assert sql == """SELECT * FROM lights WHERE status=? AND name>=? AND name<? AND id>? ORDER BY id LIMIT ?"""
+    assert params == (1, 'Kit', 'Kiu', 5, 10)
+
+
+def test_compile_sort_keyset():
+    query = Query((Filter('temp', '>=', 20),), 'temp', True)
+
+    sql, params = compile_query('thermostats', query, limit=10, after_id=7, after=25)
+    assert sql == ("""SELECT * FROM thermostats WHERE temp>=? AND (temp, id)<(?, ?) """
+                   """ORDER BY temp DESC, id DESC LIMIT ?""")
+    assert params == (20, 25, 7, 10)
+
+    # first page
+    sql, params = compile_query('thermostats', query)
+    assert sql == """SELECT * FROM thermostats WHERE temp>=? ORDER BY temp DESC, id DESC"""
+    assert params == (20,)
+
+
+def test_compile_prefix_without_successor():
+    sql, params = compile_query('lights', Query((Filter('name', 'prefix', 'a\U0010ffff'),), 'id', False))
+    assert 'substr(name, 1, ?)=?' in sql
+    assert params == (2, 'a\U0010ffff')
+
+
+@pytest.mark.parametrize('query', [
+    Query((Filter('temp', '=', 1),), 'id', False),
+    Query((), 'name; DROP TABLE lights', False),
+    Query((Filter('status', 'LIKE', 1),), 'id', False)
+])
+def test_compile_unknown(query):
+    with pytest.raises(ValueError):
+        compile_query('lights', query)
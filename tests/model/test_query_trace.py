@@ -0,0 +1,49 @@
+import logging
+
+from home_automation.model.model_lights import ModelLights
+from home_automation.model.query_trace import QueryTracer
+
+
+def test_disabled_records_nothing():
+    tracer = QueryTracer(enabled=False, slow_threshold_ms=0)
+    tracer.record('SELECT * FROM lights', (), 1, 0.001, 0.002)
+
+    assert tracer.top() == []
+
+
+def test_top_statements():
+    tracer = QueryTracer(enabled=True)
+    tracer.record('SELECT * FROM lights', (), 10, 0.001, 0.002)
+    tracer.record('SELECT * FROM lights', (), 20, 0.001, 0.004)
+    tracer.record('SELECT * FROM lights WHERE id=?', (1,), 1, 0.001, 0.005)
+
+    top = tracer.top(n=1)
+    assert top[0]['sql'] == 'SELECT * FROM lights'
+    assert top[0]['count'] == 2
+    assert top[0]['avg_rows'] == 15
+    assert tracer.top(n=1, order='max')[0]['params'] == 1
+
+
+def test_slow_query_logged(caplog):
+    tracer = QueryTracer(slow_threshold_ms=1)
+
+    with caplog.at_level(logging.WARNING, logger='home_automation.slow_queries'):
+        tracer.record('SELECT * FROM lights', (), 1, 0.0, 0.0005)
+        tracer.record('SELECT *\n    FROM thermostats', (), 1, 0.0, 0.002)
+
+    assert len(caplog.records) == 1
+    assert 'SELECT * FROM thermostats' in caplog.records[0].getMessage()
+
+
+def test_transaction_statements_traced(get_test_db, monkeypatch):
+    tracer = QueryTracer(enabled=True, slow_threshold_ms=0)
+    monkeypatch.setattr('home_automation.model.model.tracer', tracer)
+
+    ModelLights().save_lights([('Kitchen', 0), ('Hall', 0)])
+    ModelLights().update_status_many(1, [1, 2])
+
+    statements = {statement['sql']: statement for statement in tracer.top(n=100, order='count')}
+    assert statements['BEGIN IMMEDIATE']['count'] == 2
+    assert statements['COMMIT']['count'] == 2
+    assert statements['INSERT INTO lights(name, status, creation_date) VALUES(?, ?, ?)']['avg_rows'] == 2
+    assert statements['UPDATE lights SET status=? WHERE status IS NOT ? AND id IN (?, ?)']['count'] == 1
@@ -0,0 +1,104 @@
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from home_automation.model.write_queue import WriteQueue
+
+
+class FakeTransaction():
+    def __init__(self):
+        self.commits = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def __call__(self):
+        with self.lock:
+            yield
+            self.commits += 1
+
+
+def test_flush_durability_waits_for_commit():
+    transaction = FakeTransaction()
+    queue = WriteQueue(transaction, enabled=True)
+    applied = []
+
+    queue.submit(('lights', 'status', 1), applied.append, 1)
+    assert applied == [1]
+    assert transaction.commits == 1
+
+
+def test_enqueue_durability_collapses_same_key():
+    transaction = FakeTransaction()
+    queue = WriteQueue(transaction, interval=0.05, enabled=True)
+    applied = []
+
+    queue.submit(('lights', 'status', 1), applied.append, 1, durability='enqueue')
+    queue.submit(('lights', 'status', 1), applied.append, 0, durability='enqueue')
+    queue.submit(('lights', 'status', 2), applied.append, 2, durability='enqueue')
+    queue.flush()
+
+    assert applied == [0, 2]
+    assert transaction.commits == 1
+
+
+def test_flush_waits_for_batch_being_applied():
+    queue = WriteQueue(FakeTransaction(), interval=0, enabled=True)
+    applying, release = threading.Event(), threading.Event()
+    applied = []
+
+    def write(value):
+        applying.set()
+        release.wait(5)
+        applied.append(value)
+
+    queue.submit(('lights', 'status', 1), write, 1, durability='enqueue')
+    assert applying.wait(5)
+
+    flush = threading.Thread(target=queue.flush)
+    flush.start()
+    flush.join(0.05)
+    assert flush.is_alive()
+
+    release.set()
+    flush.join(5)
+    assert applied == [1]
+
+
+def test_flush_error_raised_to_writer():
+    queue = WriteQueue(FakeTransaction(), enabled=True)
+
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        queue.submit(('lights', 'status', 1), fail)
+
+
+def test_unknown_durability():
+    queue = WriteQueue(FakeTransaction(), enabled=True)
+
+    with pytest.raises(ValueError):
+        queue.submit(('lights', 'status', 1), print, durability='never')
+
+
+def test_after_fork_restarts_writer():
+    transaction = FakeTransaction()
+    queue = WriteQueue(transaction, enabled=True)
+    applied = []
+
+    queue.submit(('lights', 'status', 1), applied.append, 1)
+    queue.after_fork()
+    queue.submit(('lights', 'status', 2), applied.append, 2)
+    assert applied == [1, 2]
+
+
+def test_flush_registered_at_exit_with_first_write(monkeypatch):
+    registered = []
+    monkeypatch.setattr('home_automation.model.write_queue.atexit.register', registered.append)
+    queue = WriteQueue(FakeTransaction(), enabled=True)
+    assert registered == []
+
+    queue.submit(('lights', 'status', 1), lambda: None)
+    queue.submit(('lights', 'status', 2), lambda: None)
+    assert registered == [queue.flush]
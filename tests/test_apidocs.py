@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock, patch
+
+from werkzeug.wrappers import Response
+
+from home_automation.apidocs import LazyApiDocs, init_app
+
+
+def test_docs_app_built_on_first_docs_request(get_test_client):
+    app = get_test_client.application
+    docs_app = MagicMock(side_effect=Response('docs'))
+    create_docs_app = MagicMock(return_value=docs_app)
+    app.wsgi_app = LazyApiDocs(app.wsgi_app, create_docs_app)
+    client = app.test_client()
+
+    with patch('home_automation.controllers.lights.get_model_lights') as get_model_lights:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = []
+        assert client.get('/api/v1/lights').status_code == 200
+    create_docs_app.assert_not_called()
+
+    assert client.get('/apidocs/').data == b'docs'
+    assert client.get('/apispec_1.json').data == b'docs'
+    create_docs_app.assert_called_once_with()
+    assert docs_app.call_count == 2
+
+
+def test_apidocs(get_test_client):
+    app = get_test_client.application
+    init_app(app)
+
+    with app.test_client() as client:
+        assert client.get('/apidocs/').status_code == 200
+        spec = client.get('/apispec_1.json').get_json()
+        assert '/api/v1/lights/' in spec['paths']
+
+
+def test_apidocs_disabled(get_test_client):
+    app = get_test_client.application
+    app.config['API_DOCS'] = False
+    init_app(app)
+
+    assert not isinstance(app.wsgi_app, LazyApiDocs)
+    assert get_test_client.get('/apidocs/').status_code == 404
@@ -0,0 +1,88 @@
+import gzip
+import json
+
+import pytest
+
+from home_automation.compression import Compressor, brotli, compressor, encoded_etags
+from unittest.mock import patch
+
+requires_brotli = pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+
+ROWS = [{'id': id, 'name': f'Light {id}', 'status': 0, 'creation_date': '2018-20-20'} for id in range(1, 101)]
+
+
+def test_compress_cached_by_etag():
+    cache = Compressor(cache_size=1)
+    body = json.dumps(ROWS).encode()
+
+    compressed = cache.compress(body, 'gzip', 'v1')
+    assert gzip.decompress(compressed) == body
+    assert cache.compress(b'ignored', 'gzip', 'v1') is compressed
+    assert cache.hits == 1
+
+    # evicted by the next version
+    cache.compress(body, 'gzip', 'v2')
+    assert cache.compress(body, 'gzip', 'v1') is not compressed
+    assert cache.misses == 3
+
+    # bodies without an ETag are never cached
+    cache.compress(body, 'gzip')
+    assert cache.misses == 3
+
+
+def test_encoded_etags():
+    assert encoded_etags('v1') == ['v1', 'v1-br', 'v1-gzip']
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_gzip(get_model_lights, get_test_client):
+    with get_test_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = ROWS
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip'})
+        assert result.status_code == 200
+        assert result.headers['Content-Encoding'] == 'gzip'
+        assert result.headers['ETag'] == '"v1-gzip"'
+        assert 'Accept-Encoding' in result.headers['Vary']
+        assert json.loads(gzip.decompress(result.data)) == ROWS
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip'})
+        assert compressor.hits == 1
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"v1-gzip"'})
+        assert result.status_code == 304
+        assert result.headers['ETag'] == '"v1-gzip"'
+
+
+@requires_brotli
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_brotli(get_model_lights, get_test_client):
+    with get_test_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = ROWS
+
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        assert result.headers['Content-Encoding'] == 'br'
+        assert result.headers['ETag'] == '"v1-br"'
+        assert json.loads(brotli.decompress(result.data)) == ROWS
+
+
+@patch('home_automation.controllers.lights.get_model_lights')
+def test_get_lights_uncompressed(get_model_lights, get_test_client):
+    with get_test_client as app:
+        get_model_lights().get_version.return_value = 'v1'
+        get_model_lights().get_lights.return_value = ROWS
+
+        result = app.get('/api/v1/lights')
+        assert 'Content-Encoding' not in result.headers
+        assert result.headers['ETag'] == '"v1"'
+        assert 'Accept-Encoding' in result.headers['Vary']
+
+        # below the size threshold
+        get_model_lights().get_lights.return_value = ROWS[:1]
+        get_model_lights().get_version.return_value = 'v2'
+        result = app.get('/api/v1/lights', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in result.headers
+        assert json.loads(result.data) == ROWS[:1]
+
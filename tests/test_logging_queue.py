@@ -0,0 +1,60 @@
+import logging
+import queue
+
+from home_automation.logging_queue import (BatchFileHandler, BatchingQueueListener, DroppingQueueHandler,
+                                           SamplingFilter)
+
+
+def _record(name='home_automation.controllers.lights', level=logging.INFO, msg='Test'):
+    return logging.makeLogRecord({'name': name, 'levelno': level, 'levelname': logging.getLevelName(level),
+                                  'msg': msg})
+
+
+def test_dropping_queue_handler_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.take_dropped() == 1
+    assert handler.take_dropped() == 0
+
+
+def test_sampling_filter():
+    dropped_all = SamplingFilter('home_automation.controllers', 0)
+
+    assert not dropped_all.filter(_record())
+    assert dropped_all.filter(_record(level=logging.WARNING))
+    assert dropped_all.filter(_record(name='home_automation.model'))
+    assert SamplingFilter('home_automation.controllers', 1).filter(_record())
+
+
+def test_listener_writes_batches(tmp_path):
+    filename = tmp_path / 'test.log'
+    log_queue = queue.Queue(maxsize=1)
+    queue_handler = DroppingQueueHandler(log_queue)
+    file_handler = BatchFileHandler(str(filename))
+    listener = BatchingQueueListener(log_queue, file_handler, queue_handler=queue_handler)
+
+    queue_handler.handle(_record(msg='first'))
+    queue_handler.handle(_record(msg='second'))
+    listener.start()
+    listener.stop()
+    file_handler.close()
+
+    lines = filename.read_text().splitlines()
+    assert lines == ['first', 'Log queue full, dropped records: 1']
+
+
+def test_listener_after_fork(tmp_path):
+    filename = tmp_path / 'test.log'
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+    listener = BatchingQueueListener(queue_handler.queue, BatchFileHandler(str(filename)),
+                                     queue_handler=queue_handler)
+    listener.start()
+
+    listener.after_fork()
+    assert queue_handler.queue is listener.queue
+    queue_handler.handle(_record(msg='after fork'))
+    listener.stop()
+
+    assert 'after fork' in filename.read_text()
@@ -0,0 +1,19 @@
+from home_automation.metrics import Histogram, Metrics
+
+
+def test_histogram_cumulative_buckets():
+    histogram = Histogram(buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert list(histogram.samples()) == [(0.1, 1), (1, 2), ('+Inf', 3)]
+    assert histogram.count == 3
+
+
+def test_query_latency_rendered():
+    registry = Metrics()
+    registry.observe_query('lights', """  select * FROM lights""", 0.002)
+
+    text = registry.render()
+    assert 'db_query_duration_seconds_count{table="lights",statement="SELECT"} 1' in text
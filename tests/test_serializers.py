@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from home_automation.serializers import JSONSerializer, OrjsonSerializer, get_serializer, jsonify, orjson
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+
+
+@pytest.mark.parametrize('serializer', [JSONSerializer(), pytest.param(OrjsonSerializer(), marks=requires_orjson)])
+def test_dumps_rows(serializer):
+    data = serializer.dumps([{'id': 1, 'name': 'Light'}, {'id': 2, 'name': 'Thermostat'}])
+
+    assert isinstance(data, bytes)
+    assert json.loads(data) == [{'id': 1, 'name': 'Light'}, {'id': 2, 'name': 'Thermostat'}]
+
+
+def test_get_serializer():
+    assert get_serializer('json').name == 'json'
+    assert get_serializer('auto').name == ('json' if orjson is None else 'orjson')
+    with pytest.raises(ValueError):
+        get_serializer('yaml')
+
+
+def test_jsonify(get_test_client):
+    with get_test_client.application.app_context():
+        response = jsonify(message='Test')
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == {'message': 'Test'}
+
+        assert json.loads(jsonify([1, 2]).data) == [1, 2]
+        assert json.loads(jsonify(1, 2).data) == [1, 2]
+
+
+@requires_orjson
+def test_get_serializer_orjson():
+    assert get_serializer('orjson').name == 'orjson'
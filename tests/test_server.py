@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from flask import Flask
+
+from home_automation.server import GunicornApplication, run_gunicorn
+
+
+def test_gunicorn_application():
+    app = Flask(__name__)
+    server = GunicornApplication(app, {'workers': 3, 'threads': 4, 'keepalive': 7})
+
+    assert server.cfg.workers == 3
+    assert server.cfg.threads == 4
+    assert server.cfg.keepalive == 7
+    assert server.load() is app
+
+
+
+@patch('home_automation.server.GunicornApplication')
+def test_run_gunicorn_one_worker(application):
+    app = Flask(__name__)
+    run_gunicorn(app, port=8000, threads=4, keepalive=5, timeout=30, graceful_timeout=30, max_requests=0)
+
+    options = application.call_args[0][1]
+    assert options['workers'] == 1
+    assert options['threads'] == 4
+    application().run.assert_called_once_with()